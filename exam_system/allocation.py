@@ -0,0 +1,107 @@
+"""
+Load-balanced allocation of answer sheets across a pool of evaluators.
+
+Papers go to the least-loaded faculty first, where load is the number of
+unchecked answer sheets a faculty already holds.  New answer sheets are
+written with one bulk insert and reassignments with one bulk update.
+"""
+import heapq
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from . import stats
+from .models import AnswerSheet, Faculty, StudentExamRegistration
+
+
+class AllocationResult(NamedTuple):
+    allocated: dict
+    unallocated: int
+
+    @property
+    def total(self):
+        return sum(self.allocated.values())
+
+
+# faculty id -> number of unchecked answer sheets it holds
+def current_loads(faculty_ids):
+    loads = dict.fromkeys(faculty_ids, 0)
+    rows = AnswerSheet.objects.filter(
+        faculty_id__in=faculty_ids,
+        is_checked=False
+    ).values('faculty').annotate(pending=Count('id'))
+    for row in rows:
+        loads[row['faculty']] = row['pending']
+    return loads
+
+
+def plan_allocation(count, loads, caps=None, preferred=()):
+    """
+    Hand out ``count`` papers over the faculty in ``loads``, least-loaded
+    first.  ``caps`` limits the total unchecked papers per faculty and
+    faculty in ``preferred`` are used before anyone else.
+
+    Returns the ordered list of faculty ids, one per paper handed out.
+    """
+    caps = caps or {}
+    preferred = set(preferred)
+    heap = []
+    for order, (faculty_id, load) in enumerate(loads.items()):
+        if load < caps.get(faculty_id, float('inf')):
+            heap.append((faculty_id not in preferred, load, order, faculty_id))
+    heapq.heapify(heap)
+
+    plan = []
+    while heap and len(plan) < count:
+        tier, load, order, faculty_id = heapq.heappop(heap)
+        plan.append(faculty_id)
+        if load + 1 < caps.get(faculty_id, float('inf')):
+            heapq.heappush(heap, (tier, load + 1, order, faculty_id))
+    return plan
+
+
+def allocate_papers(exam, faculty_ids, caps=None, department=None):
+    """
+    Spread the unallocated answer sheets of ``exam`` across ``faculty_ids``.
+
+    An answer sheet is created for every registered student that doesn't
+    have one yet.  With ``department`` set, faculty of that department get
+    papers until they reach their caps before the rest of the pool.
+    """
+    faculties = list(Faculty.objects.filter(id__in=faculty_ids, is_active=True).values_list('id', 'department'))
+    loads = current_loads([faculty_id for faculty_id, _ in faculties])
+    preferred = [faculty_id for faculty_id, faculty_department in faculties if department and faculty_department == department]
+
+    registered = StudentExamRegistration.objects.filter(exam=exam).order_by('id').values_list('student_id', flat=True)
+    sheets = {
+        sheet.student_id: sheet
+        for sheet in AnswerSheet.objects.filter(exam=exam).only('id', 'student_id', 'faculty_id', 'is_allocated', 'is_checked')
+    }
+
+    # existing unallocated sheets first, then the students without a sheet
+    reassigned = [sheet for sheet in sheets.values() if not sheet.is_allocated]
+    missing = [student_id for student_id in registered if student_id not in sheets]
+
+    needed = len(reassigned) + len(missing)
+    plan = plan_allocation(needed, loads, caps, preferred)
+    allocated = dict.fromkeys(loads, 0)
+    for faculty_id in plan:
+        allocated[faculty_id] += 1
+
+    reassigned = reassigned[:len(plan)]
+    for sheet, faculty_id in zip(reassigned, plan):
+        sheet.faculty_id = faculty_id
+        sheet.is_allocated = True
+    created = [
+        AnswerSheet(student_id=student_id, exam=exam, faculty_id=faculty_id, is_allocated=True, is_checked=False)
+        for student_id, faculty_id in zip(missing, plan[len(reassigned):])
+    ]
+
+    with transaction.atomic():
+        AnswerSheet.objects.bulk_create(created)
+        AnswerSheet.objects.bulk_update(reassigned, ['faculty', 'is_allocated'])
+        # bulk writes skip the model signals
+        stats.adjust(pending_checking=len(created) + sum(1 for sheet in reassigned if not sheet.is_checked))
+
+    return AllocationResult(allocated, needed - len(plan))
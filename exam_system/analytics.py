@@ -0,0 +1,180 @@
+"""
+Result analytics for an exam or a whole semester.
+
+The marks of the checked papers are read with one ``values_list`` into NumPy
+arrays, and everything else is computed on those arrays without Python
+loops over papers:
+
+- the distribution of marks as a percentage of ``Exam.total_marks``: mean,
+  spread, quartiles, pass rate and a histogram in 10% bins
+- the percentile rank of every student (by their mean percentage across the
+  semester's exams)
+- a marking bias indicator per faculty: how far their papers sit from the
+  mean of the same exam, in percentage points and as a z-score
+
+Results are cached under a "marks version" of the exams they cover, read
+from the marked papers themselves with one aggregate query: their number,
+the sum of their marks and of their exams' totals, and the latest
+``checked_at``.  Any write path that checks a paper, changes its marks or
+an exam's total moves it, signals or not, and every worker sees the same
+version.  An edit that leaves all four unchanged (two marks swapped within
+an exam) shows once the cached result expires.
+
+NumPy is optional like openpyxl for ``marks_import``: without it the
+analytics raise ``AnalyticsUnavailable`` and the rest of the site works.
+"""
+import hashlib
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from .db import id_list
+from .models import AnswerSheet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HISTOGRAM_BINS = 10  # of 10% each
+BIAS_MIN_PAPERS = 5  # fewer papers say nothing about a faculty's marking
+BIAS_Z_SCORE = 2.0
+
+
+class AnalyticsUnavailable(Exception):
+    pass
+
+
+class Distribution(NamedTuple):
+    papers: int
+    mean: float
+    std: float
+    minimum: float
+    p25: float
+    median: float
+    p75: float
+    maximum: float
+    pass_rate: float  # percent of papers at or above RESULT_PASS_PERCENT
+    histogram: list  # papers per 10% bin, the last one including 100%
+
+
+class FacultyBias(NamedTuple):
+    faculty_id: int
+    papers: int
+    mean: float
+    bias: float  # mean distance from the exam means, in percentage points
+    z_score: float
+    flagged: bool
+
+
+class Analytics(NamedTuple):
+    distribution: Distribution
+    ranks: dict  # student id -> percentile rank
+    faculty: list  # FacultyBias, most lenient first
+
+
+# the checked and marked papers of ``exam_ids``
+def marked_papers(exam_ids):
+    return AnswerSheet.objects.filter(exam_id__in=id_list(exam_ids), is_checked=True, marks_obtained__isnull=False)
+
+
+# the marks version of ``exam_ids``, from one aggregate query
+def marks_version(exam_ids):
+    return tuple(marked_papers(exam_ids).aggregate(
+        papers=Count('id'),
+        marks=Sum('marks_obtained'),
+        totals=Sum('exam__total_marks'),
+        checked=Max('checked_at'),
+    ).values())
+
+
+def percentile_ranks(values):
+    """
+    Percent of ``values`` below each value, counting ties as half below.
+    """
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side='left')
+    not_above = np.searchsorted(ordered, values, side='right')
+    return (below + not_above) / 2 / len(values) * 100
+
+
+def distribution(percentages):
+    if not len(percentages):
+        return Distribution(0, *([None] * 8), [0] * HISTOGRAM_BINS)
+    p25, median, p75 = np.percentile(percentages, [25, 50, 75])
+    histogram, _ = np.histogram(percentages, bins=HISTOGRAM_BINS, range=(0, 100))
+    return Distribution(
+        len(percentages),
+        float(percentages.mean()),
+        float(percentages.std()),
+        float(percentages.min()),
+        float(p25),
+        float(median),
+        float(p75),
+        float(percentages.max()),
+        float((percentages >= settings.RESULT_PASS_PERCENT).mean() * 100),
+        histogram.tolist(),
+    )
+
+
+def faculty_bias(percentages, exams, faculty):
+    """
+    ``FacultyBias`` of every faculty in ``faculty`` (one id per paper, like
+    ``exams``), from each paper's distance to the mean of its exam.
+    """
+    exam_ids, exam_index = np.unique(exams, return_inverse=True)
+    exam_means = np.bincount(exam_index, percentages) / np.bincount(exam_index)
+    deviations = percentages - exam_means[exam_index]
+    spread = deviations.std()
+
+    faculty_ids, faculty_index = np.unique(faculty, return_inverse=True)
+    papers = np.bincount(faculty_index)
+    means = np.bincount(faculty_index, percentages) / papers
+    bias = np.bincount(faculty_index, deviations) / papers
+    z_scores = bias / (spread / np.sqrt(papers)) if spread else np.zeros(len(papers))
+    flagged = (papers >= BIAS_MIN_PAPERS) & (np.abs(z_scores) >= BIAS_Z_SCORE)
+
+    rows = [
+        FacultyBias(int(faculty_id), int(count), float(mean), float(offset), float(z), bool(flag))
+        for faculty_id, count, mean, offset, z, flag in zip(faculty_ids, papers, means, bias, z_scores, flagged)
+    ]
+    rows.sort(key=lambda row: (-row.bias, row.faculty_id))
+    return rows
+
+
+def compute_analytics(exam_ids):
+    """
+    ``Analytics`` of the checked and marked papers of ``exam_ids``, from
+    one query.
+    """
+    rows = marked_papers(exam_ids).values_list('marks_obtained', 'exam__total_marks', 'exam_id', 'student_id', 'faculty_id')
+    data = np.array(list(rows), dtype=float).reshape(-1, 5)  # a NULL faculty reads as nan
+    marks, totals, exams, students, faculty = data.T
+    percentages = marks / np.maximum(totals, 1) * 100
+    if not len(percentages):
+        return Analytics(distribution(percentages), {}, [])
+
+    student_ids, student_index = np.unique(students, return_inverse=True)
+    student_means = np.bincount(student_index, percentages) / np.bincount(student_index)
+    ranks = dict(zip(student_ids.astype(int).tolist(), percentile_ranks(student_means).tolist()))
+
+    # papers allocated to no one (left over from the claim pool) say nothing about bias
+    graded = ~np.isnan(faculty)
+    bias = faculty_bias(percentages[graded], exams[graded], faculty[graded]) if graded.any() else []
+    return Analytics(distribution(percentages), ranks, bias)
+
+
+def analytics_for(exam_ids):
+    """
+    ``compute_analytics(exam_ids)``, cached until the marks of one of the
+    exams change.
+    """
+    if np is None:
+        raise AnalyticsUnavailable('Result analytics need numpy installed')
+    key = (sorted(set(exam_ids)), marks_version(exam_ids))
+    fingerprint = hashlib.sha1(repr(key).encode()).hexdigest()
+    return cache.get_or_set(
+        f'exam_system:analytics:{fingerprint}', lambda: compute_analytics(exam_ids), settings.ANALYTICS_CACHE_TIMEOUT
+    )
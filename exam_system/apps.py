@@ -5,3 +5,7 @@ class ExamSystemConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exam_system'
     verbose_name = 'Exam System'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
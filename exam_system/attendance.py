@@ -0,0 +1,84 @@
+"""
+Set-based attendance sheets.
+
+Generating a sheet inserts every missing row in one bulk insert and saving a
+sheet applies the present and absent sets as two UPDATE statements, so the
+number of queries doesn't grow with the number of students on the sheet.
+"""
+from django.db import transaction
+
+from .db import id_list
+from .models import Attendance, StudentExamRegistration
+from .sessions import sitting
+
+
+# registrations sitting ``session``, see ``sessions.sitting``
+def session_registrations(session):
+    return StudentExamRegistration.objects.filter(sitting([session]))
+
+
+# student ids registered for ``session``
+def registered_student_ids(session):
+    return set(session_registrations(session).values_list('student_id', flat=True))
+
+
+# student ids marked present on the sheet of ``session``
+def present_student_ids(session):
+    return set(Attendance.objects.filter(
+        exam_session=session,
+        is_present=True
+    ).values_list('student_id', flat=True))
+
+
+# parse the ``attendance_<student_id>`` checkboxes of a submitted sheet
+def parse_present_ids(data):
+    present = set()
+    for key in data:
+        if key.startswith('attendance_'):
+            try:
+                present.add(int(key[len('attendance_'):]))
+            except ValueError:
+                continue
+    return present
+
+
+def create_attendance_sheet(session, registered=None):
+    """
+    Insert the missing attendance rows for every student registered for
+    ``session``.  Returns the number of rows inserted.
+    """
+    if registered is None:
+        registered = registered_student_ids(session)
+    existing = set(Attendance.objects.filter(
+        exam_session=session
+    ).values_list('student_id', flat=True))
+
+    missing = [
+        Attendance(student_id=student_id, exam_session=session, is_present=False)
+        for student_id in sorted(registered - existing)
+    ]
+    Attendance.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(missing)
+
+
+def save_attendance(session, present_ids):
+    """
+    Mark the registered students in ``present_ids`` present and everyone else
+    absent.  Returns ``(present_count, absent_count)``.
+    """
+    registered = registered_student_ids(session)
+    present = registered & set(present_ids)
+    absent = registered - present
+
+    with transaction.atomic():
+        create_attendance_sheet(session, registered)
+        Attendance.objects.filter(
+            exam_session=session,
+            student_id__in=id_list(present)
+        ).update(is_present=True)
+        Attendance.objects.filter(
+            exam_session=session,
+            student_id__in=id_list(absent)
+        ).update(is_present=False)
+
+    return len(present), len(absent)
@@ -0,0 +1,92 @@
+"""
+Bulk activate / deactivate / edit for the admin management pages.
+
+Each action is one read of the selected ids and one ``UPDATE ... WHERE id IN
+(...)``, with the id list bound as a single parameter (``db.id_list``).
+``update()`` skips the model signals, so the dashboard counters, the
+principal cache and the search index are brought up to date here.
+"""
+from typing import NamedTuple
+
+from django.db import transaction
+
+from . import search, stats
+from .db import id_list
+from .middleware import PRINCIPAL_MODELS, invalidate_principals
+from .models import Faculty, Semester, Student, Subject
+
+ACTIVE_METRICS = {
+    Faculty: 'active_faculty',
+    Student: 'active_students',
+}
+
+# fields a bulk edit may set, per model
+EDITABLE = {
+    Faculty: ('department',),
+    Student: ('semester',),
+    Subject: ('semester',),
+}
+
+# children deactivated (or reactivated) with a semester when cascading
+CASCADES = {
+    Semester: (('subjects', Subject, 'semester_id'),),
+}
+
+
+class BulkResult(NamedTuple):
+    selected: int
+    updated: int
+    cascaded: dict  # label -> rows updated
+
+
+def set_active(queryset, active, cascade=False):
+    """
+    Activate or deactivate every row of ``queryset`` that is not already in
+    that state, and with ``cascade`` the children in ``CASCADES`` too.
+    """
+    model = queryset.model
+    with transaction.atomic():
+        selected = list(queryset.values_list('pk', 'is_active'))
+        changed = [pk for pk, is_active in selected if is_active != active]
+        updated = model.objects.filter(pk__in=id_list(changed)).update(is_active=active)
+
+        if model in ACTIVE_METRICS:
+            stats.adjust(**{ACTIVE_METRICS[model]: updated if active else -updated})
+        _forget_principals(model, changed)
+
+        cascaded = {}
+        if cascade:
+            parents = [pk for pk, _ in selected]
+            for label, child, field in CASCADES.get(model, ()):
+                cascaded[label] = child.objects.filter(
+                    **{f'{field}__in': id_list(parents)}
+                ).exclude(is_active=active).update(is_active=active)
+
+    return BulkResult(len(selected), updated, cascaded)
+
+
+def bulk_edit(queryset, field, value):
+    """
+    Set ``field`` to ``value`` on every row of ``queryset``.  Only the
+    ``EDITABLE`` fields can be set.
+    """
+    model = queryset.model
+    if field not in EDITABLE.get(model, ()):
+        raise ValueError(f'{model.__name__}.{field} cannot be edited in bulk')
+
+    with transaction.atomic():
+        ids = list(queryset.values_list('pk', flat=True))
+        updated = model.objects.filter(pk__in=id_list(ids)).update(**{field: value})
+
+        _, source = search.source_for(model)
+        if source is not None and field in (source.title, *source.detail):
+            search.index_objects(model, model.objects.filter(pk__in=id_list(ids)))
+        _forget_principals(model, ids)
+
+    return BulkResult(len(ids), updated, {})
+
+
+def _forget_principals(model, ids):
+    for user_type, principal_model in PRINCIPAL_MODELS.items():
+        if principal_model is model:
+            invalidate_principals(user_type, ids)
@@ -0,0 +1,94 @@
+"""
+Pull-based evaluation queue.
+
+Instead of an admin handing out every paper up front (``allocation.py``),
+faculty claim the next batch of an exam's unallocated answer sheets
+themselves.  A claim is one ``UPDATE`` that only takes sheets that are still
+unallocated, so two evaluators claiming at the same moment never get the same
+paper.  Claimed sheets carry a lease, and those still unchecked when it runs
+out go back to the pool.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from . import stats
+from .models import AnswerSheet, StudentExamRegistration
+
+
+def lease_duration():
+    return timedelta(seconds=settings.EVALUATION_LEASE_SECONDS)
+
+
+# unallocated sheets, and claimed ones whose lease ran out before checking
+def claimable(now=None):
+    now = now or timezone.now()
+    return Q(is_checked=False) & (Q(is_allocated=False) | Q(lease_expires_at__lt=now))
+
+
+def open_pool(exam):
+    """
+    Create an unallocated answer sheet for every registered student of
+    ``exam`` who has none, so the whole exam can be claimed.  Returns the
+    number created.
+    """
+    with transaction.atomic():
+        missing = StudentExamRegistration.objects.filter(exam=exam).exclude(
+            student_id__in=AnswerSheet.objects.filter(exam=exam).values('student_id')
+        ).order_by('id').values_list('student_id', flat=True)
+        created = AnswerSheet.objects.bulk_create(
+            [AnswerSheet(student_id=student_id, exam=exam) for student_id in missing], batch_size=1000
+        )
+    return len(created)
+
+
+def release_expired(exam=None, now=None):
+    """
+    Put the unchecked sheets whose lease has run out back in the pool (of
+    ``exam``, or of every exam).  Returns the number released.
+    """
+    expired = AnswerSheet.objects.filter(is_checked=False, lease_expires_at__lt=now or timezone.now())
+    if exam is not None:
+        expired = expired.filter(exam=exam)
+    with transaction.atomic():
+        released = expired.update(faculty=None, is_allocated=False, lease_expires_at=None)
+        # bulk writes skip the model signals
+        stats.adjust(pending_checking=-released)
+    return released
+
+
+def claim_papers(faculty, exam, count):
+    """
+    Allocate the next ``count`` (at most ``EVALUATION_CLAIM_MAX``) claimable
+    answer sheets of ``exam`` to ``faculty`` under a lease.  Returns the
+    number claimed, fewer than ``count`` once the pool runs low.
+    """
+    release_expired(exam)
+    count = min(count, settings.EVALUATION_CLAIM_MAX)
+    pool = AnswerSheet.objects.filter(exam=exam, is_allocated=False, is_checked=False).order_by('id').values('pk')[:count]
+    with transaction.atomic():
+        # re-checking is_allocated in the UPDATE itself is what makes the claim
+        # safe: a sheet taken by a concurrent claim no longer matches
+        claimed = AnswerSheet.objects.filter(pk__in=pool, is_allocated=False).update(
+            faculty=faculty, is_allocated=True, lease_expires_at=timezone.now() + lease_duration()
+        )
+        stats.adjust(pending_checking=claimed)
+    return claimed
+
+
+# exam id -> sheets waiting to be claimed, for the exams in ``exam_ids``
+def pool_sizes(exam_ids):
+    return dict(AnswerSheet.objects.filter(claimable(), exam_id__in=exam_ids).values('exam').annotate(
+        total=Count('id')
+    ).values_list('exam', 'total'))
+
+
+# exam id -> (papers, earliest lease expiry) of the live claims of ``faculty``
+def claims_of(faculty):
+    rows = AnswerSheet.objects.filter(
+        faculty=faculty, is_checked=False, lease_expires_at__gte=timezone.now()
+    ).values('exam').annotate(total=Count('id'), expires=Min('lease_expires_at'))
+    return {row['exam']: (row['total'], row['expires']) for row in rows}
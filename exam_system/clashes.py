@@ -0,0 +1,88 @@
+"""
+Registration clash detection.
+
+An exam runs from ``start_time`` to ``end_time`` on every day from
+``start_date`` to ``end_date``, so two exams clash when their date ranges
+intersect and their daily times overlap.  Exams on the same days at
+different times, or at the same times on different days, don't clash.
+
+A new registration is checked with one query: the student's registrations,
+on the (student, exam) unique index, filtered on the new exam's window.
+Reading them from the database on every check means a registration or an
+exam moved by another worker is never missed.
+
+``find_all_clashes`` finds the clashes that predate the check, or slipped
+through it when one student registered for two clashing exams at the same
+instant.  It makes one pass over all registrations, ordered by student.
+"""
+from itertools import groupby
+from operator import itemgetter
+from typing import NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q, Subquery
+
+from .models import Exam, StudentExamRegistration
+
+SPAN_FIELDS = ('start_date', 'end_date', 'start_time', 'end_time')
+
+
+class Clash(NamedTuple):
+    student_id: int
+    exam_id: int
+    other_exam_id: int
+
+
+# True when two (start_date, end_date, start_time, end_time) windows clash
+def clashing(window, other):
+    start_date, end_date, start_time, end_time = window
+    other_start_date, other_end_date, other_start_time, other_end_time = other
+    return (
+        start_date <= other_end_date and other_start_date <= end_date
+        and start_time < other_end_time and other_start_time < end_time
+    )
+
+
+def overlapping(start_date, end_date, start_time, end_time, prefix=''):
+    """
+    Q of the exams (through ``prefix``, e.g. ``'exam__'``) clashing with the
+    window given by the four values or expressions.
+    """
+    return Q(**{
+        f'{prefix}start_date__lte': end_date,
+        f'{prefix}end_date__gte': start_date,
+        f'{prefix}start_time__lt': end_time,
+        f'{prefix}end_time__gt': start_time,
+    })
+
+
+def find_clash(student_id, exam_id, using=DEFAULT_DB_ALIAS):
+    """
+    The id of a registered exam of the student clashing with ``exam_id``, or
+    None (also for an unknown exam).  The exam's window is read by scalar
+    subqueries, so this is one query.
+    """
+    exam = Exam.objects.using(using).filter(id=exam_id)
+    window = (Subquery(exam.values(field)) for field in SPAN_FIELDS)
+    return StudentExamRegistration.objects.using(using).filter(
+        overlapping(*window, prefix='exam__'), student_id=student_id,
+    ).exclude(exam_id=exam_id).values_list('exam_id', flat=True).first()
+
+
+def find_all_clashes(using=DEFAULT_DB_ALIAS):
+    """
+    Every pair of clashing registered exams of every student, from one pass
+    over the registrations ordered by student.
+    """
+    rows = StudentExamRegistration.objects.using(using).order_by('student_id').values_list(
+        'student_id', 'exam_id', *(f'exam__{field}' for field in SPAN_FIELDS)
+    ).iterator(chunk_size=10000)
+    for student_id, registrations in groupby(rows, key=itemgetter(0)):
+        windows = sorted((tuple(fields), exam_id) for _, exam_id, *fields in registrations)
+        active = []  # windows whose dates still run on the current start date
+        for window, exam_id in windows:
+            active = [(other, other_id) for other, other_id in active if other[1] >= window[0]]
+            for other, other_id in active:
+                if clashing(window, other):
+                    yield Clash(student_id, other_id, exam_id)
+            active.append((window, exam_id))
@@ -0,0 +1,48 @@
+"""
+Small database helpers shared by the set-based code paths.
+"""
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+_reporting = ContextVar('exam_system_reporting', default=False)
+
+
+# bind a list of ids as a single parameter, so ``field__in=id_list(ids)`` stays
+# one statement however many ids there are (SQLite caps a query at 999 variables)
+def id_list(ids):
+    return value_list(int(value) for value in ids)
+
+
+# ``id_list`` for any JSON-serializable values, e.g. usernames
+def value_list(values):
+    values = sorted(set(values))
+    if connection.vendor == 'sqlite':
+        return RawSQL('SELECT value FROM json_each(%s)', (json.dumps(values),))
+    return values
+
+
+# reads inside the block go to the read-only reporting connection, see routers.py
+@contextmanager
+def reporting_reads():
+    token = start_reporting_reads()
+    try:
+        yield
+    finally:
+        stop_reporting_reads(token)
+
+
+# ``reporting_reads()`` split in two, for middleware hooks; returns the token to stop with
+def start_reporting_reads():
+    return _reporting.set(True)
+
+
+def stop_reporting_reads(token):
+    _reporting.reset(token)
+
+
+def reporting_active():
+    return _reporting.get()
@@ -0,0 +1,195 @@
+"""
+Bulk CSV import of student and faculty accounts.
+
+The file is read one row at a time.  Rows are validated a chunk at a time
+against the semesters and the usernames / roll numbers already taken (one
+query per chunk), and the valid rows of a chunk are inserted with one
+``bulk_create``.  Every rejected row is reported with its line number.
+"""
+import csv
+from itertools import islice
+from typing import NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from . import search, stats
+from .db import value_list
+from .models import Faculty, Semester, Student
+
+BATCH_SIZE = 2000
+
+
+class ImportSpec(NamedTuple):
+    model: type
+    columns: tuple
+    unique: tuple
+    metric: str
+
+
+SPECS = {
+    'students': ImportSpec(
+        Student, ('username', 'password', 'name', 'email', 'roll_number', 'semester'),
+        ('username', 'roll_number'), 'active_students',
+    ),
+    'faculty': ImportSpec(
+        Faculty, ('username', 'password', 'name', 'email', 'department'),
+        ('username',), 'active_faculty',
+    ),
+}
+
+
+class RowError(NamedTuple):
+    line: int
+    username: str
+    message: str
+
+
+class ImportResult(NamedTuple):
+    processed: int
+    imported: int  # rows that would be imported, on a dry run
+    errors: list
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# semester id or (case-insensitive) name -> id, active semesters only
+def semester_lookup():
+    lookup = {}
+    for semester_id, name in Semester.objects.filter(is_active=True).values_list('id', 'name'):
+        lookup[str(semester_id)] = semester_id
+        lookup[name.strip().lower()] = semester_id
+    return lookup
+
+
+def import_accounts(kind, stream, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Import the ``kind`` ('students' or 'faculty') accounts of the CSV text
+    ``stream``.  The header must name the ``SPECS`` columns, in any order.
+    Returns an ``ImportResult``; raises ``ImportFormatError`` for a bad
+    header.
+    """
+    spec = SPECS[kind]
+    reader = csv.DictReader(stream)
+    missing = [column for column in spec.columns if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ImportFormatError(f'Missing columns: {", ".join(missing)}')
+
+    semesters = semester_lookup() if 'semester' in spec.columns else None
+    seen = {field: {} for field in spec.unique}  # value -> line it was imported from
+    errors = []
+    processed = imported = 0
+
+    rows = ((reader.line_num, row) for row in reader)
+    for chunk in batched(rows, batch_size):
+        processed += len(chunk)
+        valid = validate_chunk(spec, chunk, semesters, seen, errors)
+        if dry_run:
+            imported += len(valid)
+        elif valid:
+            imported += insert_chunk(spec, valid, errors)
+
+    errors.sort()
+    return ImportResult(processed, imported, errors)
+
+
+def validate_chunk(spec, chunk, semesters, seen, errors):
+    """
+    The ``(line, object)`` pairs of the valid rows of ``chunk``; the others
+    are appended to ``errors``.
+    """
+    chunk = [(line, {column: (row.get(column) or '').strip() for column in spec.columns}) for line, row in chunk]
+    taken = {
+        field: set(spec.model.objects.filter(**{
+            f'{field}__in': value_list(row[field] for _, row in chunk if row[field])
+        }).values_list(field, flat=True))
+        for field in spec.unique
+    }
+    max_lengths = {
+        column: spec.model._meta.get_field(column).max_length
+        for column in spec.columns if column != 'semester'
+    }
+
+    valid = []
+    for line, row in chunk:
+        problems = []
+        for column in spec.columns:
+            if not row[column]:
+                problems.append(f'{column} is required')
+            elif column in max_lengths and len(row[column]) > max_lengths[column]:
+                problems.append(f'{column} is longer than {max_lengths[column]} characters')
+        if row['email']:
+            try:
+                validate_email(row['email'])
+            except ValidationError:
+                problems.append(f'"{row["email"]}" is not a valid email')
+        if semesters is not None and row['semester'] and row['semester'].lower() not in semesters:
+            problems.append(f'unknown or inactive semester "{row["semester"]}"')
+        for field in spec.unique:
+            if row[field] in seen[field]:
+                problems.append(f'{field} "{row[field]}" repeats line {seen[field][row[field]]}')
+            elif row[field] in taken[field]:
+                problems.append(f'{field} "{row[field]}" already exists')
+
+        if problems:
+            errors.append(RowError(line, row['username'], '; '.join(problems)))
+            continue
+        for field in spec.unique:
+            seen[field][row[field]] = line
+        if semesters is not None:
+            row['semester_id'] = semesters[row.pop('semester').lower()]
+        valid.append((line, spec.model(**row, is_active=True)))
+    return valid
+
+
+def insert_chunk(spec, valid, errors):
+    """
+    ``bulk_create`` the validated objects, then count and index them (bulk
+    inserts skip the model signals).  Returns the number inserted.
+    """
+    objects = [obj for _, obj in valid]
+    try:
+        with transaction.atomic():
+            spec.model.objects.bulk_create(objects)
+            _after_insert(spec, objects)
+        return len(objects)
+    except IntegrityError:
+        pass
+
+    # taken by a concurrent insert since validation, find the rows one by one
+    created = []
+    for line, obj in valid:
+        obj.pk = None  # may be set by a rolled back batch
+        try:
+            with transaction.atomic():
+                spec.model.objects.bulk_create([obj])
+        except IntegrityError:
+            errors.append(RowError(line, obj.username, 'already exists'))
+        else:
+            created.append(obj)
+    with transaction.atomic():
+        _after_insert(spec, created)
+    return len(created)
+
+
+def _after_insert(spec, objects):
+    stats.adjust(**{spec.metric: len(objects)})
+    search.index_objects(spec.model, objects)
+
+
+def write_error_report(errors, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'username', 'error'])
+    writer.writerows(errors)
@@ -0,0 +1,179 @@
+"""
+Query budget instrumentation.
+
+``record_queries()`` counts the SQL queries, database time, duplicated query
+signatures (the N+1 fingerprint) and template render time of a block of
+code.  ``QueryBudgetMiddleware`` in ``middleware.py`` wraps every request in
+it, tags the result with the resolved view name and feeds ``query_stats``.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('exam_system_query_recorder', default=None)
+
+# collapse literal values and variable-length IN lists into one signature
+_NUMBERS = re.compile(r'\b\d+\b')
+_PLACEHOLDERS = re.compile(r'%s(\s*,\s*%s)+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_signature(sql):
+    return _PLACEHOLDERS.sub('%s, ...', _NUMBERS.sub('N', sql))
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.count += 1
+            self.signatures[query_signature(sql)] += 1
+
+    # signatures run more than once, most repeated first
+    def duplicates(self, limit=5):
+        return [(signature, count) for signature, count in self.signatures.most_common(limit) if count > 1]
+
+    def as_dict(self):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.db_time * 1000, 3),
+            'template_ms': round(self.template_time * 1000, 3),
+            'duplicates': [{'sql': signature, 'count': count} for signature, count in self.duplicates()],
+        }
+
+
+def check_budget(name, recorder, budget=None, action=None):
+    """
+    Log or raise when ``recorder`` ran more queries than ``budget`` (by
+    default the ``QUERY_BUDGETS`` setting for ``name``).
+    """
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(name)
+    if budget is None or recorder.count <= budget:
+        return
+    message = f'{name} ran {recorder.count} queries, budget is {budget}'
+    duplicates = recorder.duplicates(1)
+    if duplicates:
+        message += f' (most repeated x{duplicates[0][1]}: {duplicates[0][0][:200]})'
+    if (action or getattr(settings, 'QUERY_BUDGET_ACTION', 'log')) == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def record_queries(name=None, budget=None, action=None):
+    """
+    Record the queries run on every database connection inside the block.
+    With a ``name``, the block is checked against its query budget on exit.
+    """
+    recorder = QueryRecorder()
+    token = _current.set(recorder)
+    wrappers = [connection.execute_wrapper(recorder) for connection in connections.all()]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    try:
+        yield recorder
+    finally:
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+        _current.reset(token)
+    if name is not None:
+        check_budget(name, recorder, budget, action)
+
+
+class RollingQueryStats:
+    """
+    Last ``QUERY_STATS_WINDOW`` requests per view name, kept in memory.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name, recorder, total_time):
+        window = getattr(settings, 'QUERY_STATS_WINDOW', 200)
+        sample = (recorder.count, recorder.db_time, recorder.template_time, total_time, recorder.duplicates(3))
+        with self.lock:
+            self.samples.setdefault(name, deque(maxlen=window)).append(sample)
+
+    def snapshot(self):
+        with self.lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+
+        views = {}
+        for name, values in samples.items():
+            requests = len(values)
+            duplicates = Counter()
+            for value in values:
+                for signature, count in value[4]:
+                    duplicates[signature] = max(duplicates[signature], count)
+            totals = sorted(value[3] for value in values)
+            views[name] = {
+                'requests': requests,
+                'avg_queries': round(sum(value[0] for value in values) / requests, 2),
+                'max_queries': max(value[0] for value in values),
+                'avg_db_ms': round(sum(value[1] for value in values) * 1000 / requests, 3),
+                'avg_template_ms': round(sum(value[2] for value in values) * 1000 / requests, 3),
+                'p95_ms': round(totals[min(requests - 1, int(requests * 0.95))] * 1000, 3),
+                'budget': getattr(settings, 'QUERY_BUDGETS', {}).get(name),
+                'duplicates': [{'sql': signature, 'count': count} for signature, count in duplicates.most_common(3)],
+            }
+        return views
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+
+query_stats = RollingQueryStats()
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        recorder = _current.get()
+        if recorder is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            recorder.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, with render time reported to the active
+    ``record_queries()`` block.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,127 @@
+"""
+Keyset pagination and filters for the admin account listings.
+
+Pages are read newest first on ``(created_at, id)`` and addressed by the
+key of the row at their edge, not by an offset, so page N costs the same
+index seek as page 1.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from .search import matching_ids
+
+PAGE_SIZE = 50
+
+
+class KeysetPage(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+def encode_cursor(obj):
+    return f'{obj.created_at.isoformat()}_{obj.pk}'
+
+
+def decode_cursor(value):
+    try:
+        created_at, pk = value.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, after=None, before=None, size=PAGE_SIZE):
+    """
+    The page of ``queryset`` following the ``after`` cursor or preceding the
+    ``before`` cursor, newest first.  No cursor (or a bad one) is page 1.
+    """
+    cursor = decode_cursor(before)
+    if cursor is not None:
+        created_at, pk = cursor
+        rows = list(queryset.filter(created_at__gte=created_at).exclude(
+            created_at=created_at, pk__lte=pk
+        ).order_by('created_at', 'pk')[:size + 1])
+        more = len(rows) > size
+        rows = rows[:size][::-1]
+        return KeysetPage(
+            rows,
+            encode_cursor(rows[-1]) if rows else None,
+            encode_cursor(rows[0]) if more else None,
+        )
+
+    cursor = decode_cursor(after)
+    queryset = queryset.order_by('-created_at', '-pk')
+    if cursor is not None:
+        created_at, pk = cursor
+        queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, pk__gte=pk)
+    rows = list(queryset[:size + 1])
+    more = len(rows) > size
+    rows = rows[:size]
+    return KeysetPage(
+        rows,
+        encode_cursor(rows[-1]) if more else None,
+        encode_cursor(rows[0]) if cursor is not None and rows else None,
+    )
+
+
+def filter_students(queryset, params):
+    """
+    Apply the ``semester``, ``status`` and ``q`` (full-text search over
+    name, roll number, username and email) filters of ``params``.  Returns
+    the queryset and the filters that were applied, for the pagination
+    links.
+    """
+    filters = {}
+    semester = params.get('semester', '')
+    if semester.isdigit():
+        queryset = queryset.filter(semester_id=int(semester))
+        filters['semester'] = semester
+    status = params.get('status', '')
+    if status in ('active', 'inactive'):
+        queryset = queryset.filter(is_active=(status == 'active'))
+        filters['status'] = status
+    query = params.get('q', '').strip()
+    if query:
+        queryset = queryset.filter(pk__in=matching_ids('student', query))
+        filters['q'] = query
+    return queryset, filters
+
+
+def filter_faculty(queryset, params):
+    """
+    Apply the ``department``, ``status`` and ``q`` (full-text search over
+    name, username, email and department) filters of ``params``, as
+    ``filter_students`` does.
+    """
+    filters = {}
+    department = params.get('department', '').strip()
+    if department:
+        queryset = queryset.filter(department=department)
+        filters['department'] = department
+    status = params.get('status', '')
+    if status in ('active', 'inactive'):
+        queryset = queryset.filter(is_active=(status == 'active'))
+        filters['status'] = status
+    query = params.get('q', '').strip()
+    if query:
+        queryset = queryset.filter(pk__in=matching_ids('faculty', query))
+        filters['q'] = query
+    return queryset, filters
+
+
+def filter_subjects(queryset, params):
+    """
+    Apply the ``semester`` and ``q`` (full-text search over name and code)
+    filters of ``params``, as ``filter_students`` does.
+    """
+    filters = {}
+    semester = params.get('semester', '')
+    if semester.isdigit():
+        queryset = queryset.filter(semester_id=int(semester))
+        filters['semester'] = semester
+    query = params.get('q', '').strip()
+    if query:
+        queryset = queryset.filter(pk__in=matching_ids('subject', query))
+        filters['q'] = query
+    return queryset, filters
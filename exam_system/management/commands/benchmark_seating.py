@@ -0,0 +1,92 @@
+import math
+import time
+from datetime import date, time as clock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from exam_system.models import Exam, ExamSession, Semester, Student, StudentExamRegistration, Subject
+from exam_system.seating import Room, arrange_session, compute_layout
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the seating engine at several session sizes (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 50000])
+        parser.add_argument('--room-columns', type=int, default=20)
+        parser.add_argument('--room-rows', type=int, default=25)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'students':>10} {'layout':>10} {'separated':>10} {'session':>10}")
+        for size in options['sizes']:
+            with transaction.atomic():
+                session = self.seed(size)
+                per_room = options['room_rows'] * options['room_columns']
+                rooms = [
+                    Room(self.room_name(index), options['room_rows'], options['room_columns'])
+                    for index in range(math.ceil(2 * size / per_room))
+                ]
+                students = [(index, index % 7) for index in range(size)]
+
+                started = time.perf_counter()
+                compute_layout(students, rooms)
+                layout = time.perf_counter() - started
+
+                started = time.perf_counter()
+                compute_layout(students, rooms, separate_groups=True)
+                separated = time.perf_counter() - started
+
+                started = time.perf_counter()
+                result = arrange_session(session, rooms=rooms)
+                full = time.perf_counter() - started
+
+                transaction.set_rollback(True)
+
+            if result.unseated:
+                self.stdout.write(self.style.WARNING(f'{len(result.unseated)} students unseated at size {size}'))
+            self.stdout.write(f'{size:>10} {layout:>9.3f}s {separated:>9.3f}s {full:>9.3f}s')
+
+    # A, B, ..., Z, AA, AB, ...
+    def room_name(self, index):
+        name = ''
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            name = chr(ord('A') + remainder) + name
+        return name
+
+    # one exam and session with ``size`` registered students
+    def seed(self, size):
+        semester = Semester.objects.create(name='Benchmark Semester')
+        subject = Subject.objects.create(name='Benchmark', code='BENCH-SEAT', semester=semester)
+        exam = Exam.objects.create(
+            subject=subject,
+            start_date=date.today(),
+            end_date=date.today(),
+            start_time=clock(9, 0),
+            end_time=clock(12, 0),
+        )
+        session = ExamSession.objects.create(
+            exam=exam,
+            date=date.today(),
+            session_number=1,
+            start_time=exam.start_time,
+            end_time=exam.end_time,
+            max_students=size,
+        )
+        students = Student.objects.bulk_create([
+            Student(
+                username=f'bench-seat-{index}',
+                password='bench',
+                name=f'Bench Student {index}',
+                email=f'bench{index}@example.com',
+                roll_number=f'BS{index:07d}',
+                semester=semester,
+            )
+            for index in range(size)
+        ])
+        StudentExamRegistration.objects.bulk_create([
+            StudentExamRegistration(student=student, exam=exam) for student in students
+        ])
+        return session
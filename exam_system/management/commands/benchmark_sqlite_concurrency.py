@@ -0,0 +1,174 @@
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, time as clock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from exam_system.models import (
+    AnswerSheet, Attendance, Exam, ExamSession, Faculty, Semester, Student, Subject,
+)
+from exam_system.registration import register_student
+from exam_system.reports import PENDING_CHECKING, PENDING_MARKS
+
+WRITER = 'concurrency_writer'
+READER = 'concurrency_reader'
+
+# connection options of the two profiles, for the writer and reader aliases
+PROFILES = {
+    'development': ({}, {}),
+    'production': (settings.SQLITE_PRODUCTION_OPTIONS, settings.SQLITE_REPORTING_OPTIONS),
+}
+
+
+class Command(BaseCommand):
+    help = 'Run dashboard readers against registration/attendance writers on the development and production SQLite profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5.0, help='seconds per profile')
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            handle, path = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(handle)
+            writer_options, reader_options = PROFILES[profile]
+            databases = connections.configure_settings({
+                'default': connections.settings['default'],
+                WRITER: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path, 'OPTIONS': writer_options},
+                READER: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path, 'OPTIONS': reader_options},
+            })
+            connections.settings[WRITER] = databases[WRITER]
+            connections.settings[READER] = databases[READER]
+            try:
+                call_command('migrate', database=WRITER, verbosity=0)
+                fixtures = self.seed(options)
+                self.report(profile, self.run(options, fixtures))
+            finally:
+                for alias in (WRITER, READER):
+                    connections[alias].close()
+                    del connections[alias]
+                    del connections.settings[alias]
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+
+    def seed(self, options):
+        semester = Semester.objects.using(WRITER).create(name='Concurrency')
+        faculty = Faculty.objects.using(WRITER).bulk_create([
+            Faculty(username=f'cf{index}', password='x', name=f'Faculty {index}', email=f'cf{index}@example.com',
+                    department='Load')
+            for index in range(20)
+        ])
+        exams = []
+        for index in range(10):
+            subject = Subject.objects.using(WRITER).create(name=f'Subject {index}', code=f'CC{index}', semester=semester)
+            exams.append(Exam.objects.using(WRITER).create(
+                subject=subject, start_date=date.today(), end_date=date.today(),
+                start_time=clock(9, 0), end_time=clock(12, 0), is_published=True,
+            ))
+        students = Student.objects.using(WRITER).bulk_create([
+            Student(username=f'cs{index}', password='x', name=f'Student {index}', email=f'cs{index}@example.com',
+                    roll_number=f'CS{index:07d}', semester=semester)
+            for index in range(options['students'])
+        ])
+        rng = random.Random(options['seed'])
+        AnswerSheet.objects.using(WRITER).bulk_create([
+            AnswerSheet(student=student, exam=rng.choice(exams), faculty=rng.choice(faculty), is_allocated=True,
+                        is_checked=rng.random() < 0.5)
+            for student in students
+        ])
+        session = ExamSession.objects.using(WRITER).create(
+            exam=exams[0], date=date.today(), session_number=1, start_time=clock(9, 0), end_time=clock(12, 0),
+        )
+        Attendance.objects.using(WRITER).bulk_create([
+            Attendance(student=student, exam_session=session) for student in students
+        ])
+        connections[WRITER].close()
+        return {
+            'exam_ids': [exam.id for exam in exams],
+            'student_ids': [student.id for student in students],
+            'session_id': session.id,
+        }
+
+    def run(self, options, fixtures):
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {'reads': [], 'writes': [], 'errors': Counter()}
+
+        # the dashboard and pending-tasks counts
+        def read():
+            AnswerSheet.objects.using(READER).filter(PENDING_CHECKING).count()
+            AnswerSheet.objects.using(READER).filter(PENDING_MARKS).count()
+            list(Exam.objects.using(READER).filter(is_published=True).values_list('id', 'registered_count'))
+
+        # a registration, or an attendance mark in its own transaction
+        def write(rng):
+            student_id = rng.choice(fixtures['student_ids'])
+            if rng.random() < 0.5:
+                register_student(student_id, rng.choice(fixtures['exam_ids']), using=WRITER)
+            else:
+                with transaction.atomic(using=WRITER):
+                    Attendance.objects.using(WRITER).filter(
+                        exam_session_id=fixtures['session_id'], student_id=student_id
+                    ).update(is_present=True)
+
+        def worker(kind, seed):
+            rng = random.Random(seed)
+            latencies = []
+            errors = Counter()
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    read() if kind == 'reads' else write(rng)
+                except Exception as e:
+                    errors[f'{kind}: {type(e).__name__}: {e}'] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connections[READER if kind == 'reads' else WRITER].close()
+            with lock:
+                totals[kind].extend(latencies)
+                totals['errors'].update(errors)
+
+        threads = [
+            threading.Thread(target=worker, args=('reads', options['seed'] + index))
+            for index in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('writes', options['seed'] + 1000 + index))
+            for index in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        totals['duration'] = options['duration']
+        return totals
+
+    def report(self, profile, totals):
+        self.stdout.write(self.style.MIGRATE_HEADING(profile))
+        for kind in ('reads', 'writes'):
+            latencies = sorted(totals[kind])
+            if not latencies:
+                self.stdout.write(f'  {kind}: none completed')
+                continue
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f'  {kind}: {len(latencies) / totals["duration"]:.0f}/sec, '
+                f'p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms, max {latencies[-1] * 1000:.1f}ms'
+            )
+        failed = sum(totals['errors'].values())
+        self.stdout.write(f'  errors: {failed}')
+        for error, count in totals['errors'].most_common(3):
+            self.stdout.write(f'    {count} x {error[:120]}')
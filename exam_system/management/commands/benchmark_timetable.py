@@ -0,0 +1,52 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from exam_system.timetable import build_conflict_graph, colour, make_slots
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the timetable solver on a synthetic conflict graph (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exams', type=int, default=600)
+        parser.add_argument('--registrations', type=int, default=100000)
+        parser.add_argument('--per-student', type=int, default=5, help='exams each student takes')
+        parser.add_argument('--groups', type=int, default=60, help='programmes whose students share exams')
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--capacity', type=int, default=None, help='seats per slot')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        exams, groups = options['exams'], options['groups']
+        per_student = options['per_student']
+        # each programme has its own block of exams, students sit a sample of them
+        blocks = [list(range(group, exams, groups)) for group in range(groups)]
+        students = options['registrations'] // per_student
+        pairs = [
+            (student, exam)
+            for student in range(students)
+            for exam in rng.sample(blocks[student % groups], min(per_student, len(blocks[student % groups])))
+        ]
+
+        started = time.perf_counter()
+        graph = build_conflict_graph(pairs, range(exams))
+        built = time.perf_counter() - started
+        edges = sum(graph.degree(node) for node in range(exams)) // 2
+
+        slots = make_slots(date.today(), date.today() + timedelta(days=options['days'] - 1))
+        started = time.perf_counter()
+        timetable = colour(graph, slots, options['capacity'])
+        coloured = time.perf_counter() - started
+
+        used = {placement.slot for placement in timetable.placements}
+        same_day = sum(1 for placement in timetable.placements if placement.same_day)
+        self.stdout.write(f'{len(pairs)} registrations, {exams} exams, {edges} conflicting pairs')
+        self.stdout.write(f'graph built in {built:.3f}s, coloured in {coloured:.3f}s')
+        self.stdout.write(
+            f'{len(timetable.placements)} placed in {len(used)} of {len(slots)} slots, '
+            f'{len(timetable.unplaced)} unplaced, {same_day} share a day with a clashing exam'
+        )
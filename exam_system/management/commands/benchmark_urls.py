@@ -0,0 +1,402 @@
+import inspect
+import json
+import re
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from exam_system import urls
+from exam_system.models import (
+    Admin, AnswerSheet, Exam, ExamSession, Faculty, Semester, Student, StudentExamRegistration,
+)
+
+
+# a CSV upload of ``lines``, payloads are built for every request so no upload is read twice
+def upload(name, *lines):
+    return SimpleUploadedFile(name, '\n'.join(lines).encode())
+
+
+# (route name, label, role, method, payload) -- payload builders take the fixture ids,
+# the label of a POST is the ``action`` it posts
+ROUTES = [
+    ('home', '', None, 'get', None),
+    ('login', '', None, 'get', None),
+    ('login', '', None, 'post', lambda ids: {
+        'username': ids['student_username'], 'password': ids['student_password'], 'user_type': 'student',
+    }),
+    ('logout', '', 'student', 'get', None),
+
+    ('admin_dashboard', '', 'admin', 'get', None),
+    ('admin_exam_setup', '', 'admin', 'get', None),
+    ('admin_timetable', '', 'admin', 'get', None),
+    ('admin_timetable', '', 'admin', 'post', lambda ids: {
+        'start_date': ids['date'], 'end_date': ids['period_end'], 'semester': ids['semester'],
+    }),
+    ('admin_timetable', 'apply', 'admin', 'post', lambda ids: {
+        'start_date': ids['date'], 'end_date': ids['period_end'], 'semester': ids['semester'], 'action': 'apply',
+    }),
+    ('admin_import_timetable', '', 'admin', 'get', None),
+    ('admin_import_timetable', '', 'admin', 'post', lambda ids: {
+        'file': upload('timetable.csv', 'subject_code,start_date,start_time,end_time', f'{ids["subject_code"]},{ids["period_end"]},07:00,08:00'),
+    }),
+    ('admin_import_timetable', 'dry_run', 'admin', 'post', lambda ids: {
+        'file': upload('timetable.csv', 'subject_code,start_date,start_time,end_time', f'{ids["subject_code"]},{ids["period_end"]},07:00,08:00'),
+        'dry_run': 'on',
+    }),
+    ('admin_plan_sessions', '', 'admin', 'get', None),
+    ('admin_plan_sessions', '', 'admin', 'post', lambda ids: {'max_students': 40, 'semester': ids['semester']}),
+    ('admin_plan_sessions', 'apply', 'admin', 'post', lambda ids: {
+        'max_students': 40, 'semester': ids['semester'], 'action': 'apply',
+    }),
+    ('admin_registration_clashes', '', 'admin', 'get', None),
+    ('admin_exam_setup', '', 'admin', 'post', lambda ids: {
+        'subject': ids['subject'], 'start_date': ids['date'], 'end_date': ids['date'],
+        'start_time': '09:00', 'end_time': '12:00', 'total_marks': 100,
+    }),
+    ('admin_publish_schedule', '', 'admin', 'get', None),
+    ('admin_publish_schedule', '', 'admin', 'post', lambda ids: {'exam_id': ids['exam']}),
+    ('admin_attendance_sheets', '', 'admin', 'get', None),
+    ('admin_attendance_sheets', 'create', 'admin', 'post', lambda ids: {
+        'exam_id': ids['exam'], 'date': ids['date'], 'session_number': 1,
+    }),
+    ('admin_attendance_sheets', 'save', 'admin', 'post', lambda ids: {
+        'session_id': ids['session'], **{f'attendance_{student_id}': 'on' for student_id in ids['present']},
+    }),
+    ('admin_seating_arrangement', '', 'admin', 'get', None),
+    ('admin_seating_arrangement', '', 'admin', 'post', lambda ids: {'session_id': ids['session']}),
+    ('admin_allocate_papers', '', 'admin', 'get', None),
+    ('admin_allocate_papers', '', 'admin', 'post', lambda ids: {
+        'exam_id': ids['exam'], 'faculty_ids': ids['faculty_pool'],
+    }),
+    ('admin_allocate_papers', 'open_pool', 'admin', 'post', lambda ids: {'action': 'open_pool', 'exam_id': ids['exam']}),
+    ('admin_pending_tasks', '', 'admin', 'get', None),
+    ('admin_manage_semesters', '', 'admin', 'get', None),
+    ('admin_manage_semesters', 'add', 'admin', 'post', lambda ids: {'action': 'add', 'name': 'Benchmark Semester'}),
+    ('admin_manage_semesters', 'edit', 'admin', 'post', lambda ids: {
+        'action': 'edit', 'semester_id': ids['semester'], 'name': ids['semester_name'],
+    }),
+    ('admin_manage_semesters', 'delete', 'admin', 'post', lambda ids: {'action': 'delete', 'semester_id': ids['semester']}),
+    ('admin_manage_semesters', 'toggle', 'admin', 'post', lambda ids: {'action': 'toggle', 'semester_id': ids['semester']}),
+    ('admin_manage_semesters', 'bulk', 'admin', 'post', lambda ids: {
+        'action': 'bulk', 'bulk_action': 'deactivate', 'ids': [ids['semester']],
+    }),
+    ('admin_manage_subjects', '', 'admin', 'get', None),
+    ('admin_manage_subjects', 'add', 'admin', 'post', lambda ids: {
+        'action': 'add', 'name': 'Benchmark Subject', 'code': 'BENCH-NEW', 'semester_id': ids['semester'],
+    }),
+    ('admin_manage_subjects', 'edit', 'admin', 'post', lambda ids: {
+        'action': 'edit', 'subject_id': ids['subject'], 'name': 'Benchmark Subject', 'code': ids['subject_code'],
+        'semester_id': ids['semester'],
+    }),
+    ('admin_manage_subjects', 'delete', 'admin', 'post', lambda ids: {'action': 'delete', 'subject_id': ids['subject']}),
+    ('admin_manage_subjects', 'toggle', 'admin', 'post', lambda ids: {'action': 'toggle', 'subject_id': ids['subject']}),
+    ('admin_manage_subjects', 'bulk', 'admin', 'post', lambda ids: {
+        'action': 'bulk', 'bulk_action': 'edit', 'bulk_semester_id': ids['semester'], 'ids': [ids['subject']],
+    }),
+    ('admin_manage_faculty', '', 'admin', 'get', None),
+    ('admin_manage_faculty', 'add', 'admin', 'post', lambda ids: {
+        'action': 'add', 'username': 'bench-new-faculty', 'password': 'bench', 'name': 'Benchmark Faculty',
+        'email': 'bench-new-faculty@example.com', 'department': 'Benchmark',
+    }),
+    ('admin_manage_faculty', 'edit', 'admin', 'post', lambda ids: {
+        'action': 'edit', 'faculty_id': ids['faculty'], 'username': ids['faculty_username'], 'password': '',
+        'name': 'Benchmark Faculty', 'email': ids['faculty_email'], 'department': 'Benchmark',
+    }),
+    ('admin_manage_faculty', 'delete', 'admin', 'post', lambda ids: {'action': 'delete', 'faculty_id': ids['faculty']}),
+    ('admin_manage_faculty', 'toggle', 'admin', 'post', lambda ids: {'action': 'toggle', 'faculty_id': ids['faculty']}),
+    ('admin_manage_faculty', 'bulk', 'admin', 'post', lambda ids: {
+        'action': 'bulk', 'bulk_action': 'edit', 'bulk_department': 'Benchmark', 'ids': ids['faculty_pool'],
+    }),
+    ('admin_manage_students', '', 'admin', 'get', None),
+    ('admin_manage_students', 'add', 'admin', 'post', lambda ids: {
+        'action': 'add', 'username': 'bench-new-student', 'password': 'bench', 'name': 'Benchmark Student',
+        'email': 'bench-new-student@example.com', 'roll_number': 'BENCH-NEW', 'semester_id': ids['semester'],
+    }),
+    ('admin_manage_students', 'edit', 'admin', 'post', lambda ids: {
+        'action': 'edit', 'student_id': ids['student'], 'username': ids['student_username'], 'password': '',
+        'name': 'Benchmark Student', 'email': ids['student_email'], 'roll_number': ids['roll_number'],
+        'semester_id': ids['semester'],
+    }),
+    ('admin_manage_students', 'delete', 'admin', 'post', lambda ids: {'action': 'delete', 'student_id': ids['student']}),
+    ('admin_manage_students', 'toggle', 'admin', 'post', lambda ids: {'action': 'toggle', 'student_id': ids['student']}),
+    ('admin_manage_students', 'bulk', 'admin', 'post', lambda ids: {
+        'action': 'bulk', 'bulk_action': 'deactivate', 'ids': ids['present'],
+    }),
+    ('admin_import_accounts', '', 'admin', 'get', None),
+    ('admin_import_accounts', '', 'admin', 'post', lambda ids: {
+        'kind': 'students',
+        'file': upload(
+            'students.csv', 'username,password,name,email,roll_number,semester',
+            f'bench-import,bench,Benchmark Import,bench-import@example.com,BENCH-IMPORT,{ids["semester_name"]}',
+        ),
+    }),
+    ('admin_import_accounts', 'dry_run', 'admin', 'post', lambda ids: {
+        'kind': 'faculty', 'dry_run': 'on',
+        'file': upload(
+            'faculty.csv', 'username,password,name,email,department',
+            'bench-import,bench,Benchmark Import,bench-import@example.com,Benchmark',
+        ),
+    }),
+    ('admin_query_stats', '', 'admin', 'get', None),
+    ('admin_search', '', 'admin', 'get', lambda ids: {'q': ids['student_username'][:4]}),
+    ('admin_analytics', '', 'admin', 'get', lambda ids: {'semester': ids['semester']}),
+    ('admin_analytics_data', '', 'admin', 'get', lambda ids: {'exam': ids['exam']}),
+
+    ('faculty_dashboard', '', 'faculty', 'get', None),
+    ('faculty_check_papers', '', 'faculty', 'get', None),
+    ('faculty_check_papers', '', 'faculty', 'post', lambda ids: {
+        f'marks_{ids["unchecked_paper"]}': 50, f'remarks_{ids["unchecked_paper"]}': 'benchmark',
+    }),
+    ('faculty_enter_marks', '', 'faculty', 'get', None),
+    ('faculty_enter_marks', '', 'faculty', 'post', lambda ids: {f'marks_{ids["unmarked_paper"]}': 40}),
+    ('faculty_claim_papers', '', 'faculty', 'get', None),
+    ('faculty_claim_papers', '', 'faculty', 'post', lambda ids: {'exam_id': ids['exam'], 'count': 5}),
+    ('faculty_upload_marks', '', 'faculty', 'get', None),
+    ('faculty_upload_marks', '', 'faculty', 'post', lambda ids: {
+        'file': upload('marks.csv', 'roll_number,subject_code,marks', f'{ids["paper_roll_number"]},{ids["paper_subject_code"]},45'),
+    }),
+    ('faculty_upload_marks', 'report', 'faculty', 'post', lambda ids: {
+        'file': upload('marks.csv', 'roll_number,subject_code,marks', f'{ids["paper_roll_number"]},{ids["paper_subject_code"]},45'),
+        'report': 'on',
+    }),
+
+    ('student_dashboard', '', 'student', 'get', None),
+    ('student_register_exam', '', 'student', 'get', None),
+    ('student_register_exam', '', 'student', 'post', lambda ids: {'exam_id': ids['exam']}),
+    ('student_view_schedule', '', 'student', 'get', None),
+    ('student_view_seating', '', 'student', 'get', None),
+    ('student_view_results', '', 'student', 'get', None),
+
+    ('create_sample_data', '', 'admin', 'get', None),
+]
+
+
+def route_key(name, label, method):
+    key = f'{method.upper()} {name}'
+    return f'{key} [{label}]' if label else key
+
+
+# the literals a view compares the posted ``action`` with
+ACTION_PATTERN = re.compile(r"\baction(?:'\))? == '(\w+)'")
+
+
+def uncovered_routes():
+    """
+    The keys of the GETs, and of the POST actions a view handles (any POST
+    for a view without actions), that have no entry in ``ROUTES``.
+    """
+    covered = {(name, method, label) for name, label, _, method, _ in ROUTES}
+    posted = {name for name, _, _, method, _ in ROUTES if method == 'post'}
+    missing = []
+    for pattern in urls.urlpatterns:
+        if not pattern.name:
+            continue
+        if (pattern.name, 'get', '') not in covered:
+            missing.append(route_key(pattern.name, '', 'get'))
+        source = inspect.getsource(pattern.callback)
+        if "request.method == 'POST'" not in source:
+            continue
+        actions = ACTION_PATTERN.findall(source)
+        missing += [route_key(pattern.name, action, 'post') for action in actions if (pattern.name, 'post', action) not in covered]
+        if not actions and pattern.name not in posted:
+            missing.append(route_key(pattern.name, '', 'post'))
+    return missing
+
+
+# nearest-rank percentile of an already sorted list
+def percentile(values, fraction):
+    index = max(0, min(len(values) - 1, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = 'Measure latency, query count and response size of every route against the current database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', default='benchmark_report.json')
+        parser.add_argument('--baseline', help='report to compare against, regressions fail the run')
+        parser.add_argument('--threshold', type=float, default=0.25, help='allowed p95 latency growth (0.25 = 25%%)')
+        parser.add_argument('--query-threshold', type=int, default=0, help='allowed growth in query count')
+        parser.add_argument('--only', nargs='+', help='benchmark only these route names')
+
+    def handle(self, *args, **options):
+        missing = uncovered_routes()
+        if missing:
+            raise CommandError(f'Routes without a benchmark: {", ".join(missing)}')
+
+        ids = self.fixtures()
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, label, role, method, payload in ROUTES:
+                if options['only'] and name not in options['only']:
+                    continue
+                key = route_key(name, label, method)
+                try:
+                    if payload:
+                        payload(ids)  # every fixture it needs exists
+                except KeyError as e:
+                    self.stdout.write(self.style.WARNING(f'{key}: skipped, no fixture for {e}'))
+                    continue
+                results[key] = self.measure(name, role, method, payload, ids, options)
+                self.report_line(key, results[key])
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'iterations': options['iterations'],
+            'routes': results,
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        self.stdout.write(f'Report written to {options["output"]}')
+
+        errors = [key for key, result in results.items() if result['errors']]
+        regressions = self.compare(results, options) if options['baseline'] else []
+        if errors or regressions:
+            raise CommandError(
+                f'{len(errors)} routes failed ({", ".join(errors) or "none"}), '
+                f'{len(regressions)} regressions ({", ".join(regressions) or "none"})'
+            )
+        self.stdout.write(self.style.SUCCESS('All routes within budget'))
+
+    # ids used by the POST payloads and the role logins
+    def fixtures(self):
+        ids = {
+            'date': (date.today() + timedelta(days=30)).isoformat(),
+            'period_end': (date.today() + timedelta(days=44)).isoformat(),
+        }
+
+        admin = Admin.objects.filter(is_active=True).first()
+        faculty = Faculty.objects.filter(is_active=True).annotate(
+            pending=Count('answersheet', filter=Q(answersheet__is_allocated=True, answersheet__is_checked=False))
+        ).order_by('-pending').first()
+        registration = StudentExamRegistration.objects.filter(
+            exam__is_published=True, student__is_active=True
+        ).select_related('student').first()
+        if not (admin and faculty and registration):
+            raise CommandError('Seed the database first (createadmin and generate_load_data)')
+
+        ids['admin'] = admin.id
+        ids['faculty'] = faculty.id
+        ids['faculty_username'] = faculty.username
+        ids['faculty_email'] = faculty.email
+        ids['faculty_pool'] = list(Faculty.objects.filter(is_active=True).values_list('id', flat=True)[:10])
+        ids['student'] = registration.student.id
+        ids['student_username'] = registration.student.username
+        ids['student_password'] = registration.student.password
+        ids['student_email'] = registration.student.email
+        ids['roll_number'] = registration.student.roll_number
+        ids['exam'] = registration.exam_id
+        ids['subject'], ids['subject_code'] = Exam.objects.filter(id=registration.exam_id).values_list(
+            'subject_id', 'subject__code'
+        ).get()
+        ids['semester'] = registration.student.semester_id
+        ids['semester_name'] = Semester.objects.values_list('name', flat=True).get(id=ids['semester'])
+        ids['present'] = list(StudentExamRegistration.objects.filter(
+            exam_id=registration.exam_id
+        ).values_list('student_id', flat=True)[:50])
+
+        session = ExamSession.objects.filter(exam_id=registration.exam_id).first()
+        if session:
+            ids['session'] = session.id
+        unchecked = AnswerSheet.objects.filter(faculty=faculty, is_allocated=True, is_checked=False).first()
+        if unchecked:
+            ids['unchecked_paper'] = unchecked.id
+        paper = AnswerSheet.objects.filter(faculty=faculty, is_allocated=True).values_list(
+            'student__roll_number', 'exam__subject__code'
+        ).first()
+        if paper:
+            ids['paper_roll_number'], ids['paper_subject_code'] = paper
+        unmarked = AnswerSheet.objects.filter(faculty=faculty, is_checked=True, marks_obtained__isnull=True).first()
+        if unmarked:
+            ids['unmarked_paper'] = unmarked.id
+        return ids
+
+    def login(self, client, role, ids):
+        session = client.session
+        session.clear()
+        if role:
+            user = {'admin': Admin, 'faculty': Faculty, 'student': Student}[role].objects.get(id=ids[role])
+            session['user_type'] = role
+            session['user_id'] = user.id
+            session['username'] = user.username
+        session.save()
+
+    def measure(self, name, role, method, payload, ids, options):
+        client = Client(raise_request_exception=False)
+        url = reverse(name)
+        timings = []
+        queries = []
+        sizes = []
+        errors = 0
+        for iteration in range(options['warmup'] + options['iterations']):
+            self.login(client, role, ids)
+            # every request runs in a transaction that is rolled back
+            with transaction.atomic(), ExitStack() as stack:
+                # every alias, reporting views read from the reporting connection;
+                # the query log is a bounded deque, start each request empty
+                captured = []
+                for alias in connections:
+                    connections[alias].queries_log.clear()
+                    captured.append(stack.enter_context(CaptureQueriesContext(connections[alias])))
+                started = time.perf_counter()
+                response = getattr(client, method)(url, payload(ids) if payload else None)
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            if iteration < options['warmup']:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(sum(len(context) for context in captured))
+            sizes.append(len(response.content))
+            if response.status_code >= 400:
+                errors += 1
+
+        timings.sort()
+        return {
+            'status': response.status_code,
+            'errors': errors,
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': max(queries),
+            'bytes': max(sizes),
+        }
+
+    def report_line(self, key, result):
+        line = (
+            f'{key:<50} p50 {result["p50_ms"]:>8.1f}ms  p95 {result["p95_ms"]:>8.1f}ms  '
+            f'p99 {result["p99_ms"]:>8.1f}ms  {result["queries"]:>5} queries  {result["bytes"]:>9} bytes'
+        )
+        if result['errors']:
+            self.stdout.write(self.style.ERROR(f'{line}  status {result["status"]}'))
+        else:
+            self.stdout.write(line)
+
+    def compare(self, results, options):
+        with open(options['baseline']) as baseline_file:
+            baseline = json.load(baseline_file)['routes']
+        regressions = []
+        for key, result in results.items():
+            before = baseline.get(key)
+            if not before:
+                continue
+            slower = result['p95_ms'] > before['p95_ms'] * (1 + options['threshold'])
+            more_queries = result['queries'] > before['queries'] + options['query_threshold']
+            if slower or more_queries:
+                regressions.append(key)
+                self.stdout.write(self.style.ERROR(
+                    f'{key}: p95 {before["p95_ms"]:.1f}ms -> {result["p95_ms"]:.1f}ms, '
+                    f'queries {before["queries"]} -> {result["queries"]}'
+                ))
+        return regressions
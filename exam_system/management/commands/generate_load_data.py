@@ -0,0 +1,213 @@
+import math
+import random
+import time
+from datetime import date, time as clock, timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from exam_system.models import (
+    AnswerSheet, Attendance, Exam, ExamSession, Faculty, SeatingArrangement,
+    Semester, Student, StudentExamRegistration, Subject,
+)
+from exam_system.registration import sync_registered_counts
+from exam_system.search import rebuild_index, search_available
+from exam_system.stats import recompute_stats
+
+SCALES = {
+    'small': {'semesters': 2, 'subjects': 5, 'faculty': 20, 'students': 1000, 'registrations': 3},
+    'medium': {'semesters': 4, 'subjects': 10, 'faculty': 80, 'students': 10000, 'registrations': 4},
+    'large': {'semesters': 8, 'subjects': 25, 'faculty': 400, 'students': 100000, 'registrations': 5},
+    'xlarge': {'semesters': 10, 'subjects': 60, 'faculty': 600, 'students': 200000, 'registrations': 6},
+}
+
+DEPARTMENTS = ['Computer Science', 'Mathematics', 'Physics', 'Electronics', 'Mechanical']
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'David', 'Eve', 'Frank', 'Grace', 'Heidi', 'Ivan', 'Judy']
+LAST_NAMES = ['Johnson', 'Smith', 'Patel', 'Garcia', 'Chen', 'Kumar', 'Brown', 'Singh', 'Lee', 'Shah']
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Generate production-scale synthetic data with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='load', help='namespace for usernames, roll numbers and codes')
+        parser.add_argument('--semesters', type=int)
+        parser.add_argument('--subjects', type=int, help='subjects (and exams) per semester')
+        parser.add_argument('--faculty', type=int)
+        parser.add_argument('--students', type=int)
+        parser.add_argument('--registrations', type=int, help='exam registrations per student')
+        parser.add_argument('--session-size', type=int, default=250)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        volumes = dict(SCALES[options['scale']])
+        for name in volumes:
+            if options[name] is not None:
+                volumes[name] = options[name]
+        if volumes['registrations'] > volumes['subjects']:
+            raise CommandError('Registrations per student cannot exceed subjects per semester')
+        prefix = options['prefix']
+        if Student.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Data with prefix "{prefix}" already exists, pick another --prefix')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            semesters = self.insert(Semester, (
+                Semester(name=f'{prefix} Semester {index + 1}') for index in range(volumes['semesters'])
+            ))
+            subjects = self.insert(Subject, (
+                Subject(
+                    name=f'{prefix} Subject {semester_index + 1}.{index + 1}',
+                    code=f'{prefix.upper()}{semester_index + 1:03d}{index + 1:03d}',
+                    semester=semester,
+                )
+                for semester_index, semester in enumerate(semesters)
+                for index in range(volumes['subjects'])
+            ))
+            faculty_ids = [faculty.id for faculty in self.insert(Faculty, (
+                Faculty(
+                    username=f'{prefix}-f{index}',
+                    password='faculty123',
+                    name=f'Dr. {self.person(index)}',
+                    email=f'{prefix}.f{index}@university.edu',
+                    department=DEPARTMENTS[index % len(DEPARTMENTS)],
+                )
+                for index in range(volumes['faculty'])
+            ))]
+            students = [(student.id, student.semester_id) for student in self.insert(Student, (
+                Student(
+                    username=f'{prefix}-s{index}',
+                    password='student123',
+                    name=self.person(index),
+                    email=f'{prefix}.s{index}@university.edu',
+                    roll_number=f'{prefix.upper()}{index:08d}',
+                    semester=semesters[index % len(semesters)],
+                )
+                for index in range(volumes['students'])
+            ))]
+
+            first_day = date.today() + timedelta(days=30)
+            exams = self.insert(Exam, (
+                Exam(
+                    subject=subject,
+                    start_date=first_day + timedelta(days=index // 2),
+                    end_date=first_day + timedelta(days=index // 2),
+                    start_time=clock(9, 0) if index % 2 == 0 else clock(14, 0),
+                    end_time=clock(12, 0) if index % 2 == 0 else clock(17, 0),
+                    total_marks=100,
+                    is_published=True,
+                )
+                for index, subject in enumerate(subjects)
+            ))
+            exams_by_semester = {}
+            for exam in exams:
+                exams_by_semester.setdefault(exam.subject.semester_id, []).append(exam)
+
+            # every student takes a sample of the exams of their semester
+            students_by_exam = {exam.id: [] for exam in exams}
+            for student_id, semester_id in students:
+                for exam in self.rng.sample(exams_by_semester[semester_id], volumes['registrations']):
+                    students_by_exam[exam.id].append(student_id)
+            self.insert(StudentExamRegistration, (
+                StudentExamRegistration(student_id=student_id, exam_id=exam_id)
+                for exam_id, student_ids in students_by_exam.items()
+                for student_id in student_ids
+            ), keep=False)
+
+            session_size = options['session_size']
+            sessions = self.insert(ExamSession, (
+                ExamSession(
+                    exam=exam,
+                    date=exam.start_date,
+                    session_number=number + 1,
+                    start_time=exam.start_time,
+                    end_time=exam.end_time,
+                    max_students=session_size,
+                )
+                for exam in exams
+                for number in range(math.ceil(len(students_by_exam[exam.id]) / session_size))
+            ))
+            sessions_by_exam = {}
+            for session in sessions:
+                sessions_by_exam.setdefault(session.exam_id, []).append(session)
+
+            seated = [
+                (session, seat, student_id)
+                for exam_id, student_ids in students_by_exam.items()
+                for seat, student_id in enumerate(student_ids)
+                for session in [sessions_by_exam[exam_id][seat // session_size]]
+            ]
+            self.insert(SeatingArrangement, (
+                SeatingArrangement(
+                    student_id=student_id,
+                    exam_session=session,
+                    seat_number=f'A{seat % session_size + 1:03d}',
+                    row_number=seat % session_size // 10 + 1,
+                    column_number=seat % 10 + 1,
+                )
+                for session, seat, student_id in seated
+            ), keep=False)
+
+            present = [(session, student_id) for session, seat, student_id in seated if self.rng.random() < 0.92]
+            present_ids = set(present)
+            self.insert(Attendance, (
+                Attendance(student_id=student_id, exam_session=session, is_present=(session, student_id) in present_ids)
+                for session, seat, student_id in seated
+            ), keep=False)
+
+            self.insert(AnswerSheet, (
+                self.answer_sheet(session.exam_id, student_id, faculty_ids) for session, student_id in present
+            ), keep=False)
+
+            recompute_stats()
+            sync_registered_counts()
+            if search_available():
+                rebuild_index()
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {options["scale"]} data set in {time.perf_counter() - started:.1f}s'))
+
+    # bulk insert ``objects`` in batches, returning the saved objects when ``keep``
+    def insert(self, model, objects, keep=True):
+        saved = []
+        count = 0
+        started = time.perf_counter()
+        for batch in batched(objects, self.batch_size):
+            model.objects.bulk_create(batch)
+            count += len(batch)
+            if keep:
+                saved.extend(batch)
+        self.stdout.write(f'{model.__name__}: {count} rows in {time.perf_counter() - started:.2f}s')
+        return saved
+
+    def person(self, index):
+        return f'{FIRST_NAMES[index % len(FIRST_NAMES)]} {LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]} {index}'
+
+    # mostly allocated, most of those checked, a few checked without marks yet
+    def answer_sheet(self, exam_id, student_id, faculty_ids):
+        sheet = AnswerSheet(student_id=student_id, exam_id=exam_id)
+        if faculty_ids and self.rng.random() < 0.9:
+            sheet.faculty_id = self.rng.choice(faculty_ids)
+            sheet.is_allocated = True
+            if self.rng.random() < 0.6:
+                sheet.is_checked = True
+                sheet.checked_at = self.now
+                if self.rng.random() < 0.95:
+                    sheet.marks_obtained = max(0, min(100, round(self.rng.gauss(62, 15))))
+        return sheet
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exam_system.importer import BATCH_SIZE, SPECS, ImportFormatError, import_accounts, write_error_report
+
+
+class Command(BaseCommand):
+    help = 'Bulk import student or faculty accounts from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=SPECS)
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='validate only, import nothing')
+        parser.add_argument('--errors', help='write the rejected rows to this CSV file')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = import_accounts(
+                    options['kind'], stream, batch_size=options['batch_size'], dry_run=options['dry_run']
+                )
+        except (OSError, ImportFormatError, UnicodeDecodeError) as e:
+            raise CommandError(f'Could not read {options["path"]}: {e}')
+        elapsed = time.perf_counter() - started
+
+        verb = 'valid' if options['dry_run'] else 'imported'
+        self.stdout.write(
+            f'{result.processed} rows read, {result.imported} {verb}, {len(result.errors)} rejected '
+            f'in {elapsed:.2f}s ({result.processed / elapsed:.0f} rows/sec)'
+        )
+        if options['errors']:
+            with open(options['errors'], 'w', newline='') as report:
+                write_error_report(result.errors, report)
+            self.stdout.write(f'Error report written to {options["errors"]}')
+        else:
+            for error in result.errors[:20]:
+                self.stdout.write(self.style.ERROR(f'line {error.line} ({error.username}): {error.message}'))
+            if len(result.errors) > 20:
+                self.stdout.write(f'... {len(result.errors) - 20} more, use --errors to write them all')
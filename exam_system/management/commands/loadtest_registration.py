@@ -0,0 +1,145 @@
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, time as clock, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count
+
+from exam_system.models import Exam, Semester, Student, StudentExamRegistration, Subject
+from exam_system.registration import ALREADY_REGISTERED, CLASH, FULL, REGISTERED, register_student
+
+ALIAS = 'registration_loadtest'
+
+
+class Command(BaseCommand):
+    help = 'Concurrent registration load test against a throwaway WAL-mode SQLite file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--exams', type=int, default=5)
+        parser.add_argument('--capacity', type=int, default=300, help='per-exam capacity, 0 for unlimited')
+        parser.add_argument('--attempts', type=int, default=3, help='registration attempts per student')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        databases = connections.configure_settings({
+            'default': connections.settings['default'],
+            ALIAS: {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': path,
+                'OPTIONS': {
+                    'timeout': 30,
+                    'transaction_mode': 'IMMEDIATE',
+                    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                },
+            },
+        })
+        connections.settings[ALIAS] = databases[ALIAS]
+
+        try:
+            call_command('migrate', database=ALIAS, verbosity=0)
+            exam_ids, student_ids = self.seed(options)
+            self.run(options, exam_ids, student_ids)
+        finally:
+            connections[ALIAS].close()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def seed(self, options):
+        semester = Semester.objects.using(ALIAS).create(name='Load Test')
+        exams = []
+        for index in range(options['exams']):
+            # a day per exam so that they don't clash with each other
+            day = date.today() + timedelta(days=index)
+            subject = Subject.objects.using(ALIAS).create(name=f'Load {index}', code=f'LOAD{index}', semester=semester)
+            exams.append(Exam.objects.using(ALIAS).create(
+                subject=subject,
+                start_date=day,
+                end_date=day,
+                start_time=clock(9, 0),
+                end_time=clock(12, 0),
+                is_published=True,
+                capacity=options['capacity'] or None,
+            ))
+        students = Student.objects.using(ALIAS).bulk_create([
+            Student(
+                username=f'load{index}',
+                password='load',
+                name=f'Load Student {index}',
+                email=f'load{index}@example.com',
+                roll_number=f'LD{index:07d}',
+                semester=semester,
+            )
+            for index in range(options['students'])
+        ])
+        return [exam.id for exam in exams], [student.id for student in students]
+
+    def run(self, options, exam_ids, student_ids):
+        rng = random.Random(options['seed'])
+        attempts = [
+            (student_id, rng.choice(exam_ids))
+            for student_id in student_ids
+            for _ in range(options['attempts'])
+        ]
+        rng.shuffle(attempts)
+        chunks = [attempts[index::options['threads']] for index in range(options['threads'])]
+
+        results = Counter()
+        errors = Counter()
+        lock = threading.Lock()
+
+        def worker(chunk):
+            local = Counter()
+            failures = Counter()
+            for student_id, exam_id in chunk:
+                try:
+                    local[register_student(student_id, exam_id, using=ALIAS)] += 1
+                except Exception as e:
+                    failures[type(e).__name__] += 1
+            connections[ALIAS].close()
+            with lock:
+                results.update(local)
+                errors.update(failures)
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = len(attempts)
+        failed = sum(errors.values())
+        self.stdout.write(f'{total} attempts on {options["threads"]} threads in {elapsed:.2f}s')
+        self.stdout.write(f'throughput: {total / elapsed:.0f} attempts/sec, {results[REGISTERED] / elapsed:.0f} registrations/sec')
+        self.stdout.write(
+            f'registered: {results[REGISTERED]}, already registered: {results[ALREADY_REGISTERED]}, '
+            f'full: {results[FULL]}, clash: {results[CLASH]}'
+        )
+        self.stdout.write(f'errors: {failed} ({100 * failed / total:.2f}%) {dict(errors)}')
+
+        # the counters must match the rows and never exceed capacity
+        rows = dict(StudentExamRegistration.objects.using(ALIAS).values('exam').annotate(
+            total=Count('id')
+        ).values_list('exam', 'total'))
+        consistent = True
+        for exam in Exam.objects.using(ALIAS).all():
+            actual = rows.get(exam.id, 0)
+            if exam.registered_count != actual or (exam.capacity and actual > exam.capacity):
+                consistent = False
+                self.stdout.write(self.style.ERROR(
+                    f'exam {exam.id}: counter {exam.registered_count}, rows {actual}, capacity {exam.capacity}'
+                ))
+        if consistent and not failed:
+            self.stdout.write(self.style.SUCCESS('Counters consistent, no errors'))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from exam_system.search import create_index, rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of students, faculty and subjects'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search_available(using):
+            raise CommandError('The search index needs SQLite with FTS5, other databases search through the ORM')
+
+        started = time.perf_counter()
+        with transaction.atomic(using=using):
+            create_index(using)
+            total = rebuild_index(using)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} documents in {time.perf_counter() - started:.2f}s'))
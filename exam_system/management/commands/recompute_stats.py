@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from exam_system.registration import sync_registered_counts
+from exam_system.stats import get_stats, recompute_stats
+
+class Command(BaseCommand):
+    help = 'Recount the dashboard counters and exam registration counts from the source tables'
+
+    def handle(self, *args, **options):
+        before = get_stats()
+        values = recompute_stats()
+        for name, value in values.items():
+            drift = value - before[name]
+            line = f'{name}: {value}'
+            if drift:
+                line += f' (drift {drift:+d})'
+            self.stdout.write(line)
+        self.stdout.write(f'exam registration counts repaired: {sync_registered_counts()}')
+        self.stdout.write(self.style.SUCCESS('Dashboard counters recomputed'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from exam_system.claims import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Put claimed answer sheets still unchecked after their lease back in the evaluation pool'
+
+    def handle(self, *args, **options):
+        released = release_expired()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired claims'))
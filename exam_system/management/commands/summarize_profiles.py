@@ -0,0 +1,52 @@
+import os
+import pstats
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exam_system.models import Admin
+from exam_system.profiling import TOKEN_HEADER, make_profile_token, profile_dir, view_name_of
+
+
+class Command(BaseCommand):
+    help = 'Summarize the top cumulative functions per view from the sampled request profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help='profile directory, PROFILING_DIR by default')
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--view', nargs='+', help='summarize only these view names')
+        parser.add_argument('--issue-token', metavar='ADMIN_USERNAME',
+                            help=f'print a signed {TOKEN_HEADER} header value instead')
+
+    def handle(self, *args, **options):
+        if options['issue_token']:
+            admin = Admin.objects.filter(username=options['issue_token'], is_active=True).first()
+            if admin is None:
+                raise CommandError(f'No active admin "{options["issue_token"]}"')
+            self.stdout.write(f'{TOKEN_HEADER}: {make_profile_token(admin.id)}')
+            return
+
+        directory = Path(options['dir']) if options['dir'] else profile_dir()
+        if not directory.is_dir():
+            raise CommandError(f'No profiles in {directory}')
+
+        dumps = {}
+        for path in sorted(directory.glob('*.prof')):
+            dumps.setdefault(view_name_of(path), []).append(str(path))
+        if options['view']:
+            dumps = {name: paths for name, paths in dumps.items() if name in options['view']}
+        if not dumps:
+            raise CommandError(f'No profiles in {directory}')
+
+        for name, paths in sorted(dumps.items()):
+            stats = pstats.Stats(*paths)
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:options['top']]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {len(paths)} requests, {stats.total_tt * 1000 / len(paths):.1f}ms average'
+            ))
+            self.stdout.write(f'{"calls":>10} {"tottime":>10} {"cumtime":>10}  function')
+            for (filename, line, function), (_, calls, own_time, total_time, _) in rows:
+                self.stdout.write(
+                    f'{calls:>10} {own_time * 1000 / len(paths):>8.2f}ms {total_time * 1000 / len(paths):>8.2f}ms  '
+                    f'{function} ({os.path.basename(filename)}:{line})'
+                )
@@ -0,0 +1,107 @@
+"""
+Batch marks entry for the faculty marking pages.
+
+A whole grid of marks (and remarks) is validated against each paper's
+``Exam.total_marks`` and its owner, and the valid rows are written with one
+``bulk_update`` in one transaction.  Invalid rows are reported per paper and
+do not hold back the valid ones.
+"""
+from collections import Counter
+from typing import NamedTuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import stats
+from .db import id_list
+from .models import AnswerSheet
+
+
+class Mode(NamedTuple):
+    pending: str  # the stats metric of the papers this page fills in
+    fields: tuple
+    done: str
+
+
+MODES = {
+    # faculty_check_papers: marks and remarks, and the paper becomes checked
+    'check': Mode('pending_checking', ('marks_obtained', 'remarks', 'is_checked', 'checked_at'), 'already checked'),
+    # faculty_enter_marks: marks for papers checked without them
+    'marks': Mode('pending_marks', ('marks_obtained',), 'already has marks'),
+}
+
+
+class Entry(NamedTuple):
+    marks: str
+    remarks: str
+
+
+class MarkError(NamedTuple):
+    paper_id: int
+    message: str
+
+
+class MarkingResult(NamedTuple):
+    saved: int
+    errors: list
+
+
+def parse_grid(data):
+    """
+    Paper id -> ``Entry`` from the ``marks_<id>`` / ``remarks_<id>`` fields
+    of a posted grid.  Rows left blank are skipped.
+    """
+    entries = {}
+    for key, value in data.items():
+        prefix, _, paper_id = key.partition('_')
+        if prefix == 'marks' and paper_id.isdigit() and value.strip():
+            entries[int(paper_id)] = Entry(value.strip(), data.get(f'remarks_{paper_id}', '').strip())
+    return entries
+
+
+def save_marks(faculty, entries, mode='check'):
+    """
+    Validate and save ``entries`` (paper id -> ``Entry``) for the papers of
+    ``faculty`` still pending in ``mode``.  Returns a ``MarkingResult``.
+    """
+    mode = MODES[mode]
+    errors = []
+    with transaction.atomic():
+        papers = {
+            paper.id: paper
+            for paper in AnswerSheet.objects.select_for_update().select_related('exam').filter(pk__in=id_list(entries))
+        }
+        changed = []
+        deltas = Counter()
+        now = timezone.now()
+        for paper_id, entry in sorted(entries.items()):
+            paper = papers.get(paper_id)
+            if paper is None or paper.faculty_id != faculty.id:
+                errors.append(MarkError(paper_id, 'not allocated to you'))
+                continue
+            before = stats.metrics_for(paper)
+            if mode.pending not in before:
+                errors.append(MarkError(paper_id, mode.done))
+                continue
+            try:
+                marks = int(entry.marks)
+            except ValueError:
+                errors.append(MarkError(paper_id, f'"{entry.marks}" is not a whole number'))
+                continue
+            if not 0 <= marks <= paper.exam.total_marks:
+                errors.append(MarkError(paper_id, f'marks must be between 0 and {paper.exam.total_marks}'))
+                continue
+
+            paper.marks_obtained = marks
+            if 'remarks' in mode.fields:
+                paper.remarks = entry.remarks
+                paper.is_checked = True
+                paper.checked_at = now
+            after = stats.metrics_for(paper)
+            deltas.update({name: 1 for name in after - before})
+            deltas.subtract({name: 1 for name in before - after})
+            changed.append(paper)
+
+        AnswerSheet.objects.bulk_update(changed, mode.fields, batch_size=500)
+        stats.adjust(**deltas)
+    return MarkingResult(len(changed), errors)
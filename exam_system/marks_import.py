@@ -0,0 +1,168 @@
+"""
+Offline marks upload for evaluators who mark on paper.
+
+A CSV or XLSX sheet keyed by roll number and subject code is read one row at
+a time and matched to the uploading faculty's answer sheets through a
+dictionary built with one query.  Matched rows are saved a chunk at a time
+through ``marking.save_marks`` (one ``bulk_update`` per chunk), and every
+row that cannot be applied is reported as a conflict with its line number.
+"""
+import csv
+import io
+import zipfile
+from typing import NamedTuple
+
+from .db import value_list
+from .importer import BATCH_SIZE, ImportFormatError, batched
+from .marking import Entry, save_marks
+from .models import AnswerSheet, Student
+
+COLUMNS = ('roll_number', 'subject_code', 'marks')  # and optionally remarks
+
+
+class Conflict(NamedTuple):
+    line: int
+    roll_number: str
+    subject_code: str
+    message: str
+
+
+class UploadResult(NamedTuple):
+    processed: int
+    saved: int
+    conflicts: list
+
+
+def check_columns(fieldnames):
+    missing = [column for column in COLUMNS if column not in fieldnames]
+    if missing:
+        raise ImportFormatError(f'Missing columns: {", ".join(missing)}')
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or ()]
+    check_columns(reader.fieldnames)
+    for row in reader:
+        yield reader.line_num, row
+
+
+# spreadsheet cells as the strings a CSV would hold, 42.0 read as "42"
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError('Reading .xlsx files needs openpyxl installed, upload a CSV file instead')
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (OSError, KeyError, zipfile.BadZipFile):
+        raise ImportFormatError('Not a readable .xlsx file')
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_cell(value).strip().lower() for value in next(rows, ())]
+        check_columns(header)
+        for line, values in enumerate(rows, start=2):
+            row = dict(zip(header, map(_cell, values)))
+            if any(row.values()):
+                yield line, row
+    finally:
+        workbook.close()
+
+
+# (line, row) pairs of an uploaded file, by its extension
+def read_rows(name, file):
+    if name.lower().endswith('.xlsx'):
+        return read_xlsx(file)
+    return read_csv(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+
+
+def paper_lookup(faculty):
+    """
+    (roll number, subject code) -> (answer sheet id, ``marking.MODES`` key or
+    None once marked) for every paper allocated to ``faculty``.  Of several
+    sittings of one subject, the newest still pending is used.
+    """
+    lookup = {}
+    rows = AnswerSheet.objects.filter(faculty=faculty, is_allocated=True).order_by('-id').values_list(
+        'id', 'student__roll_number', 'exam__subject__code', 'is_checked', 'marks_obtained'
+    )
+    for paper_id, roll_number, subject_code, is_checked, marks in rows:
+        mode = 'marks' if is_checked else 'check'
+        if is_checked and marks is not None:
+            mode = None
+        key = (roll_number, subject_code)
+        if key not in lookup or (lookup[key][1] is None and mode is not None):
+            lookup[key] = (paper_id, mode)
+    return lookup
+
+
+def upload_marks(faculty, rows, batch_size=BATCH_SIZE):
+    """
+    Save the marks of ``rows`` (``(line, row)`` pairs, see ``read_rows``)
+    for the papers allocated to ``faculty``.  Returns an ``UploadResult``.
+    """
+    lookup = paper_lookup(faculty)
+    seen = {}  # (roll number, subject code) -> line
+    conflicts = []
+    processed = saved = 0
+
+    for chunk in batched(rows, batch_size):
+        processed += len(chunk)
+        entries = {'check': {}, 'marks': {}}
+        lines = {}  # paper id -> (line, roll number, subject code)
+        unmatched = []
+        for line, row in chunk:
+            roll_number = (row.get('roll_number') or '').strip()
+            subject_code = (row.get('subject_code') or '').strip()
+            marks = (row.get('marks') or '').strip()
+            key = (roll_number, subject_code)
+            if not (roll_number and subject_code and marks):
+                conflicts.append(Conflict(line, roll_number, subject_code, 'roll_number, subject_code and marks are required'))
+                continue
+            if key in seen:
+                conflicts.append(Conflict(line, roll_number, subject_code, f'repeats line {seen[key]}'))
+                continue
+            seen[key] = line
+
+            match = lookup.get(key)
+            if match is None:
+                unmatched.append((line, roll_number, subject_code))
+            elif match[1] is None:
+                conflicts.append(Conflict(line, roll_number, subject_code, 'already has marks'))
+            else:
+                paper_id, mode = match
+                entries[mode][paper_id] = Entry(marks, (row.get('remarks') or '').strip())
+                lines[paper_id] = (line, roll_number, subject_code)
+
+        # tell unknown students from papers of someone else, one query per chunk
+        known = set(Student.objects.filter(
+            roll_number__in=value_list(roll_number for _, roll_number, _ in unmatched)
+        ).values_list('roll_number', flat=True)) if unmatched else set()
+        for line, roll_number, subject_code in unmatched:
+            message = 'not allocated to you' if roll_number in known else 'unknown roll number'
+            conflicts.append(Conflict(line, roll_number, subject_code, message))
+
+        for mode, mode_entries in entries.items():
+            if mode_entries:
+                result = save_marks(faculty, mode_entries, mode)
+                saved += result.saved
+                for error in result.errors:
+                    conflicts.append(Conflict(*lines[error.paper_id], error.message))
+
+    conflicts.sort()
+    return UploadResult(processed, saved, conflicts)
+
+
+def write_conflict_report(conflicts, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'roll_number', 'subject_code', 'conflict'])
+    writer.writerows(conflicts)
@@ -0,0 +1,157 @@
+"""
+Request middleware for the exam system.
+"""
+import cProfile
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from .db import start_reporting_reads, stop_reporting_reads
+from .instrumentation import check_budget, query_stats, record_queries
+from .models import Admin, Faculty, Student
+from .profiling import StackSampler, save_profile, should_profile
+
+PRINCIPAL_MODELS = {
+    'admin': Admin,
+    'faculty': Faculty,
+    'student': Student,
+}
+
+
+def principal_cache_key(user_type, user_id):
+    return f'exam_system:principal:{user_type}:{user_id}'
+
+
+# drop cached principals after their accounts change
+def invalidate_principals(user_type, user_ids):
+    cache.delete_many([principal_cache_key(user_type, user_id) for user_id in user_ids])
+
+
+def get_principal(request):
+    """
+    The logged-in Admin, Faculty or Student of ``request``, or None.
+
+    Looked up in the cache first so hot pages skip the identity query.
+    """
+    user_type = request.session.get('user_type')
+    user_id = request.session.get('user_id')
+    model = PRINCIPAL_MODELS.get(user_type)
+    if model is None or user_id is None:
+        return None
+
+    key = principal_cache_key(user_type, user_id)
+    principal = cache.get(key)
+    if principal is None:
+        principal = model.objects.filter(id=user_id).first()
+        if principal is not None:
+            cache.set(key, principal, getattr(settings, 'PRINCIPAL_CACHE_TIMEOUT', 60))
+    return principal
+
+
+class PrincipalMiddleware:
+    """
+    Attach the logged-in principal to the request as ``request.principal``,
+    resolved lazily and at most once per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.principal = SimpleLazyObject(lambda: get_principal(request))
+        return self.get_response(request)
+
+
+class QueryBudgetMiddleware:
+    """
+    Record the queries, database time, duplicated queries and template
+    render time of every request, tagged by the resolved view name.
+
+    Results feed the rolling ``query_stats`` aggregate, are checked against
+    the ``QUERY_BUDGETS`` setting and, with DEBUG on, are returned as
+    ``X-Query-*`` response headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', True):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        total_time = time.perf_counter() - started
+
+        match = request.resolver_match
+        name = match.view_name if match else 'unresolved'
+        query_stats.add(name, recorder, total_time)
+
+        if settings.DEBUG:
+            response['X-Query-View'] = name
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-Query-Time-Ms'] = f'{recorder.db_time * 1000:.3f}'
+            response['X-Template-Time-Ms'] = f'{recorder.template_time * 1000:.3f}'
+            duplicates = recorder.duplicates(1)
+            response['X-Query-Duplicates'] = str(duplicates[0][1] if duplicates else 0)
+
+        check_budget(name, recorder)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Run a ``PROFILING_SAMPLE_RATE`` sample of requests, and every request
+    carrying a valid signed ``X-Profile-Token`` header, under cProfile and
+    dump the result per view name (see ``profiling.py``).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        with StackSampler(getattr(settings, 'PROFILING_INTERVAL', 0.001)) as sampler:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+
+        match = request.resolver_match
+        save_profile(profiler, sampler, match.view_name if match else 'unresolved')
+        return response
+
+
+class ReportingDatabaseMiddleware:
+    """
+    Send the reads of GET requests to the ``REPORTING_VIEWS`` to the
+    read-only reporting connection, from the view until the response is
+    rendered (see ``reporting_reads()``).  Listed last in MIDDLEWARE, so the
+    other middleware keep reading from the default connection.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            token = request.__dict__.pop('_reporting_token', None)
+            if token is not None:
+                stop_reporting_reads(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if request.resolver_match.view_name not in getattr(settings, 'REPORTING_VIEWS', ()):
+            return None
+        request._reporting_token = start_reporting_reads()
+        return None
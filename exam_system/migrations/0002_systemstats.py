@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+def seed_stats(apps, schema_editor):
+    Exam = apps.get_model('exam_system', 'Exam')
+    Faculty = apps.get_model('exam_system', 'Faculty')
+    Student = apps.get_model('exam_system', 'Student')
+    AnswerSheet = apps.get_model('exam_system', 'AnswerSheet')
+    SystemStats = apps.get_model('exam_system', 'SystemStats')
+    db_alias = schema_editor.connection.alias
+
+    values = {
+        'total_exams': Exam.objects.using(db_alias).count(),
+        'active_faculty': Faculty.objects.using(db_alias).filter(is_active=True).count(),
+        'active_students': Student.objects.using(db_alias).filter(is_active=True).count(),
+        'pending_checking': AnswerSheet.objects.using(db_alias).filter(is_allocated=True, is_checked=False).count(),
+        'pending_marks': AnswerSheet.objects.using(db_alias).filter(is_checked=True, marks_obtained__isnull=True).count(),
+    }
+    SystemStats.objects.using(db_alias).bulk_create([SystemStats(name=name, value=value) for name, value in values.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_system', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_registrations(apps, schema_editor):
+    Exam = apps.get_model('exam_system', 'Exam')
+    StudentExamRegistration = apps.get_model('exam_system', 'StudentExamRegistration')
+    db_alias = schema_editor.connection.alias
+
+    registrations = StudentExamRegistration.objects.using(db_alias).filter(
+        exam=OuterRef('pk')
+    ).order_by().values('exam').annotate(total=Count('id')).values('total')
+    Exam.objects.using(db_alias).update(registered_count=Coalesce(Subquery(registrations), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_system', '0002_systemstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='registered_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_registrations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_system', '0003_exam_capacity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='answersheet',
+            name='faculty',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='exam_system.faculty'),
+        ),
+        migrations.AlterField(
+            model_name='attendance',
+            name='exam_session',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='exam_system.examsession'),
+        ),
+        migrations.AlterField(
+            model_name='studentexamregistration',
+            name='exam',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='exam_system.exam'),
+        ),
+        migrations.AddIndex(
+            model_name='answersheet',
+            index=models.Index(fields=['faculty', 'is_allocated', 'is_checked'], name='answersheet_faculty_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='answersheet',
+            index=models.Index(fields=['exam', 'is_allocated'], name='answersheet_exam_alloc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='answersheet',
+            index=models.Index(condition=models.Q(('is_allocated', True), ('is_checked', False)), fields=['faculty'], name='answersheet_pending_check_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='answersheet',
+            index=models.Index(condition=models.Q(('is_checked', True), ('marks_obtained__isnull', True)), fields=['faculty'], name='answersheet_pending_marks_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['exam_session', 'is_present'], name='attendance_session_present_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(fields=['date', 'session_number'], name='session_date_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentexamregistration',
+            index=models.Index(fields=['exam', 'student'], name='registration_exam_student_idx'),
+        ),
+    ]
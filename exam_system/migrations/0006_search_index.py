@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# the search table and its contents as of this migration, see exam_system/search.py
+CREATE_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS exam_system_search USING fts5("
+    "title, detail, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+BACKFILL = [
+    "INSERT INTO exam_system_search (rowid, title, detail) "
+    "SELECT id * 4 + 1, name, COALESCE(roll_number, '') || ' ' || COALESCE(username, '') || ' ' || COALESCE(email, '') "
+    "FROM exam_system_student",
+    "INSERT INTO exam_system_search (rowid, title, detail) "
+    "SELECT id * 4 + 2, name, COALESCE(username, '') || ' ' || COALESCE(email, '') || ' ' || COALESCE(department, '') "
+    "FROM exam_system_faculty",
+    "INSERT INTO exam_system_search (rowid, title, detail) "
+    "SELECT id * 4 + 3, name, COALESCE(code, '') "
+    "FROM exam_system_subject",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only, other backends search through the ORM
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_INDEX)
+    schema_editor.execute('DELETE FROM exam_system_search')
+    for statement in BACKFILL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS exam_system_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_system', '0005_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
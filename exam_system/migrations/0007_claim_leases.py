@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_system', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answersheet',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='answersheet',
+            index=models.Index(condition=models.Q(('is_checked', False), ('lease_expires_at__isnull', False)), fields=['lease_expires_at'], name='answersheet_lease_idx'),
+        ),
+    ]
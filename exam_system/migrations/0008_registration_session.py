@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam_system', '0007_claim_leases'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentexamregistration',
+            name='session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='exam_system.examsession'),
+        ),
+    ]
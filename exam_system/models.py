@@ -40,6 +40,12 @@ class Faculty(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # keyset pagination of admin_manage_faculty, see exam_system.listing
+            models.Index(fields=['created_at', 'id'], name='faculty_created_idx'),
+        ]
+    
     def __str__(self):
         return self.name
 
@@ -49,10 +55,17 @@ class Student(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     roll_number = models.CharField(max_length=20, unique=True)
-    semester = models.ForeignKey(Semester, on_delete=models.CASCADE)
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, db_index=False)  # see Meta.indexes
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # keyset pagination of admin_manage_students, see exam_system.listing
+            models.Index(fields=['created_at', 'id'], name='student_created_idx'),
+            models.Index(fields=['semester', 'created_at', 'id'], name='student_semester_created_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.roll_number} - {self.name}"
 
@@ -64,6 +77,8 @@ class Exam(models.Model):
     end_time = models.TimeField()
     total_marks = models.IntegerField(default=100)
     is_published = models.BooleanField(default=False)
+    capacity = models.PositiveIntegerField(null=True, blank=True)  # None for unlimited
+    registered_count = models.IntegerField(default=0)  # kept by exam_system.registration
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -71,12 +86,17 @@ class Exam(models.Model):
 
 class StudentExamRegistration(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, db_index=False)  # see Meta.indexes
     registration_date = models.DateTimeField(auto_now_add=True)
     is_registered = models.BooleanField(default=True)
+    session = models.ForeignKey('ExamSession', on_delete=models.SET_NULL, null=True, blank=True)  # set by exam_system.sessions
     
     class Meta:
         unique_together = ['student', 'exam']
+        indexes = [
+            # registrations by exam, covering the student ids
+            models.Index(fields=['exam', 'student'], name='registration_exam_student_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.name} - {self.exam.subject.name}"
@@ -89,6 +109,12 @@ class ExamSession(models.Model):
     end_time = models.TimeField()
     max_students = models.IntegerField(default=50)
     
+    class Meta:
+        indexes = [
+            # co-scheduled sessions, seated together by exam_system.seating
+            models.Index(fields=['date', 'session_number'], name='session_date_number_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.exam.subject.name} - Session {self.session_number} on {self.date}"
 
@@ -107,12 +133,15 @@ class SeatingArrangement(models.Model):
 
 class Attendance(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    exam_session = models.ForeignKey(ExamSession, on_delete=models.CASCADE)
+    exam_session = models.ForeignKey(ExamSession, on_delete=models.CASCADE, db_index=False)  # see Meta.indexes
     is_present = models.BooleanField(default=False)
     attendance_date = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         unique_together = ['student', 'exam_session']
+        indexes = [
+            models.Index(fields=['exam_session', 'is_present'], name='attendance_session_present_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.name} - {self.exam_session.exam.subject.name}"
@@ -120,14 +149,40 @@ class Attendance(models.Model):
 class AnswerSheet(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
-    faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE, null=True, blank=True)
+    faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE, null=True, blank=True, db_index=False)  # see Meta.indexes
     is_allocated = models.BooleanField(default=False)
     is_checked = models.BooleanField(default=False)
     marks_obtained = models.IntegerField(null=True, blank=True)
     remarks = models.TextField(blank=True)
     checked_at = models.DateTimeField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)  # claimed papers, see exam_system.claims
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # faculty pages: allocated / to check / checked papers of one faculty
+            models.Index(fields=['faculty', 'is_allocated', 'is_checked'], name='answersheet_faculty_state_idx'),
+            # allocation coverage per exam
+            models.Index(fields=['exam', 'is_allocated'], name='answersheet_exam_alloc_idx'),
+            # pending work, a small slice of the table once marking is under way
+            models.Index(
+                fields=['faculty'],
+                condition=models.Q(is_allocated=True, is_checked=False),
+                name='answersheet_pending_check_idx',
+            ),
+            models.Index(
+                fields=['faculty'],
+                condition=models.Q(is_checked=True, marks_obtained__isnull=True),
+                name='answersheet_pending_marks_idx',
+            ),
+            # claims whose lease runs out before the paper is checked
+            models.Index(
+                fields=['lease_expires_at'],
+                condition=models.Q(is_checked=False, lease_expires_at__isnull=False),
+                name='answersheet_lease_idx',
+            ),
+        ]
+    
     def __str__(self):
         return f"{self.student.name} - {self.exam.subject.name}"
 
@@ -139,3 +194,12 @@ class ExamSchedule(models.Model):
     
     def __str__(self):
         return f"Schedule for {self.exam.subject.name}"
+
+# cached counters for the admin dashboard, kept current by exam_system.stats
+class SystemStats(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    value = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} = {self.value}"
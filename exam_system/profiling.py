@@ -0,0 +1,131 @@
+"""
+Sampling request profiler.
+
+``ProfilingMiddleware`` in ``middleware.py`` runs a sample of requests (or
+any request carrying the signed ``X-Profile-Token`` of an active admin)
+under cProfile and dumps a ``.prof`` file and a collapsed-stack file per
+request into ``PROFILING_DIR``, oldest dumps removed past
+``PROFILING_MAX_BYTES``.
+The ``.collapsed`` files feed flamegraph.pl / speedscope directly.
+``summarize_profiles`` reads them back.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+from .models import Admin
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'exam_system.profiling'
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', Path(settings.BASE_DIR) / 'profiles'))
+
+
+# signed token an admin sends in X-Profile-Token to profile a request on demand
+def make_profile_token(admin_id):
+    return signing.dumps({'admin': admin_id}, salt=TOKEN_SALT)
+
+
+# a token signed for an admin that still exists and is active
+def has_valid_token(request):
+    token = request.headers.get(TOKEN_HEADER)
+    if not token:
+        return False
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT, max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600))
+    except signing.BadSignature:
+        return False
+    return Admin.objects.filter(id=payload.get('admin'), is_active=True).exists()
+
+
+def should_profile(request):
+    if not getattr(settings, 'PROFILING_ENABLED', False):
+        return False
+    if has_valid_token(request):
+        return True
+    return random.random() < getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+
+
+class StackSampler:
+    """
+    Sample the stack of the calling thread every ``interval`` seconds from a
+    background thread, counting each collapsed stack (``a;b;c``).  cProfile
+    only keeps caller/callee pairs, so the flame-graph stacks come from here.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.counts = Counter()
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return [f'{stack} {count}' for stack, count in sorted(self.counts.items())]
+
+
+def save_profile(profiler, sampler, view_name):
+    """
+    Dump ``profiler`` and the stacks of ``sampler`` for ``view_name``, then
+    rotate the profile directory.
+    """
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    base = directory / f'{_UNSAFE.sub("_", view_name)}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{random.randrange(1 << 16):04x}'
+
+    profiler.dump_stats(f'{base}.prof')
+    with open(f'{base}.collapsed', 'w') as output:
+        output.writelines(f'{line}\n' for line in sampler.collapsed())
+
+    rotate(directory, getattr(settings, 'PROFILING_MAX_BYTES', 100 * 1024 * 1024))
+    return Path(f'{base}.prof')
+
+
+# delete the oldest dumps until the directory fits in ``max_bytes``
+def rotate(directory, max_bytes):
+    files = sorted(
+        (path for path in Path(directory).iterdir() if path.suffix in ('.prof', '.collapsed')),
+        key=lambda path: path.stat().st_mtime
+    )
+    total = sum(path.stat().st_size for path in files)
+    for path in files:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+
+
+# view name of a dump file, as written by save_profile
+def view_name_of(path):
+    return Path(path).stem.rsplit('-', 4)[0]
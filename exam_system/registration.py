@@ -0,0 +1,85 @@
+"""
+Exam registration service.
+
+Built for the burst when a registration window opens: a registration is a
+single conflict-tolerant INSERT plus one conditional UPDATE of the exam's
+``registered_count``, so concurrent requests can't double-register a student
+or overfill an exam and nothing raises IntegrityError under load.  Clashes
+with the student's other exams are checked with one query on the
+student's registrations (see ``clashes.py``).
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .clashes import find_clash
+from .models import Exam, StudentExamRegistration
+from .sessions import seat_registration
+
+REGISTERED = 'registered'
+ALREADY_REGISTERED = 'already_registered'
+FULL = 'full'
+UNAVAILABLE = 'unavailable'
+CLASH = 'clash'
+
+
+# INSERT ... ON CONFLICT DO NOTHING, True when a row was inserted
+def _insert_registration(student_id, exam_id, using):
+    connection = connections[using]
+    meta = StudentExamRegistration._meta
+    registration_date = meta.get_field('registration_date').get_db_prep_value(timezone.now(), connection)
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(meta.db_table)} '
+            f'({quote("student_id")}, {quote("exam_id")}, {quote("registration_date")}, {quote("is_registered")}) '
+            f'VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT ({quote("student_id")}, {quote("exam_id")}) DO NOTHING',
+            [student_id, exam_id, registration_date, True]
+        )
+        return cursor.rowcount == 1
+
+
+def register_student(student_id, exam_id, using=DEFAULT_DB_ALIAS):
+    """
+    Register a student for a published exam.
+
+    Returns REGISTERED, ALREADY_REGISTERED, FULL (the exam reached its
+    capacity, or every session planned for it is full), UNAVAILABLE (no
+    such published exam) or CLASH (it overlaps another exam the student is
+    registered for).
+    """
+    with transaction.atomic(using=using):
+        if not _insert_registration(student_id, exam_id, using):
+            return ALREADY_REGISTERED
+
+        # claim a place, fails once the exam is at capacity
+        claimed = Exam.objects.using(using).filter(
+            Q(capacity__isnull=True) | Q(registered_count__lt=F('capacity')),
+            id=exam_id,
+            is_published=True
+        ).update(registered_count=F('registered_count') + 1)
+        if claimed:
+            if find_clash(student_id, exam_id, using) is not None:
+                transaction.set_rollback(True, using=using)
+                return CLASH
+            if not seat_registration(student_id, exam_id, using):
+                transaction.set_rollback(True, using=using)
+                return FULL
+            return REGISTERED
+
+        transaction.set_rollback(True, using=using)
+
+    if Exam.objects.using(using).filter(id=exam_id, is_published=True).exists():
+        return FULL
+    return UNAVAILABLE
+
+
+# repair Exam.registered_count from the registrations, returns exams changed
+def sync_registered_counts(using=DEFAULT_DB_ALIAS):
+    registrations = StudentExamRegistration.objects.using(using).filter(
+        exam=OuterRef('pk')
+    ).order_by().values('exam').annotate(total=Count('id')).values('total')
+    actual = Coalesce(Subquery(registrations), 0)
+    return Exam.objects.using(using).exclude(registered_count=actual).update(registered_count=actual)
@@ -0,0 +1,67 @@
+"""
+Reporting queries for the admin pages.
+
+Every report is a fixed number of grouped aggregate queries, however many
+faculty or exams there are.
+"""
+from django.db.models import Count, Q
+
+from .models import AnswerSheet, Exam, StudentExamRegistration
+
+PENDING_CHECKING = Q(is_allocated=True, is_checked=False)
+PENDING_MARKS = Q(is_checked=True, marks_obtained__isnull=True)
+
+
+def pending_work_per_faculty():
+    """
+    Pending checking and pending marks entry per active faculty, busiest
+    first.  One query.
+    """
+    rows = AnswerSheet.objects.filter(
+        faculty__is_active=True
+    ).values('faculty', 'faculty__name').annotate(
+        pending_count=Count('id', filter=PENDING_CHECKING),
+        pending_marks_count=Count('id', filter=PENDING_MARKS),
+    ).filter(
+        Q(pending_count__gt=0) | Q(pending_marks_count__gt=0)
+    ).order_by('-pending_count', 'faculty__name')
+
+    return [
+        {
+            'id': row['faculty'],
+            'name': row['faculty__name'],
+            'pending_count': row['pending_count'],
+            'pending_marks_count': row['pending_marks_count'],
+        }
+        for row in rows
+    ]
+
+
+def allocation_coverage_per_exam(exams=None):
+    """
+    Registered students and allocated papers for every exam in ``exams``
+    (published exams by default).  Three queries.
+    """
+    if exams is None:
+        exams = Exam.objects.filter(is_published=True)
+    exam_ids = exams.values('id')
+
+    registered = dict(StudentExamRegistration.objects.filter(
+        exam_id__in=exam_ids
+    ).values('exam').annotate(total=Count('id')).values_list('exam', 'total'))
+    allocated = dict(AnswerSheet.objects.filter(
+        exam_id__in=exam_ids,
+        is_allocated=True
+    ).values('exam').annotate(total=Count('id')).values_list('exam', 'total'))
+
+    coverage = []
+    for exam in exams.select_related('subject'):
+        total_students = registered.get(exam.id, 0)
+        allocated_papers = allocated.get(exam.id, 0)
+        coverage.append({
+            'exam': exam,
+            'total_students': total_students,
+            'allocated_papers': allocated_papers,
+            'unallocated_papers': total_students - allocated_papers,
+        })
+    return coverage
@@ -0,0 +1,44 @@
+"""
+Database routing.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .db import reporting_active
+
+
+class ReportingRouter:
+    """
+    Send the reads of a ``reporting_reads()`` block (the ``REPORTING_VIEWS``,
+    see ``ReportingDatabaseMiddleware``) to the read-only
+    ``REPORTING_DATABASE`` connection, when the production profile defines
+    it.  Writes always go to the default connection.
+    """
+
+    def reporting_alias(self):
+        alias = getattr(settings, 'REPORTING_DATABASE', None)
+        return alias if alias in settings.DATABASES else None
+
+    def db_for_read(self, model, **hints):
+        if reporting_active():
+            return self.reporting_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # objects read from the reporting connection are saved on the default one
+        instance = hints.get('instance')
+        alias = self.reporting_alias()
+        if alias and instance is not None and instance._state.db == alias:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, self.reporting_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == self.reporting_alias():
+            return False
+        return None
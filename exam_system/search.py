@@ -0,0 +1,176 @@
+"""
+Full-text search over students, faculty and subjects.
+
+Documents live in one SQLite FTS5 table, ``exam_system_search``, with the
+name as ``title`` and the identifying codes (roll number, username, email,
+subject code, department) as ``detail``.  Each document's rowid is
+``pk * 4 + kind code``, so a row is found and replaced without a lookup
+column.  The signals in ``signals.py`` keep the table in sync on save and
+delete; bulk code paths call ``index_objects`` or ``rebuild_index``.
+
+On other database backends the table does not exist and searches fall back
+to prefix matching through the ORM.
+"""
+import re
+from typing import NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Faculty, Student, Subject
+
+TABLE = 'exam_system_search'
+
+
+class Source(NamedTuple):
+    model: type
+    code: int
+    title: str
+    detail: tuple
+
+
+SOURCES = {
+    'student': Source(Student, 1, 'name', ('roll_number', 'username', 'email')),
+    'faculty': Source(Faculty, 2, 'name', ('username', 'email', 'department')),
+    'subject': Source(Subject, 3, 'name', ('code',)),
+}
+KINDS = {source.code: kind for kind, source in SOURCES.items()}
+
+
+class SearchResult(NamedTuple):
+    kind: str
+    id: int
+    title: str
+    detail: str
+    rank: float
+
+
+def search_available(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def source_for(model):
+    for kind, source in SOURCES.items():
+        if source.model is model:
+            return kind, source
+    return None, None
+
+
+def create_index(using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            f"title, detail, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS):
+    """
+    Refill the search table from the source tables in one statement per
+    source.  Returns the number of documents indexed.
+    """
+    total = 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for source in SOURCES.values():
+            detail = " || ' ' || ".join(f'COALESCE({column}, \'\')' for column in source.detail)
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, title, detail) '
+                f'SELECT id * 4 + {source.code}, {source.title}, {detail} FROM {source.model._meta.db_table}'
+            )
+            total += cursor.rowcount
+    return total
+
+
+def index_objects(model, objects, using=DEFAULT_DB_ALIAS):
+    """
+    Add or replace the documents of ``objects``, instances of ``model``.
+    """
+    _, source = source_for(model)
+    if source is None or not search_available(using):
+        return
+    rows = [
+        (
+            obj.pk * 4 + source.code,
+            getattr(obj, source.title),
+            ' '.join(str(getattr(obj, column) or '') for column in source.detail),
+        )
+        for obj in objects
+    ]
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {TABLE} (rowid, title, detail) VALUES (%s, %s, %s)', rows)
+
+
+def remove_objects(model, pks, using=DEFAULT_DB_ALIAS):
+    _, source = source_for(model)
+    if source is None or not search_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', [(pk * 4 + source.code,) for pk in pks])
+
+
+# every word of ``query`` as a quoted prefix term, so user input is never FTS syntax
+def match_expression(query):
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{word}"*' for word in words) or None
+
+
+def search(query, kinds=None, limit=20, using=DEFAULT_DB_ALIAS):
+    """
+    Documents matching every word of ``query`` as a prefix, best match
+    first (bm25, a name match weighing more than a code match).
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    if not search_available(using):
+        return _search_fallback(query, kinds or list(SOURCES), limit, using)
+
+    codes = [SOURCES[kind].code for kind in (kinds or SOURCES)]
+    placeholders = ', '.join(['%s'] * len(codes))
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, title, detail, bm25({TABLE}, 10.0, 1.0) AS rank FROM {TABLE} '
+            f'WHERE {TABLE} MATCH %s AND rowid %% 4 IN ({placeholders}) ORDER BY rank LIMIT %s',
+            [expression, *codes, limit],
+        )
+        return [
+            SearchResult(KINDS[rowid % 4], rowid // 4, title, detail, rank)
+            for rowid, title, detail, rank in cursor.fetchall()
+        ]
+
+
+def _prefix_condition(source, query):
+    condition = Q()
+    for field in (source.title, *source.detail):
+        condition |= Q(**{f'{field}__istartswith': query.strip()})
+    return condition
+
+
+def _search_fallback(query, kinds, limit, using):
+    results = []
+    for kind in kinds:
+        source = SOURCES[kind]
+        for obj in source.model.objects.using(using).filter(_prefix_condition(source, query))[:limit]:
+            detail = ' '.join(str(getattr(obj, column) or '') for column in source.detail)
+            results.append(SearchResult(kind, obj.pk, getattr(obj, source.title), detail, 0.0))
+    return results[:limit]
+
+
+def matching_ids(kind, query, using=DEFAULT_DB_ALIAS):
+    """
+    Filter value for ``pk__in`` selecting the ``kind`` objects that match
+    ``query``, for narrowing the admin listings.
+    """
+    source = SOURCES[kind]
+    if not search_available(using):
+        return source.model.objects.using(using).filter(_prefix_condition(source, query)).values('pk')
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    return RawSQL(
+        f'SELECT rowid / 4 FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid %% 4 = %s',
+        (expression, source.code),
+    )
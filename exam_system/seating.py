@@ -0,0 +1,214 @@
+"""
+Seating engine for exam sessions.
+
+The whole layout is computed in memory in a single pass over the seats and
+written back with one bulk insert, instead of one INSERT per student.
+"""
+import heapq
+import math
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+from django.db import transaction
+
+from .models import ExamSession, SeatingArrangement, StudentExamRegistration
+from .sessions import sitting
+
+# columns of the default room, matches the old hard-coded grid
+DEFAULT_COLUMNS = 10
+
+# seat_number is a CharField(max_length=10)
+SEAT_NUMBER_LENGTH = 10
+
+
+@dataclass(frozen=True)
+class Room:
+    name: str
+    rows: int
+    columns: int
+    capacity: Optional[int] = None
+
+    def __post_init__(self):
+        # letters only, so the digits of the seat number can't run into the name
+        if not self.name.isalpha():
+            raise ValueError(f'Room name "{self.name}" must contain only letters')
+        if self.rows < 1 or self.columns < 1:
+            raise ValueError(f'Room "{self.name}" needs at least one row and one column')
+        seats = self.rows * self.columns
+        capacity = seats if self.capacity is None else min(self.capacity, seats)
+        if capacity < 1:
+            raise ValueError(f'Room "{self.name}" needs a positive capacity')
+        if len(self.name) + max(2, len(str(capacity))) > SEAT_NUMBER_LENGTH:
+            raise ValueError(f'Room name "{self.name}" is too long')
+        object.__setattr__(self, 'capacity', capacity)
+
+
+class Seat(NamedTuple):
+    student_id: int
+    group: object
+    room: str
+    seat_number: str
+    row_number: int
+    column_number: int
+
+
+class SeatingResult(NamedTuple):
+    seats: list
+    unseated: list
+
+
+# parse "A:5x10, B:6x8:40" into rooms (name:rowsxcolumns[:capacity])
+def parse_rooms(text):
+    rooms = []
+    for chunk in (text or '').replace('\n', ',').split(','):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        parts = [part.strip() for part in chunk.split(':')]
+        if len(parts) not in (2, 3):
+            raise ValueError(f'Invalid room definition "{chunk}", expected name:rowsxcolumns[:capacity]')
+        try:
+            rows, columns = (int(value) for value in parts[1].lower().split('x'))
+            capacity = int(parts[2]) if len(parts) == 3 else None
+        except ValueError:
+            raise ValueError(f'Invalid room definition "{chunk}", expected name:rowsxcolumns[:capacity]')
+        rooms.append(Room(parts[0], rows, columns, capacity))
+
+    names = [room.name for room in rooms]
+    if len(names) != len(set(names)):
+        raise ValueError('Room names must be unique')
+    return rooms
+
+
+# single room with the old 10-column grid, sized to the session capacity
+def default_rooms(max_students):
+    return [Room('A', max(1, math.ceil(max_students / DEFAULT_COLUMNS)), DEFAULT_COLUMNS, max_students)]
+
+
+# pick the largest group that is not blocked by a neighbouring seat
+def _take_group(heap, blocked):
+    skipped = []
+    chosen = None
+    while heap:
+        entry = heapq.heappop(heap)
+        if entry[2] in blocked:
+            skipped.append(entry)
+            continue
+        chosen = entry
+        break
+    for entry in skipped:
+        heapq.heappush(heap, entry)
+    if chosen is None:
+        return None
+    count, order, group = chosen
+    if count + 1 < 0:
+        heapq.heappush(heap, (count + 1, order, group))
+    return group
+
+
+def compute_layout(students, rooms, limit=None, separate_groups=False):
+    """
+    Lay out ``students`` (``(student_id, group)`` pairs, in seating order)
+    across ``rooms``, filling each room row by row up to its capacity.
+
+    With ``separate_groups`` no two horizontally or vertically adjacent seats
+    hold students of the same group; a seat is left empty when every
+    remaining student would break that rule.
+    """
+    students = list(students)
+    remaining = len(students) if limit is None else min(len(students), limit)
+
+    if separate_groups:
+        queues = {}
+        for student_id, group in students[:remaining]:
+            queues.setdefault(group, []).append(student_id)
+        for queue in queues.values():
+            queue.reverse()
+        heap = [(-len(queue), order, group) for order, (group, queue) in enumerate(queues.items())]
+        heapq.heapify(heap)
+    else:
+        pending = iter(students)
+
+    seats = []
+    for room in rooms:
+        used = 0
+        previous_row = [None] * (room.columns + 2)
+        for row in range(1, room.rows + 1):
+            current_row = [None] * (room.columns + 2)
+            for column in range(1, room.columns + 1):
+                if remaining == 0 or used == room.capacity:
+                    break
+                if separate_groups:
+                    group = _take_group(heap, (current_row[column - 1], previous_row[column]))
+                    if group is None:
+                        continue
+                    student_id = queues[group].pop()
+                    current_row[column] = group
+                else:
+                    student_id, group = next(pending)
+                used += 1
+                remaining -= 1
+                seats.append(Seat(
+                    student_id, group, room.name, f'{room.name}{used:02d}', row, column
+                ))
+            previous_row = current_row
+
+    seated = {seat.student_id for seat in seats}
+    unseated = [student_id for student_id, group in students if student_id not in seated]
+    return SeatingResult(seats, unseated)
+
+
+def arrange_session(session, rooms=None, separate_subjects=False):
+    """
+    Compute and store the seating for ``session``.
+
+    With ``separate_subjects`` every session sharing the same date and slot
+    is seated together in the same rooms, so that students of the same
+    subject never sit next to each other.  Each session is still capped at
+    its own ``max_students``.
+    """
+    if separate_subjects:
+        sessions = list(ExamSession.objects.select_related('exam').filter(
+            date=session.date,
+            session_number=session.session_number,
+        ))
+    else:
+        sessions = [session]
+
+    sessions_by_exam = {item.exam_id: item for item in sessions}
+    if rooms is None:
+        rooms = default_rooms(sum(item.max_students for item in sessions))
+
+    registrations = StudentExamRegistration.objects.filter(sitting(sessions)).order_by('id').values_list('student_id', 'exam_id')
+
+    # cap every session at its own max_students
+    students = []
+    overflow = []
+    taken = {exam_id: 0 for exam_id in sessions_by_exam}
+    seen = set()
+    for student_id, exam_id in registrations:
+        if student_id in seen:
+            continue
+        seen.add(student_id)
+        if taken[exam_id] < sessions_by_exam[exam_id].max_students:
+            taken[exam_id] += 1
+            students.append((student_id, exam_id))
+        else:
+            overflow.append(student_id)
+
+    result = compute_layout(students, rooms, separate_groups=separate_subjects)
+
+    with transaction.atomic():
+        SeatingArrangement.objects.filter(exam_session__in=sessions).delete()
+        SeatingArrangement.objects.bulk_create([
+            SeatingArrangement(
+                student_id=seat.student_id,
+                exam_session=sessions_by_exam[seat.group],
+                seat_number=seat.seat_number,
+                row_number=seat.row_number,
+                column_number=seat.column_number,
+            )
+            for seat in result.seats
+        ])
+
+    return SeatingResult(result.seats, result.unseated + overflow)
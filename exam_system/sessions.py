@@ -0,0 +1,183 @@
+"""
+Session planner: ExamSession rows from each exam's dates, times and seats.
+
+An exam runs on every day from ``start_date`` to ``end_date``, in each of the
+``timetable.SESSION_TIMES`` sessions that fits between its start and end
+time (or in one session at its own times when none fits).  The planner uses
+as many of those slots, earliest first, as the registered students need at
+``max_students`` a session.  It then splits the students over them
+in roll number order, so the same registrations always give the same
+sessions and no two session sizes differ by more than one.
+
+Plans for a whole semester are computed from one query, and saved with one
+bulk insert plus one UPDATE per session.  A plan that cannot seat every
+student in its exam's dates is not saved.  Once an exam is planned, a late
+registration takes a place in its emptiest session with room
+(``seat_registration``), and attendance sheets and seating take only the
+students assigned to a session (``sitting``).  Exams that were not planned
+keep every registration on every session, as before.
+"""
+import math
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+
+from .db import id_list
+from .models import ExamSession, StudentExamRegistration
+from .timetable import SESSION_TIMES, Slot, slot_of
+
+
+class SessionSlot(NamedTuple):
+    slot: Slot
+    start_time: object
+    end_time: object
+
+
+class SessionPlan(NamedTuple):
+    exam_id: int
+    sessions: list  # unsaved ExamSession rows
+    groups: list  # registration ids seated in each session
+    unassigned: list  # registration ids beyond the exam's last slot
+
+    @property
+    def days(self):
+        return len({session.date for session in self.sessions})
+
+
+def exam_slots(exam):
+    """
+    The ``SessionSlot`` of every session ``exam`` can run in, in order.
+    """
+    fitting = [
+        number for number, (start, end) in sorted(SESSION_TIMES.items())
+        if exam.start_time <= start and end <= exam.end_time
+    ]
+    slots = []
+    day = exam.start_date
+    while day <= exam.end_date:
+        if fitting:
+            slots.extend(SessionSlot(Slot(day, number), *SESSION_TIMES[number]) for number in fitting)
+        else:
+            slots.append(SessionSlot(Slot(day, slot_of(exam).session_number), exam.start_time, exam.end_time))
+        day += timedelta(days=1)
+    return slots
+
+
+# split ``items`` into ``count`` runs whose lengths differ by at most one
+def split_evenly(items, count):
+    size, extra = divmod(len(items), count)
+    groups = []
+    start = 0
+    for index in range(count):
+        end = start + size + (index < extra)
+        groups.append(items[start:end])
+        start = end
+    return groups
+
+
+def plan_exam(exam, registration_ids, max_students):
+    """
+    ``SessionPlan`` seating ``registration_ids`` (in seating order) at most
+    ``max_students`` to a session.
+    """
+    slots = exam_slots(exam)[:math.ceil(len(registration_ids) / max_students)]
+    seated = len(slots) * max_students
+    groups = split_evenly(registration_ids[:seated], len(slots)) if slots else []
+    sessions = [
+        ExamSession(
+            exam_id=exam.id,
+            date=slot.slot.date,
+            session_number=slot.slot.session_number,
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            max_students=max_students,
+        )
+        for slot in slots
+    ]
+    return SessionPlan(exam.id, sessions, groups, registration_ids[seated:])
+
+
+def plan_sessions(exams, max_students):
+    """
+    ``SessionPlan`` of every exam in ``exams`` with registrations, from one
+    query over their registrations.
+    """
+    exams = {exam.id: exam for exam in exams}
+    rows = StudentExamRegistration.objects.filter(exam_id__in=id_list(exams)).order_by(
+        'exam_id', 'student__roll_number', 'student_id'
+    ).values_list('exam_id', 'id').iterator(chunk_size=10000)
+    return [
+        plan_exam(exams[exam_id], [registration_id for _, registration_id in registrations], max_students)
+        for exam_id, registrations in groupby(rows, key=itemgetter(0))
+    ]
+
+
+def create_sessions(plans):
+    """
+    Save the sessions of the ``plans`` that seat every student, and assign
+    each registration to its session.  Returns the sessions created.
+    """
+    plans = [plan for plan in plans if not plan.unassigned]
+    with transaction.atomic():
+        sessions = ExamSession.objects.bulk_create(
+            [session for plan in plans for session in plan.sessions], batch_size=500
+        )
+        for plan in plans:
+            for session, group in zip(plan.sessions, plan.groups):
+                StudentExamRegistration.objects.filter(pk__in=id_list(group)).update(session=session)
+    return sessions
+
+
+def sitting(sessions):
+    """
+    Q of the registrations that sit one of ``sessions``: those assigned to
+    it and, for an exam whose sessions were not planned, all of them.  The
+    planned exams are looked up once here, one query, so the filter itself
+    stays a plain lookup on every row.
+    """
+    exam_ids = {session.exam_id for session in sessions}
+    planned = set(StudentExamRegistration.objects.filter(
+        exam_id__in=id_list(exam_ids), session__isnull=False
+    ).order_by().values_list('exam_id', flat=True).distinct())
+    return Q(session__in=sessions) | Q(session__isnull=True, exam_id__in=id_list(exam_ids - planned))
+
+
+def sitting_counts(sessions):
+    """
+    The number of registrations sitting each of ``sessions`` (see
+    ``sitting``) by session id, from one query grouped by exam and session.
+    """
+    counts = {}  # (exam id, session id or None) -> registrations
+    for exam_id, session_id, total in StudentExamRegistration.objects.filter(
+        exam_id__in=id_list({session.exam_id for session in sessions})
+    ).order_by().values('exam_id', 'session_id').annotate(total=Count('id')).values_list('exam_id', 'session_id', 'total'):
+        counts[exam_id, session_id] = total
+    planned = {exam_id for exam_id, session_id in counts if session_id is not None}
+    return {
+        session.id: counts.get((session.exam_id, session.id if session.exam_id in planned else None), 0)
+        for session in sessions
+    }
+
+
+def seat_registration(student_id, exam_id, using=DEFAULT_DB_ALIAS):
+    """
+    Assign a registration made after its exam was planned to the emptiest
+    session with room.  False when every planned session is full; True
+    when it was seated or the exam was not planned.
+    """
+    sessions = list(ExamSession.objects.using(using).filter(exam_id=exam_id).annotate(
+        seated=Count('studentexamregistration')
+    ).order_by('seated', 'date', 'session_number', 'id').values_list('id', 'seated', 'max_students'))
+    if not any(seated for _, seated, _ in sessions):
+        return True
+    for session_id, seated, max_students in sessions:
+        if seated < max_students:
+            StudentExamRegistration.objects.using(using).filter(
+                student_id=student_id, exam_id=exam_id
+            ).update(session_id=session_id)
+            return True
+    return False
@@ -0,0 +1,79 @@
+"""
+Signal receivers that keep the dashboard counters in ``stats.py``, the
+principal cache in ``middleware.py`` and the search index in ``search.py``
+current.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from . import search, stats
+from .middleware import PRINCIPAL_MODELS, invalidate_principals
+
+
+# the stored metric fields of a row about to be updated, read only when the
+# save writes one of them
+def remember_metrics_on_save(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    instance._stats_stored = None
+    fields = stats.metric_fields(sender)
+    if raw or instance._state.adding or not fields:
+        return
+    if update_fields is None or set(fields) & set(update_fields):
+        instance._stats_stored = stats.stored_values(sender, instance.pk, using)
+
+
+def update_metrics_on_save(sender, instance, created=False, raw=False, using=None, update_fields=None, **kwargs):
+    if raw:
+        return
+    stored = instance.__dict__.pop('_stats_stored', None)
+    if created:
+        stats.adjust(using, **{name: 1 for name in stats.metrics_for(instance)})
+    elif stored is not None:
+        # fields left out of ``update_fields`` keep their stored value
+        saved = {
+            field: getattr(instance, field) if update_fields is None or field in update_fields else value
+            for field, value in stored.items()
+        }
+        before, after = stats.metrics_of(sender, stored), stats.metrics_of(sender, saved)
+        stats.adjust(using, **{name: 1 for name in after - before}, **{name: -1 for name in before - after})
+
+
+def remember_metrics_on_delete(sender, instance, using=None, **kwargs):
+    metrics = stats.metrics_for(instance)
+    if metrics is None:
+        # partially loaded instance, read what it counted towards
+        stored = stats.stored_values(sender, instance.pk, using)
+        metrics = stats.metrics_of(sender, stored) if stored is not None else frozenset()
+    instance._stats_deleted = metrics
+
+
+def update_metrics_on_delete(sender, instance, using=None, **kwargs):
+    stats.adjust(using, **{name: -1 for name in instance.__dict__.pop('_stats_deleted', ())})
+
+
+def forget_principal(sender, instance, **kwargs):
+    for user_type, model in PRINCIPAL_MODELS.items():
+        if model is sender:
+            invalidate_principals(user_type, [instance.pk])
+
+
+def index_document(sender, instance, using=None, **kwargs):
+    search.index_objects(sender, [instance], using)
+
+
+def remove_document(sender, instance, using=None, **kwargs):
+    search.remove_objects(sender, [instance.pk], using)
+
+
+def connect():
+    for model in stats.TRACKED_MODELS:
+        pre_save.connect(remember_metrics_on_save, sender=model, dispatch_uid=f'stats_pre_save_{model.__name__}')
+        post_save.connect(update_metrics_on_save, sender=model, dispatch_uid=f'stats_save_{model.__name__}')
+        pre_delete.connect(remember_metrics_on_delete, sender=model, dispatch_uid=f'stats_pre_delete_{model.__name__}')
+        post_delete.connect(update_metrics_on_delete, sender=model, dispatch_uid=f'stats_delete_{model.__name__}')
+
+    for model in PRINCIPAL_MODELS.values():
+        post_save.connect(forget_principal, sender=model, dispatch_uid=f'principal_save_{model.__name__}')
+        post_delete.connect(forget_principal, sender=model, dispatch_uid=f'principal_delete_{model.__name__}')
+
+    for source in search.SOURCES.values():
+        post_save.connect(index_document, sender=source.model, dispatch_uid=f'search_save_{source.model.__name__}')
+        post_delete.connect(remove_document, sender=source.model, dispatch_uid=f'search_delete_{source.model.__name__}')
@@ -0,0 +1,104 @@
+"""
+Dashboard counters.
+
+The admin dashboard reads its numbers from the ``SystemStats`` table instead
+of counting the biggest tables on every hit.  The counters are adjusted by
+the model signals in ``signals.py``, which compare a row's metric fields as
+stored with what a save writes, and by explicit ``adjust()`` calls in the
+bulk code paths that bypass signals; ``recompute_stats`` repairs drift.
+"""
+from typing import Callable, NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import AnswerSheet, Exam, Faculty, Student, SystemStats
+from .reports import PENDING_CHECKING, PENDING_MARKS
+
+
+class Metric(NamedTuple):
+    model: type
+    condition: Q
+    test: Callable
+    fields: tuple
+
+
+METRICS = {
+    'total_exams': Metric(Exam, Q(), lambda exam: True, ()),
+    'active_faculty': Metric(Faculty, Q(is_active=True), lambda faculty: faculty.is_active, ('is_active',)),
+    'active_students': Metric(Student, Q(is_active=True), lambda student: student.is_active, ('is_active',)),
+    'pending_checking': Metric(
+        AnswerSheet,
+        PENDING_CHECKING,
+        lambda sheet: sheet.is_allocated and not sheet.is_checked,
+        ('is_allocated', 'is_checked'),
+    ),
+    'pending_marks': Metric(
+        AnswerSheet,
+        PENDING_MARKS,
+        lambda sheet: sheet.is_checked and sheet.marks_obtained is None,
+        ('is_checked', 'marks_obtained'),
+    ),
+}
+
+TRACKED_MODELS = {metric.model for metric in METRICS.values()}
+
+
+# names of the metrics ``instance`` counts towards, None if a field we need
+# wasn't loaded (reading it would cost a query per instance)
+def metrics_for(instance):
+    names = set()
+    for name, metric in METRICS.items():
+        if not isinstance(instance, metric.model):
+            continue
+        if any(field not in instance.__dict__ for field in metric.fields):
+            return None
+        if metric.test(instance):
+            names.add(name)
+    return frozenset(names)
+
+
+# the metric fields of ``model``
+def metric_fields(model):
+    return tuple(dict.fromkeys(field for metric in METRICS.values() if metric.model is model for field in metric.fields))
+
+
+# names of the metrics a ``model`` row with the metric field ``values`` counts towards
+def metrics_of(model, values):
+    return metrics_for(model(**values))
+
+
+# the metric field values of a row as stored, one query; None when it doesn't exist
+def stored_values(model, pk, using=DEFAULT_DB_ALIAS):
+    return model._base_manager.using(using).filter(pk=pk).values(*metric_fields(model)).first()
+
+
+# apply counter deltas, e.g. adjust(pending_checking=10, pending_marks=-1)
+def adjust(using=DEFAULT_DB_ALIAS, **deltas):
+    for name, delta in deltas.items():
+        if delta:
+            SystemStats.objects.using(using).filter(name=name).update(
+                value=F('value') + delta,
+                updated_at=timezone.now()
+            )
+
+
+def recompute_stats(names=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recount the metrics in ``names`` (all of them by default) from the
+    source tables and store them.  Returns the new values.
+    """
+    values = {}
+    for name in names or METRICS:
+        metric = METRICS[name]
+        values[name] = metric.model.objects.using(using).filter(metric.condition).count()
+        SystemStats.objects.using(using).update_or_create(name=name, defaults={'value': values[name]})
+    return values
+
+
+# every metric's value in one indexed lookup
+def get_stats():
+    values = dict.fromkeys(METRICS, 0)
+    values.update(SystemStats.objects.filter(name__in=list(METRICS)).values_list('name', 'value'))
+    return values
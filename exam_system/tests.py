@@ -1,3 +1,1554 @@
-from django.test import TestCase
+import io
+import tempfile
+import unittest
+from datetime import date, time, timedelta
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .allocation import allocate_papers, plan_allocation
+from .analytics import analytics_for, np, percentile_ranks
+from .attendance import create_attendance_sheet, save_attendance
+from .bulk import bulk_edit, set_active
+from .claims import claim_papers, open_pool, pool_sizes
+from .clashes import find_all_clashes, find_clash
+from .db import reporting_active, reporting_reads
+from .importer import import_accounts
+from .instrumentation import QueryBudgetExceeded, query_stats, record_queries
+from .listing import filter_students, keyset_page
+from .marking import Entry, save_marks
+from .marks_import import read_csv, read_rows, upload_marks
+from .middleware import get_principal
+from .models import Admin, AnswerSheet, Attendance, Exam, ExamSession, Faculty, SeatingArrangement, Semester, Student, StudentExamRegistration, Subject
+from .profiling import make_profile_token, view_name_of
+from .registration import ALREADY_REGISTERED, CLASH, FULL, REGISTERED, UNAVAILABLE, register_student, sync_registered_counts
+from .reports import PENDING_CHECKING, PENDING_MARKS, allocation_coverage_per_exam, pending_work_per_faculty
+from .routers import ReportingRouter
+from .search import rebuild_index, search
+from .seating import Room, arrange_session, compute_layout, parse_rooms
+from .sessions import create_sessions, exam_slots, plan_sessions, split_evenly
+from .stats import get_stats, recompute_stats
+from .timetable import Slot, apply_timetable, build_conflict_graph, make_slots, propose_timetable
+from .timetable_import import CREATE, UNCHANGED, import_timetable, read_timetable
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+def make_admin():
+    return Admin.objects.create(username='admin', password='x', name='Admin', email='admin@example.com')
+
+
+def log_in(client, principal):
+    session = client.session
+    session.update({'user_type': type(principal).__name__.lower(), 'user_id': principal.id, 'username': principal.username})
+    session.save()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class HotQueryIndexTests(TestCase):
+    """
+    The filters of the busiest pages must stay on the indexes added for them.
+    Every statement a page runs is captured and EXPLAINed, so a failure here
+    means a view changed its filter or an index was dropped.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Subject A', code='A', semester=semester)
+        cls.exam = Exam.objects.create(
+            subject=subject, start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+            is_published=True,
+        )
+        cls.session = ExamSession.objects.create(
+            exam=cls.exam, date='2026-01-01', session_number=1, start_time='09:00', end_time='12:00',
+        )
+        cls.admin = make_admin()
+        cls.faculty = Faculty.objects.create(username='f1', password='x', name='F 1', email='f1@example.com', department='X')
+        student = Student.objects.create(
+            username='s1', password='x', name='S 1', email='s1@example.com', roll_number='R001', semester=semester,
+        )
+        StudentExamRegistration.objects.create(student=student, exam=cls.exam)
+        AnswerSheet.objects.create(student=student, exam=cls.exam, faculty=cls.faculty, is_allocated=True)
+
+    def plans(self, principal, url, data=None):
+        """
+        The query plans of every statement run by a request to ``url`` (a
+        POST when ``data`` is given), logged in as ``principal``.
+        """
+        log_in(self.client, principal)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data) if data is not None else self.client.get(url)
+        self.assertLess(response.status_code, 400)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                if query['sql'].split(None, 1)[0].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plans.append('\n'.join(str(row[-1]) for row in cursor.fetchall()))
+        return plans
+
+    def assertUsesIndex(self, plans, index_name):
+        self.assertTrue(
+            any(f'INDEX {index_name}' in plan for plan in plans),
+            f'{index_name} not used:\n' + '\n\n'.join(plans),
+        )
+
+    def test_faculty_papers(self):
+        self.assertUsesIndex(self.plans(self.faculty, '/faculty/dashboard/'), 'answersheet_faculty_state_idx')
+        self.assertUsesIndex(self.plans(self.faculty, '/faculty/check-papers/'), 'answersheet_pending_check_idx')
+
+    def test_faculty_enter_marks(self):
+        self.assertUsesIndex(self.plans(self.faculty, '/faculty/enter-marks/'), 'answersheet_pending_marks_idx')
+
+    def test_admin_pending_tasks(self):
+        for url in ('/admin/dashboard/', '/admin/pending-tasks/'):
+            plans = self.plans(self.admin, url)
+            self.assertUsesIndex(plans, 'answersheet_pending_check_idx')
+            self.assertUsesIndex(plans, 'answersheet_pending_marks_idx')
+
+    def test_allocation_coverage(self):
+        self.assertUsesIndex(self.plans(self.admin, '/admin/allocate-papers/'), 'answersheet_exam_alloc_idx')
+
+    def test_attendance_sheet(self):
+        plans = self.plans(self.admin, '/admin/attendance-sheets/', {
+            'exam_id': self.exam.id, 'date': '2026-01-01', 'session_number': 1,
+        })
+        self.assertUsesIndex(plans, 'registration_exam_student_idx')
+        self.assertUsesIndex(plans, 'attendance_session_present_idx')
+
+    def test_co_scheduled_sessions(self):
+        plans = self.plans(self.admin, '/admin/seating-arrangement/', {
+            'session_id': self.session.id, 'separate_subjects': 'on',
+        })
+        self.assertUsesIndex(plans, 'session_date_number_idx')
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.semester = Semester.objects.create(name='Semester 1')
+        other = Semester.objects.create(name='Semester 2')
+        # identical created_at values must still page by id
+        Student.objects.bulk_create([
+            Student(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=cls.semester if index % 2 else other,
+            )
+            for index in range(25)
+        ])
+        # bulk inserts skip the signals that index new rows
+        if connection.vendor == 'sqlite':
+            rebuild_index()
+
+    def walk(self, queryset, size):
+        seen = []
+        page = keyset_page(queryset, size=size)
+        while True:
+            seen.extend(student.id for student in page.items)
+            if not page.next_cursor:
+                return seen, page
+            page = keyset_page(queryset, after=page.next_cursor, size=size)
+
+    def test_pages_cover_every_row_once(self):
+        seen, last = self.walk(Student.objects.all(), 4)
+        expected = list(Student.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+        # and back again from the last page
+        previous = keyset_page(Student.objects.all(), before=last.previous_cursor, size=4)
+        self.assertEqual([student.id for student in previous.items], expected[20:24])
+        self.assertEqual(previous.next_cursor, keyset_page(Student.objects.all(), after=None, size=24).next_cursor)
+
+    def test_filters(self):
+        queryset, filters = filter_students(Student.objects.all(), {'semester': str(self.semester.id), 'q': 'r00'})
+        self.assertEqual(filters, {'semester': str(self.semester.id), 'q': 'r00'})
+        self.assertEqual(sorted(student.roll_number for student in queryset), ['R001', 'R003', 'R005', 'R007', 'R009'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+    def test_later_pages_seek_the_index(self):
+        first = keyset_page(Student.objects.all(), size=4)
+        for queryset, index_name in [
+            (Student.objects.all(), 'student_created_idx'),
+            (Student.objects.filter(semester=self.semester), 'student_semester_created_idx'),
+        ]:
+            with CaptureQueriesContext(connection) as captured:
+                keyset_page(queryset, after=first.next_cursor, size=4)
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {captured[-1]["sql"]}')
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(f'INDEX {index_name}', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'the search index is SQLite FTS5')
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.semester = Semester.objects.create(name='Semester 1')
+        cls.alice = Student.objects.create(
+            username='alice', password='x', name='Alice Johnson', email='alice.johnson@university.edu',
+            roll_number='CS001', semester=cls.semester,
+        )
+        cls.faculty = Faculty.objects.create(
+            username='jsmith', password='x', name='John Smith', email='j.smith@university.edu', department='Physics',
+        )
+        cls.subject = Subject.objects.create(name='Operating Systems', code='CS301', semester=cls.semester)
+
+    def found(self, query, **kwargs):
+        return [(result.kind, result.id) for result in search(query, **kwargs)]
+
+    def test_prefix_match_across_kinds(self):
+        self.assertEqual(self.found('ali joh'), [('student', self.alice.id)])
+        self.assertEqual(self.found('cs0'), [('student', self.alice.id)])
+        self.assertEqual(self.found('oper'), [('subject', self.subject.id)])
+        self.assertEqual(self.found('phys', kinds=['student']), [])
+
+    def test_name_ranks_above_codes(self):
+        other = Student.objects.create(
+            username='bob', password='x', name='Bob Lee', email='johnson.fan@university.edu',
+            roll_number='CS002', semester=self.semester,
+        )
+        self.assertEqual(self.found('johnson'), [('student', self.alice.id), ('student', other.id)])
+
+    def test_kept_in_sync(self):
+        self.alice.name = 'Alicia Keys'
+        self.alice.roll_number = 'ME001'
+        self.alice.save()
+        self.assertEqual(self.found('cs001'), [])
+        self.assertEqual(self.found('keys me001'), [('student', self.alice.id)])
+
+        self.faculty.delete()
+        self.assertEqual(self.found('smith'), [])
+
+    def test_rebuild(self):
+        Student.objects.filter(pk=self.alice.pk).update(name='Renamed Directly')
+        self.assertEqual(rebuild_index(), 3)
+        self.assertEqual(self.found('renamed'), [('student', self.alice.id)])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.found('"alice" ('), [('student', self.alice.id)])
+        self.assertEqual(self.found('***'), [])
+
+
+class AccountImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.semester = Semester.objects.create(name='Semester 1')
+        Student.objects.create(
+            username='taken', password='x', name='Taken', email='taken@example.com',
+            roll_number='T001', semester=cls.semester,
+        )
+
+    def test_valid_rows_imported_and_bad_rows_reported(self):
+        stream = io.StringIO(
+            'username,password,name,email,roll_number,semester\n'
+            'alice,pw,Alice,alice@example.com,R001,Semester 1\n'
+            'bob,pw,Bob,bob@example.com,R002,%d\n'
+            'taken,pw,Dup,dup@example.com,R003,Semester 1\n'
+            'alice,pw,Again,again@example.com,R004,Semester 1\n'
+            'carol,pw,Carol,not-an-email,R005,Semester 9\n' % self.semester.id
+        )
+        result = import_accounts('students', stream, batch_size=2)
+
+        self.assertEqual((result.processed, result.imported), (5, 2))
+        self.assertEqual([(error.line, error.username) for error in result.errors], [(4, 'taken'), (5, 'alice'), (6, 'carol')])
+        self.assertEqual(result.errors[1].message, 'username "alice" repeats line 2')
+        self.assertEqual(set(Student.objects.values_list('username', flat=True)), {'taken', 'alice', 'bob'})
+
+    def test_dry_run_imports_nothing(self):
+        stream = io.StringIO('username,password,name,email,department\njdoe,pw,J Doe,j@example.com,Physics\n')
+        result = import_accounts('faculty', stream, dry_run=True)
+        self.assertEqual((result.imported, result.errors), (1, []))
+        self.assertFalse(Faculty.objects.exists())
+
+
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.semester = Semester.objects.create(name='Semester 1')
+        cls.other = Semester.objects.create(name='Semester 2')
+        for index in range(6):
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=cls.semester if index < 4 else cls.other,
+                is_active=index != 0,
+            )
+        Subject.objects.create(name='Physics', code='PH101', semester=cls.semester)
+        Subject.objects.create(name='Chemistry', code='CH101', semester=cls.other)
+        recompute_stats()
+
+    def test_deactivate_by_filter_counts_only_changed_rows(self):
+        with CaptureQueriesContext(connection) as captured:
+            result = set_active(Student.objects.filter(semester=self.semester), False)
+        self.assertEqual((result.selected, result.updated), (4, 3))
+        self.assertEqual(sum('UPDATE "exam_system_student"' in query['sql'] for query in captured), 1)
+        self.assertEqual(get_stats()['active_students'], recompute_stats(['active_students'])['active_students'])
+
+    def test_cascade_to_subjects(self):
+        result = set_active(Semester.objects.filter(pk=self.semester.pk), False, cascade=True)
+        self.assertEqual(result.cascaded, {'subjects': 1})
+        self.assertEqual(list(Subject.objects.filter(is_active=True).values_list('code', flat=True)), ['CH101'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'the search index is SQLite FTS5')
+    def test_edit_reindexes_searched_fields(self):
+        faculty = Faculty.objects.create(username='f1', password='x', name='F One', email='f1@example.com', department='Physics')
+        result = bulk_edit(Faculty.objects.filter(pk=faculty.pk), 'department', 'Mathematics')
+        self.assertEqual(result.updated, 1)
+        self.assertEqual([hit.id for hit in search('mathematics')], [faculty.id])
+        with self.assertRaises(ValueError):
+            bulk_edit(Faculty.objects.all(), 'username', 'x')
+
+    def test_view_moves_filtered_students(self):
+        log_in(self.client, make_admin())
+        self.client.post('/admin/manage-students/', {
+            'action': 'bulk', 'bulk_action': 'edit', 'scope': 'filtered',
+            'semester': str(self.other.id), 'bulk_semester_id': str(self.semester.id),
+        })
+        self.assertEqual(Student.objects.filter(semester=self.semester).count(), 6)
+
+
+class BatchMarkingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Physics', code='PH101', semester=semester)
+        exam = Exam.objects.create(
+            subject=subject, start_date='2026-01-01', end_date='2026-01-01',
+            start_time='09:00', end_time='12:00', total_marks=50,
+        )
+        cls.faculty = Faculty.objects.create(username='f1', password='x', name='F One', email='f1@example.com', department='Physics')
+        other = Faculty.objects.create(username='f2', password='x', name='F Two', email='f2@example.com', department='Physics')
+        cls.papers = [
+            AnswerSheet.objects.create(
+                student=Student.objects.create(
+                    username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                    roll_number=f'R{index:03d}', semester=semester,
+                ),
+                exam=exam, faculty=cls.faculty if index < 4 else other, is_allocated=True,
+            )
+            for index in range(5)
+        ]
+        recompute_stats()
+
+    def test_valid_rows_saved_and_bad_rows_reported(self):
+        ids = [paper.id for paper in self.papers]
+        entries = {
+            ids[0]: Entry('42', 'good'),
+            ids[1]: Entry('50', ''),
+            ids[2]: Entry('51', ''),
+            ids[3]: Entry('four', ''),
+            ids[4]: Entry('10', ''),
+        }
+        with CaptureQueriesContext(connection) as captured:
+            result = save_marks(self.faculty, entries, 'check')
+        self.assertEqual(result.saved, 2)
+        self.assertEqual([(error.paper_id, error.message) for error in result.errors], [
+            (ids[2], 'marks must be between 0 and 50'),
+            (ids[3], '"four" is not a whole number'),
+            (ids[4], 'not allocated to you'),
+        ])
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "exam_system_answersheet"') for query in captured), 1)
+        self.assertEqual(
+            list(AnswerSheet.objects.filter(is_checked=True).values_list('marks_obtained', 'remarks')),
+            [(42, 'good'), (50, '')],
+        )
+        self.assertEqual(get_stats()['pending_checking'], 3)
+
+        # checked papers are not checked twice
+        self.assertEqual(save_marks(self.faculty, {ids[0]: Entry('1', '')}, 'check').errors[0].message, 'already checked')
+
+    def test_grid_view_keeps_rejected_rows(self):
+        session = self.client.session
+        session.update({'user_type': 'faculty', 'user_id': self.faculty.id, 'username': 'f1'})
+        session.save()
+        response = self.client.post('/faculty/check-papers/', {
+            f'marks_{self.papers[0].id}': '30', f'marks_{self.papers[1].id}': '99', f'marks_{self.papers[2].id}': '',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'marks must be between 0 and 50')
+        self.assertEqual([paper.id for paper in response.context['allocated_papers']], [paper.id for paper in self.papers[1:4]])
+        self.assertEqual(AnswerSheet.objects.get(pk=self.papers[0].pk).marks_obtained, 30)
+
+
+class MarksUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Physics', code='PH101', semester=semester)
+        exam = Exam.objects.create(
+            subject=subject, start_date='2026-01-01', end_date='2026-01-01',
+            start_time='09:00', end_time='12:00', total_marks=50,
+        )
+        cls.faculty = Faculty.objects.create(username='f1', password='x', name='F One', email='f1@example.com', department='Physics')
+        other = Faculty.objects.create(username='f2', password='x', name='F Two', email='f2@example.com', department='Physics')
+        for index in range(5):
+            student = Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            AnswerSheet.objects.create(
+                student=student, exam=exam, faculty=cls.faculty if index < 4 else other,
+                is_allocated=True, is_checked=index == 3,
+            )
+        recompute_stats()
+
+    def test_rows_matched_saved_and_conflicts_reported(self):
+        stream = io.StringIO(
+            'Roll_Number,Subject_Code,Marks,Remarks\n'
+            'R000,PH101,40,good\n'
+            'R003,PH101,45,\n'
+            'R001,PH101,60,\n'
+            'R999,PH101,10,\n'
+            'R004,PH101,10,\n'
+            'R000,PH101,41,\n'
+        )
+        result = upload_marks(self.faculty, read_csv(stream), batch_size=4)
+
+        self.assertEqual((result.processed, result.saved), (6, 2))
+        self.assertEqual([(conflict.line, conflict.message) for conflict in result.conflicts], [
+            (4, 'marks must be between 0 and 50'),
+            (5, 'unknown roll number'),
+            (6, 'not allocated to you'),
+            (7, 'repeats line 2'),
+        ])
+        self.assertEqual(
+            dict(AnswerSheet.objects.filter(marks_obtained__isnull=False).values_list('student__roll_number', 'marks_obtained')),
+            {'R000': 40, 'R003': 45},
+        )
+        self.assertEqual(get_stats()['pending_checking'], 3)
+        self.assertEqual(get_stats()['pending_marks'], 0)
+
+    @skipUnless(openpyxl, 'needs openpyxl')
+    def test_xlsx_sheet(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['Roll_Number', 'Subject_Code', 'Marks', 'Remarks'])
+        sheet.append(['R000', 'PH101', 40, 'good'])
+        sheet.append([None, None, None, None])
+        sheet.append(['R001', 'PH101', 60.0, None])
+        stream = io.BytesIO()
+        workbook.save(stream)
+        stream.seek(0)
+
+        result = upload_marks(self.faculty, read_rows('marks.xlsx', stream))
+        self.assertEqual((result.processed, result.saved), (2, 1))
+        self.assertEqual([(conflict.line, conflict.message) for conflict in result.conflicts], [
+            (4, 'marks must be between 0 and 50'),
+        ])
+        self.assertEqual(AnswerSheet.objects.get(student__roll_number='R000').remarks, 'good')
+
+    def test_view_reports_missing_columns(self):
+        session = self.client.session
+        session.update({'user_type': 'faculty', 'user_id': self.faculty.id, 'username': 'f1'})
+        session.save()
+        upload = SimpleUploadedFile('marks.csv', b'roll_number,marks\nR000,40\n', content_type='text/csv')
+        response = self.client.post('/faculty/upload-marks/', {'file': upload}, follow=True)
+        self.assertContains(response, 'Missing columns: subject_code')
+
+
+def claim_fixture(students):
+    semester = Semester.objects.create(name='Semester 1')
+    subject = Subject.objects.create(name='Physics', code='PH101', semester=semester)
+    exam = Exam.objects.create(
+        subject=subject, start_date='2026-01-01', end_date='2026-01-01',
+        start_time='09:00', end_time='12:00', is_published=True,
+    )
+    for index in range(students):
+        student = Student.objects.create(
+            username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+            roll_number=f'R{index:03d}', semester=semester,
+        )
+        StudentExamRegistration.objects.create(student=student, exam=exam)
+    faculty = [
+        Faculty.objects.create(username=f'f{index}', password='x', name=f'F {index}', email=f'f{index}@example.com', department='Physics')
+        for index in range(4)
+    ]
+    open_pool(exam)
+    recompute_stats()
+    return exam, faculty
+
+
+class ClaimQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.exam, cls.faculty = claim_fixture(12)
+
+    def test_claims_take_disjoint_batches(self):
+        self.assertEqual(pool_sizes([self.exam.id]), {self.exam.id: 12})
+        self.assertEqual(claim_papers(self.faculty[0], self.exam, 5), 5)
+        self.assertEqual(claim_papers(self.faculty[1], self.exam, 5), 5)
+        self.assertEqual(claim_papers(self.faculty[2], self.exam, 5), 2)
+        self.assertEqual(claim_papers(self.faculty[3], self.exam, 5), 0)
+        self.assertEqual(
+            dict(AnswerSheet.objects.values('faculty').annotate(total=Count('id')).values_list('faculty', 'total')),
+            {self.faculty[0].id: 5, self.faculty[1].id: 5, self.faculty[2].id: 2},
+        )
+        self.assertEqual(get_stats()['pending_checking'], 12)
+
+    def test_expired_claims_return_to_the_pool(self):
+        claim_papers(self.faculty[0], self.exam, 4)
+        AnswerSheet.objects.filter(faculty=self.faculty[0]).update(lease_expires_at=timezone.now() - timedelta(minutes=1))
+        checked = AnswerSheet.objects.filter(faculty=self.faculty[0]).first()
+        checked.is_checked = True
+        checked.save()
+        self.assertEqual(pool_sizes([self.exam.id]), {self.exam.id: 11})
+
+        self.assertEqual(claim_papers(self.faculty[1], self.exam, 20), 11)
+        self.assertEqual(AnswerSheet.objects.filter(faculty=self.faculty[0]).count(), 1)
+        self.assertEqual(get_stats()['pending_checking'], recompute_stats(['pending_checking'])['pending_checking'])
+
+
+class TimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        cls.exams = {}
+        for code in ('A', 'B', 'C', 'D'):
+            subject = Subject.objects.create(name=f'Subject {code}', code=code, semester=semester)
+            cls.exams[code] = Exam.objects.create(
+                subject=subject, start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+            )
+        # A-B and B-C share students, D shares none
+        takes = {0: 'AB', 1: 'BC', 2: 'D', 3: 'A'}
+        for index, codes in takes.items():
+            student = Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for code in codes:
+                StudentExamRegistration.objects.create(student=student, exam=cls.exams[code])
+
+    def slots_of(self, timetable):
+        return {placement.exam_id: placement.slot for placement in timetable.placements}
+
+    def test_conflict_graph_bitsets(self):
+        graph = build_conflict_graph([(1, 10), (1, 11), (2, 11), (2, 12), (3, 13)], [10, 11, 12, 13, 14])
+        self.assertEqual(graph.adjacency, [0b10, 0b101, 0b10, 0, 0])
+        self.assertEqual(graph.sizes, [1, 2, 1, 1, 0])
+
+    def test_no_clash_and_no_shared_day_when_possible(self):
+        monday = date(2026, 3, 2)
+        timetable = propose_timetable(Exam.objects.all(), make_slots(monday, monday + timedelta(days=1), sessions=(1,)))
+        slots = self.slots_of(timetable)
+        a, b, c = (slots[self.exams[code].id] for code in 'ABC')
+        self.assertNotEqual(a.date, b.date)
+        self.assertNotEqual(b.date, c.date)
+        self.assertEqual(timetable.unplaced, [])
+        self.assertFalse(any(placement.same_day for placement in timetable.placements))
+
+        # one day only: clashes still never share a session, the shared day is reported
+        timetable = propose_timetable(Exam.objects.all(), make_slots(monday, monday))
+        slots = self.slots_of(timetable)
+        self.assertNotEqual(slots[self.exams['A'].id], slots[self.exams['B'].id])
+        self.assertEqual(sum(placement.same_day for placement in timetable.placements), 2)
+
+    def test_capacity_and_published_exams(self):
+        monday = date(2026, 3, 2)
+        self.exams['B'].start_date = monday
+        self.exams['B'].start_time = time(14, 0)
+        self.exams['B'].is_published = True
+        self.exams['B'].save()
+        timetable = propose_timetable(
+            Exam.objects.filter(is_published=False), make_slots(monday, monday), capacity=2,
+        )
+        slots = self.slots_of(timetable)
+        # B holds the afternoon and its two students fill it, A fills the morning
+        self.assertEqual(slots, {self.exams['A'].id: Slot(monday, 1)})
+        self.assertEqual(timetable.unplaced, [self.exams['C'].id, self.exams['D'].id])
+
+    def test_apply_creates_sessions(self):
+        monday = date(2026, 3, 2)
+        timetable = propose_timetable(Exam.objects.all(), make_slots(monday, monday + timedelta(days=3)))
+        sessions = apply_timetable(timetable)
+        self.assertEqual(len(sessions), 4)
+        for placement in timetable.placements:
+            exam = Exam.objects.get(pk=placement.exam_id)
+            self.assertEqual(exam.start_date, placement.slot.date)
+            self.assertEqual(ExamSession.objects.get(exam=exam).session_number, placement.slot.session_number)
+
+    def test_view_proposes_then_applies(self):
+        log_in(self.client, make_admin())
+        form = {'start_date': '2026-03-02', 'end_date': '2026-03-03', 'sessions': ['1', '2']}
+        response = self.client.post('/admin/timetable/', {**form, 'action': 'propose'})
+        self.assertEqual(len(response.context['placements']), 4)
+        self.assertFalse(ExamSession.objects.exists())
+
+        self.client.post('/admin/timetable/', {**form, 'action': 'apply'})
+        self.assertEqual(ExamSession.objects.count(), 4)
+
+
+class RegistrationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Subject A', code='A', semester=semester)
+        cls.students = [
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(3)
+        ]
+        exam = {'subject': subject, 'start_date': '2026-03-02', 'end_date': '2026-03-02', 'start_time': '09:00', 'end_time': '12:00'}
+        cls.exam = Exam.objects.create(capacity=2, is_published=True, **exam)
+        cls.draft = Exam.objects.create(**exam)
+
+    def registered_count(self, exam):
+        return Exam.objects.get(pk=exam.pk).registered_count
+
+    def test_capacity_and_counts(self):
+        self.assertEqual(register_student(self.students[0].id, self.exam.id), REGISTERED)
+        self.assertEqual(register_student(self.students[0].id, self.exam.id), ALREADY_REGISTERED)
+        self.assertEqual(register_student(self.students[1].id, self.exam.id), REGISTERED)
+        self.assertEqual(register_student(self.students[2].id, self.exam.id), FULL)
+        # refused registrations neither stay nor count
+        self.assertEqual(StudentExamRegistration.objects.filter(exam=self.exam).count(), 2)
+        self.assertEqual(self.registered_count(self.exam), 2)
+
+        self.assertEqual(register_student(self.students[2].id, self.draft.id), UNAVAILABLE)
+        self.assertEqual(register_student(self.students[2].id, self.draft.id + 100), UNAVAILABLE)
+        self.assertFalse(StudentExamRegistration.objects.filter(student=self.students[2]).exists())
+        self.assertEqual(self.registered_count(self.draft), 0)
+
+        self.assertEqual(sync_registered_counts(), 0)
+        Exam.objects.filter(pk=self.exam.pk).update(registered_count=5)
+        self.assertEqual(sync_registered_counts(), 1)
+        self.assertEqual(self.registered_count(self.exam), 2)
+
+    def test_view_messages(self):
+        session = self.client.session
+        session.update({'user_type': 'student', 'user_id': self.students[0].id, 'username': 's0'})
+        session.save()
+        response = self.client.post('/student/register-exam/', {'exam_id': self.exam.id}, follow=True)
+        self.assertEqual([str(message) for message in response.context['messages']], ['Successfully registered for Subject A'])
+        response = self.client.post('/student/register-exam/', {'exam_id': self.exam.id}, follow=True)
+        self.assertEqual([str(message) for message in response.context['messages']], ['Already registered for this exam'])
+
+
+class ClashDetectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        cls.student = Student.objects.create(
+            username='s1', password='x', name='Student 1', email='s1@example.com', roll_number='R001', semester=semester,
+        )
+        # A and B overlap, C starts as A ends, D runs later on two days
+        times = {'A': ('09:00', '12:00'), 'B': ('11:00', '13:00'), 'C': ('12:00', '15:00'), 'D': ('16:00', '18:00')}
+        cls.exams = {}
+        for code, (start, end) in times.items():
+            subject = Subject.objects.create(name=f'Subject {code}', code=code, semester=semester)
+            cls.exams[code] = Exam.objects.create(
+                subject=subject, start_date='2026-03-02', end_date='2026-03-03' if code == 'D' else '2026-03-02',
+                start_time=start, end_time=end, is_published=True,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def register(self, code):
+        with self.captureOnCommitCallbacks(execute=True):
+            return register_student(self.student.id, self.exams[code].id)
+
+    def test_multi_day_exams_clash_only_on_shared_times(self):
+        subject = Subject.objects.get(code='A')
+        exams = {
+            name: Exam.objects.create(
+                subject=subject, start_date=start_date, end_date=end_date, start_time=start, end_time=end, is_published=True,
+            )
+            for name, start_date, end_date, start, end in (
+                ('mornings', '2026-01-01', '2026-01-05', '09:00', '12:00'),
+                ('afternoons', '2026-01-01', '2026-01-05', '14:00', '17:00'),
+                ('one afternoon', '2026-01-03', '2026-01-03', '14:00', '17:00'),
+                ('later afternoon', '2026-01-06', '2026-01-06', '14:00', '17:00'),
+            )
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            # the same days at other times, or the same times on other days
+            self.assertEqual(register_student(self.student.id, exams['mornings'].id), REGISTERED)
+            self.assertEqual(register_student(self.student.id, exams['one afternoon'].id), REGISTERED)
+            self.assertEqual(register_student(self.student.id, exams['later afternoon'].id), REGISTERED)
+            # a shared day at shared times
+            self.assertEqual(register_student(self.student.id, exams['afternoons'].id), CLASH)
+        self.assertEqual(find_clash(self.student.id, exams['afternoons'].id), exams['one afternoon'].id)
+
+        StudentExamRegistration.objects.create(student=self.student, exam=exams['afternoons'])
+        self.assertEqual(
+            [(clash.exam_id, clash.other_exam_id) for clash in find_all_clashes()],
+            [(exams['afternoons'].id, exams['one afternoon'].id)],
+        )
+
+    def test_register_refuses_overlapping_exam(self):
+        self.assertEqual(self.register('A'), REGISTERED)
+        self.assertEqual(self.register('B'), CLASH)
+        self.assertEqual(self.register('C'), REGISTERED)
+        self.assertEqual(self.register('D'), REGISTERED)
+        self.assertEqual(
+            set(StudentExamRegistration.objects.filter(student=self.student).values_list('exam__subject__code', flat=True)),
+            {'A', 'C', 'D'},
+        )
+        self.assertEqual(Exam.objects.get(pk=self.exams['B'].pk).registered_count, 0)
+
+        # one query over the student's registrations
+        with self.assertNumQueries(1):
+            self.assertIn(find_clash(self.student.id, self.exams['B'].id), {self.exams['A'].id, self.exams['C'].id})
+
+    def test_check_follows_changes(self):
+        self.register('A')
+        StudentExamRegistration.objects.filter(student=self.student).delete()
+        self.assertIsNone(find_clash(self.student.id, self.exams['B'].id))
+        self.register('C')
+
+        exam = self.exams['B']
+        exam.start_time, exam.end_time = time(14, 0), time(16, 0)
+        exam.save()
+        self.assertEqual(find_clash(self.student.id, exam.id), self.exams['C'].id)
+
+    def test_report_and_view(self):
+        for code in 'ABCD':
+            StudentExamRegistration.objects.create(student=self.student, exam=self.exams[code])
+        codes = {exam.id: code for code, exam in self.exams.items()}
+        pairs = {(codes[clash.exam_id], codes[clash.other_exam_id]) for clash in find_all_clashes()}
+        self.assertEqual(pairs, {('A', 'B'), ('B', 'C')})
+
+        log_in(self.client, make_admin())
+        response = self.client.get('/admin/registration-clashes/')
+        self.assertEqual(len(response.context['rows']), 2)
+        response = self.client.get('/admin/registration-clashes/', {'format': 'csv'})
+        self.assertEqual(response.content.decode().count('R001'), 2)
+
+
+class SessionPlannerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Subject A', code='A', semester=semester)
+        # two days of a full-day exam: four sessions
+        cls.exam = Exam.objects.create(
+            subject=subject, start_date='2026-03-02', end_date='2026-03-03', start_time='09:00', end_time='17:00',
+            is_published=True,
+        )
+        cls.students = Student.objects.bulk_create([
+            Student(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(10)
+        ])
+        StudentExamRegistration.objects.bulk_create([
+            StudentExamRegistration(student=student, exam=cls.exam) for student in reversed(cls.students)
+        ])
+
+    def test_slots_and_even_split(self):
+        slots = exam_slots(Exam.objects.get(pk=self.exam.pk))
+        self.assertEqual([(slot.slot.date, slot.slot.session_number) for slot in slots], [
+            (date(2026, 3, 2), 1), (date(2026, 3, 2), 2), (date(2026, 3, 3), 1), (date(2026, 3, 3), 2),
+        ])
+        self.assertEqual([len(group) for group in split_evenly(list(range(10)), 3)], [4, 3, 3])
+
+        # a short exam runs once a day at its own times
+        exam = Exam(start_date=date(2026, 3, 2), end_date=date(2026, 3, 2), start_time=time(10, 0), end_time=time(11, 0))
+        self.assertEqual([(slot.slot.session_number, slot.start_time) for slot in exam_slots(exam)], [(1, time(10, 0))])
+
+    def test_plan_uses_only_the_sessions_needed(self):
+        [plan] = plan_sessions(Exam.objects.all(), max_students=4)
+        self.assertEqual(len(plan.sessions), 3)
+        self.assertEqual(plan.days, 2)
+        self.assertEqual([len(group) for group in plan.groups], [4, 3, 3])
+        self.assertEqual(plan.unassigned, [])
+
+        [short] = plan_sessions(Exam.objects.all(), max_students=2)
+        self.assertEqual(len(short.sessions), 4)
+        self.assertEqual(len(short.unassigned), 2)
+        # deterministic: the same registrations give the same plan
+        [again] = plan_sessions(Exam.objects.all(), max_students=2)
+        self.assertEqual((again.groups, again.unassigned), (short.groups, short.unassigned))
+
+    def test_create_assigns_students_by_roll_number(self):
+        with self.assertNumQueries(8):
+            # exams, registrations, the sessions, an update per session and the savepoint
+            sessions = create_sessions(plan_sessions(Exam.objects.all(), max_students=4))
+        self.assertEqual(len(sessions), 3)
+        first = StudentExamRegistration.objects.filter(session=sessions[0]).order_by('student__roll_number')
+        self.assertEqual([registration.student.roll_number for registration in first], ['R000', 'R001', 'R002', 'R003'])
+
+        # seating and attendance follow the assignment
+        result = arrange_session(sessions[1])
+        self.assertEqual(len(result.seats), 3)
+
+    def test_view_proposes_then_applies(self):
+        log_in(self.client, make_admin())
+        self.assertNotContains(self.client.get('/admin/plan-sessions/'), 'Proposed Sessions')
+        response = self.client.post('/admin/plan-sessions/', {'max_students': '5', 'action': 'propose'})
+        self.assertEqual(len(response.context['plans']), 1)
+        self.assertFalse(ExamSession.objects.exists())
+
+        self.client.post('/admin/plan-sessions/', {'max_students': '5', 'action': 'apply'})
+        self.assertEqual(ExamSession.objects.count(), 2)
+        self.assertFalse(StudentExamRegistration.objects.filter(session__isnull=True).exists())
+
+
+    def test_only_planned_students_sit_each_session(self):
+        cache.clear()
+        # 10 students do not fit in 4 sessions of 2: the plan is refused
+        self.assertEqual(create_sessions(plan_sessions(Exam.objects.all(), max_students=2)), [])
+        self.assertFalse(StudentExamRegistration.objects.filter(session__isnull=False).exists())
+
+        sessions = create_sessions(plan_sessions(Exam.objects.all(), max_students=6))
+        self.assertEqual(len(sessions), 2)
+        late = Student.objects.create(
+            username='late', password='x', name='Late', email='late@example.com', roll_number='R100',
+            semester=self.students[0].semester,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(register_student(late.id, self.exam.id), REGISTERED)
+        self.assertEqual(StudentExamRegistration.objects.get(student=late).session, sessions[0])
+        # a registration that lost its session sits neither
+        StudentExamRegistration.objects.filter(student=self.students[9]).update(session=None)
+
+        seated = []
+        for session in sessions:
+            create_attendance_sheet(session)
+            seated.extend(seat.student_id for seat in arrange_session(session).seats)
+        on_sheets = list(Attendance.objects.values_list('student_id', flat=True))
+        self.assertEqual(len(on_sheets), 10)
+        self.assertEqual(sorted(on_sheets), sorted(seated))
+        self.assertEqual(len(set(on_sheets)), 10)
+        self.assertNotIn(self.students[9].id, on_sheets)
+
+        # once every planned session is full, later registrations are refused
+        ExamSession.objects.update(max_students=4)
+        other = Student.objects.create(
+            username='other', password='x', name='Other', email='other@example.com', roll_number='R101',
+            semester=self.students[0].semester,
+        )
+        self.assertEqual(register_student(other.id, self.exam.id), FULL)
+        self.assertFalse(StudentExamRegistration.objects.filter(student=other).exists())
+
+class TimetableImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        for code in ('A', 'B', 'C'):
+            Subject.objects.create(name=f'Subject {code}', code=code, semester=semester)
+        cls.scheduled = Exam.objects.create(
+            subject=Subject.objects.get(code='A'), start_date='2026-03-02', end_date='2026-03-02',
+            start_time='09:00', end_time='12:00',
+        )
+
+    def rows(self, text):
+        return read_timetable(io.StringIO('subject_code,start_date,start_time,end_time,capacity\n' + text))
+
+    def test_valid_timetable_in_one_insert(self):
+        text = 'A,2026-03-02,09:00,12:00,\nA,2026-03-09,09:00,12:00,\nB,2026-03-02,09:00,12:00,40\nC,2026-03-03,14:00,17:00,\n'
+        with self.assertNumQueries(6):
+            # subjects, exams, then the insert and the stats update in a savepoint
+            result = import_timetable(self.rows(text))
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.created, 3)
+        self.assertEqual([change.action for change in result.changes], [UNCHANGED, CREATE, CREATE, CREATE])
+        self.assertEqual(result.changes[1].existing, [self.scheduled])
+        self.assertEqual(Exam.objects.get(subject__code='B').capacity, 40)
+        self.assertEqual(get_stats()['total_exams'], 4)
+
+        # uploading it again creates nothing
+        self.assertEqual(import_timetable(self.rows(text)).created, 0)
+
+    def test_rejects_whole_file_on_bad_rows(self):
+        result = import_timetable(self.rows(
+            'A,2026-03-02,10:00,13:00,\n'  # overlaps the scheduled exam
+            'B,2026-03-02,09:00,12:00,\n'
+            'B,2026-03-02,09:00,12:00,\n'  # repeats line 3
+            'C,2026-03-04,14:00,17:00,\n'
+            'C,2026-03-04,16:00,18:00,\n'  # overlaps line 5
+            'X,2026-03-02,09:00,12:00,\n'
+            'C,2026-03-05,12:00,09:00,\n'
+            'C,2026-03-06,09:00,12:00,0\n'
+        ))
+        self.assertEqual([(error.line, error.message) for error in result.errors], [
+            (2, 'overlaps the exam of 2026-03-02 09:00'),
+            (4, 'repeats line 3'),
+            (6, 'overlaps line 5'),
+            (7, 'unknown or inactive subject code'),
+            (8, 'the exam must end after it starts'),
+            (9, 'capacity must be a positive whole number'),
+        ])
+        self.assertEqual(result.created, 0)
+        self.assertEqual(Exam.objects.count(), 1)
+
+    def test_view_dry_run_then_import(self):
+        log_in(self.client, make_admin())
+        upload = lambda: SimpleUploadedFile('timetable.csv', b'subject_code,start_date,start_time,end_time\nB,2026-03-02,09:00,12:00\n')
+        response = self.client.post('/admin/import-timetable/', {'file': upload(), 'dry_run': 'on'})
+        self.assertEqual(len(response.context['result'].changes), 1)
+        self.assertEqual(Exam.objects.count(), 1)
+
+        # the error report is always a dry run
+        response = self.client.post('/admin/import-timetable/', {'file': upload(), 'report': 'on'})
+        self.assertEqual(response.content.decode().splitlines(), ['line,subject_code,error'])
+        self.assertEqual(Exam.objects.count(), 1)
+
+        self.client.post('/admin/import-timetable/', {'file': upload()})
+        self.assertEqual(Exam.objects.count(), 2)
+
+
+@skipUnless(np is not None, 'result analytics need numpy')
+class ResultAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        cls.semester = semester
+        cls.exams = [
+            Exam.objects.create(
+                subject=Subject.objects.create(name=f'Subject {code}', code=code, semester=semester),
+                start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+                total_marks=total, is_published=True,
+            )
+            for code, total in (('A', 100), ('B', 50))
+        ]
+        cls.faculty = [
+            Faculty.objects.create(username=f'f{index}', password='x', name=f'F {index}', email=f'f{index}@example.com', department='X')
+            for index in range(2)
+        ]
+        cls.students = [
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(4)
+        ]
+        # exam A: faculty 0 marks 80 and 90, faculty 1 marks 30 and 50; exam B: 25 of 50
+        marks = [(0, 0, 0, 80), (0, 1, 0, 90), (0, 2, 1, 30), (0, 3, 1, 50), (1, 0, 1, 25)]
+        cls.papers = [
+            AnswerSheet.objects.create(
+                exam=cls.exams[exam], student=cls.students[student], faculty=cls.faculty[faculty],
+                is_allocated=True, is_checked=True, marks_obtained=value,
+            )
+            for exam, student, faculty, value in marks
+        ]
+        # unchecked papers are left out
+        AnswerSheet.objects.create(exam=cls.exams[1], student=cls.students[1], faculty=cls.faculty[0], is_allocated=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_percentile_ranks(self):
+        self.assertEqual(percentile_ranks(np.array([10.0, 20.0, 20.0, 40.0])).tolist(), [12.5, 50.0, 50.0, 87.5])
+
+    def test_exam_and_semester(self):
+        exam = analytics_for([self.exams[0].id])
+        self.assertEqual(exam.distribution.papers, 4)
+        self.assertEqual(exam.distribution.mean, 62.5)
+        self.assertEqual(exam.distribution.pass_rate, 75.0)
+        self.assertEqual(exam.distribution.histogram, [0, 0, 0, 1, 0, 1, 0, 0, 1, 1])
+        lenient, strict = exam.faculty
+        self.assertEqual((lenient.faculty_id, lenient.bias), (self.faculty[0].id, 22.5))
+        self.assertEqual((strict.faculty_id, strict.bias), (self.faculty[1].id, -22.5))
+
+        # student 0 has 80% and 50%, a mean of 65% across the semester
+        semester = analytics_for([exam.id for exam in self.exams])
+        self.assertEqual(semester.distribution.papers, 5)
+        self.assertEqual(semester.ranks[self.students[0].id], 62.5)
+        self.assertEqual(semester.ranks[self.students[1].id], 87.5)
+
+    def test_cached_until_marks_change(self):
+        exam_ids = [self.exams[0].id]
+        analytics_for(exam_ids)
+        # only the marks version query
+        with self.assertNumQueries(1):
+            analytics_for(exam_ids)
+
+        # the version comes from the papers, so writes that skip the signals count too
+        AnswerSheet.objects.filter(pk=self.papers[2].pk).update(marks_obtained=70)
+        self.assertEqual(analytics_for(exam_ids).distribution.mean, 72.5)
+        Exam.objects.filter(pk=self.exams[0].pk).update(total_marks=200)
+        self.assertEqual(analytics_for(exam_ids).distribution.mean, 36.25)
+
+        self.assertEqual(analytics_for([self.exams[1].id]).distribution.papers, 1)
+        unchecked = AnswerSheet.objects.get(is_checked=False)
+        save_marks(self.faculty[0], {unchecked.id: Entry('40', '')})
+        self.assertEqual(analytics_for([self.exams[1].id]).distribution.papers, 2)
+
+    def test_page_and_json(self):
+        log_in(self.client, make_admin())
+        response = self.client.get('/admin/analytics/', {'semester': self.semester.id})
+        self.assertEqual(response.context['result'].distribution.papers, 5)
+        self.assertEqual(response.context['faculty_bias'][0][1], self.faculty[0])
+
+        data = self.client.get('/admin/analytics/data/', {'exam': self.exams[1].id}).json()
+        self.assertEqual(data['distribution']['mean'], 50.0)
+        self.assertEqual(data['percentile_ranks'], {str(self.students[0].id): 50.0})
+        self.assertEqual(self.client.get('/admin/analytics/data/').status_code, 400)
+
+
+class PrincipalCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = make_admin()
+
+    def test_cached_until_the_account_changes(self):
+        request = RequestFactory().get('/')
+        request.session = {'user_type': 'admin', 'user_id': self.admin.id}
+        self.assertEqual(get_principal(request), self.admin)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_principal(request), self.admin)
+
+        self.admin.name = 'Renamed'
+        self.admin.save()
+        self.assertEqual(get_principal(request).name, 'Renamed')
+        self.admin.delete()
+        self.assertIsNone(get_principal(request))
+
+    def test_deleted_account_is_logged_out(self):
+        log_in(self.client, self.admin)
+        self.assertEqual(self.client.get('/admin/dashboard/').status_code, 200)
+        self.admin.delete()
+        self.assertRedirects(self.client.get('/admin/dashboard/'), '/login/')
+        self.assertNotIn('user_type', self.client.session)
+
+
+class StatsCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Subject A', code='A', semester=semester)
+        cls.exam = Exam.objects.create(
+            subject=subject, start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+        )
+        cls.faculty = Faculty.objects.create(username='f1', password='x', name='F 1', email='f1@example.com', department='X')
+        cls.students = [
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(3)
+        ]
+
+    def assertCountersMatch(self):
+        self.assertEqual(get_stats(), recompute_stats())
+
+    def test_counters_follow_create_update_and_delete(self):
+        recompute_stats()
+        sheets = [
+            AnswerSheet.objects.create(student=student, exam=self.exam, faculty=self.faculty, is_allocated=True)
+            for student in self.students
+        ]
+        self.assertCountersMatch()
+        self.assertEqual(get_stats()['pending_checking'], 3)
+
+        sheets[0].is_checked = True
+        sheets[0].save()
+        self.assertCountersMatch()
+        self.assertEqual(get_stats()['pending_marks'], 1)
+
+        # only the fields in update_fields are written
+        sheets[1].is_checked = True
+        sheets[1].marks_obtained = 10
+        sheets[1].save(update_fields=['marks_obtained'])
+        self.assertCountersMatch()
+
+        self.faculty.is_active = False
+        self.faculty.save()
+        self.students[2].delete()
+        self.exam.delete()
+        self.assertCountersMatch()
+        self.assertEqual(get_stats()['total_exams'], 0)
+
+    def test_partially_loaded_rows(self):
+        recompute_stats()
+        AnswerSheet.objects.create(student=self.students[0], exam=self.exam, faculty=self.faculty, is_allocated=True)
+
+        # one read of the stored fields instead of a recount
+        sheet = AnswerSheet.objects.only('is_checked').get()
+        sheet.is_checked = True
+        with CaptureQueriesContext(connection) as queries:
+            sheet.save()
+        self.assertFalse([query['sql'] for query in queries if 'COUNT(' in query['sql']])
+        self.assertCountersMatch()
+        self.assertEqual(get_stats()['pending_marks'], 1)
+
+        # a save not touching the metric fields reads nothing
+        sheet = AnswerSheet.objects.only('remarks').get()
+        sheet.remarks = 'Neat'
+        with self.assertNumQueries(1):
+            sheet.save()
+
+        AnswerSheet.objects.only('remarks').get().delete()
+        Student.objects.only('name').get(pk=self.students[1].pk).delete()
+        self.assertCountersMatch()
+
+
+class AttendanceQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Subject A', code='A', semester=semester)
+        cls.students = [
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(200)
+        ]
+
+    def session_of(self, size):
+        exam = Exam.objects.create(
+            subject=Subject.objects.get(), start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+        )
+        StudentExamRegistration.objects.bulk_create(
+            StudentExamRegistration(student=student, exam=exam) for student in self.students[:size]
+        )
+        return ExamSession.objects.create(exam=exam, date='2026-01-01', session_number=1, start_time='09:00', end_time='12:00')
+
+    def test_queries_do_not_grow_with_the_sheet(self):
+        for size in (5, 200):
+            with self.subTest(size=size):
+                session = self.session_of(size)
+                # planned exams, registrations, existing rows, one bulk insert
+                with self.assertNumQueries(4):
+                    self.assertEqual(create_attendance_sheet(session), size)
+                with self.assertNumQueries(3):
+                    self.assertEqual(create_attendance_sheet(session), 0)
+
+                present = [student.id for student in self.students[:size:2]]
+                # planned exams, registrations, existing rows, present and absent updates, in a savepoint
+                with self.assertNumQueries(7):
+                    self.assertEqual(save_attendance(session, present), (len(present), size - len(present)))
+                self.assertEqual(
+                    set(Attendance.objects.filter(exam_session=session, is_present=True).values_list('student_id', flat=True)),
+                    set(present),
+                )
+
+
+class ReportingRoutingTests(TestCase):
+    def test_router(self):
+        router = ReportingRouter()
+        # without the production profile there is no reporting connection
+        with reporting_reads():
+            self.assertIsNone(router.db_for_read(Exam))
+
+        with patch.object(ReportingRouter, 'reporting_alias', return_value='reporting'):
+            self.assertIsNone(router.db_for_read(Exam))
+            with reporting_reads():
+                self.assertEqual(router.db_for_read(Exam), 'reporting')
+            self.assertIsNone(router.db_for_read(Exam))
+
+            exam = Exam()
+            exam._state.db = 'reporting'
+            self.assertEqual(router.db_for_write(Exam, instance=exam), 'default')
+            self.assertIsNone(router.db_for_write(Exam, instance=Exam()))
+            self.assertFalse(router.allow_migrate('reporting', 'exam_system'))
+            self.assertIsNone(router.allow_migrate('default', 'exam_system'))
+
+    def routed_reads(self, method, url):
+        routed = []
+        db_for_read = ReportingRouter.db_for_read
+
+        # record where each read would go, but run it on the default connection
+        def record(router, model, **hints):
+            routed.append(db_for_read(router, model, **hints))
+
+        with patch.object(ReportingRouter, 'reporting_alias', return_value='reporting'), \
+                patch.object(ReportingRouter, 'db_for_read', autospec=True, side_effect=record):
+            getattr(self.client, method)(url)
+        self.assertFalse(reporting_active())
+        return routed
+
+    def test_reporting_views_read_from_reporting(self):
+        log_in(self.client, make_admin())
+        self.assertIn('reporting', self.routed_reads('get', '/admin/dashboard/'))
+        self.assertNotIn('reporting', self.routed_reads('post', '/admin/dashboard/'))
+        self.assertNotIn('reporting', self.routed_reads('get', '/admin/exam-setup/'))
+
+
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        query_stats.clear()
+        log_in(self.client, make_admin())
+
+    @override_settings(DEBUG=True)
+    def test_request_timings(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/pending-tasks/')
+        self.assertEqual(response['X-Query-View'], 'admin_pending_tasks')
+        self.assertEqual(int(response['X-Query-Count']), len(queries))
+        self.assertGreater(float(response['X-Query-Time-Ms']), 0)
+        # the pending tasks template is rendered through TimedDjangoTemplates
+        self.assertGreater(float(response['X-Template-Time-Ms']), 0)
+
+        stats = query_stats.snapshot()['admin_pending_tasks']
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['max_queries'], len(queries))
+        self.assertGreater(stats['avg_template_ms'], 0)
+
+    def test_budget_and_duplicates(self):
+        with record_queries() as recorder:
+            for _ in range(3):
+                list(Exam.objects.filter(id=1))
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.duplicates()[0][1], 3)
+
+        with override_settings(QUERY_BUDGETS={'admin_pending_tasks': 1}):
+            with self.assertLogs('exam_system.instrumentation', 'WARNING'):
+                self.client.get('/admin/pending-tasks/')
+            with override_settings(QUERY_BUDGET_ACTION='raise'), self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/admin/pending-tasks/')
+
+
+class AllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        subject = Subject.objects.create(name='Physics', code='PH101', semester=semester)
+        cls.exam = Exam.objects.create(
+            subject=subject, start_date='2026-01-01', end_date='2026-01-01',
+            start_time='09:00', end_time='12:00', is_published=True,
+        )
+        cls.faculty = [
+            Faculty.objects.create(
+                username=f'f{index}', password='x', name=f'F {index}', email=f'f{index}@example.com', department=department,
+            )
+            for index, department in enumerate(['Physics', 'Maths', 'Maths'])
+        ]
+        for index in range(6):
+            student = Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            StudentExamRegistration.objects.create(student=student, exam=cls.exam)
+        # one sheet left unallocated, e.g. by a closed claim pool
+        AnswerSheet.objects.create(student=student, exam=cls.exam)
+
+    def test_plan_allocation(self):
+        loads = {1: 0, 2: 2, 3: 1}
+        self.assertEqual(plan_allocation(5, loads), [1, 1, 3, 1, 2])
+        # caps count the papers a faculty already holds
+        self.assertEqual(plan_allocation(5, loads, {1: 1, 3: 2}), [1, 3, 2, 2, 2])
+        self.assertEqual(plan_allocation(5, loads, {1: 0, 2: 2, 3: 1}), [])
+        # preferred faculty fill up to their caps first
+        self.assertEqual(plan_allocation(5, loads, {2: 4}, [2]), [2, 2, 1, 1, 3])
+
+    def test_caps_and_department(self):
+        physics, maths, busy = self.faculty
+        for student in Student.objects.order_by('id')[:2]:
+            AnswerSheet.objects.create(student=student, exam=self.exam, faculty=busy, is_allocated=True)
+
+        # three students without a sheet and the unallocated one: the Physics
+        # faculty up to the cap, then the least loaded of the rest
+        result = allocate_papers(self.exam, [faculty.id for faculty in self.faculty], {physics.id: 2}, 'Physics')
+        self.assertEqual(result.allocated, {physics.id: 2, maths.id: 2, busy.id: 0})
+        self.assertEqual(result.unallocated, 0)
+        self.assertFalse(AnswerSheet.objects.filter(is_allocated=False).exists())
+        self.assertEqual(AnswerSheet.objects.filter(exam=self.exam).count(), 6)
+
+        # everyone at their cap
+        AnswerSheet.objects.filter(faculty=maths).delete()
+        result = allocate_papers(self.exam, [physics.id, maths.id], {physics.id: 2, maths.id: 1})
+        self.assertEqual((result.total, result.unallocated), (1, 1))
+        self.assertEqual(get_stats()['pending_checking'], recompute_stats(['pending_checking'])['pending_checking'])
+
+    def test_view_rejects_bad_input(self):
+        log_in(self.client, make_admin())
+        for form in (
+            {'exam_id': self.exam.id, 'faculty_ids': [self.faculty[0].id], f'cap_{self.faculty[0].id}': 'ten'},
+            {'exam_id': self.exam.id, 'faculty_ids': ['first']},
+            {'exam_id': 'x', 'faculty_ids': [self.faculty[0].id]},
+        ):
+            response = self.client.post('/admin/allocate-papers/', form, follow=True)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['messages']), 1)
+        self.assertFalse(AnswerSheet.objects.filter(is_allocated=True).exists())
+
+
+class SeatingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        cls.students = [
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(7)
+        ]
+        # two exams in the same slot, the first capped at three students
+        cls.sessions = []
+        for code, max_students, students in (('A', 3, cls.students[:5]), ('B', 10, cls.students[5:])):
+            subject = Subject.objects.create(name=f'Subject {code}', code=code, semester=semester)
+            exam = Exam.objects.create(
+                subject=subject, start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+            )
+            for student in students:
+                StudentExamRegistration.objects.create(student=student, exam=exam)
+            cls.sessions.append(ExamSession.objects.create(
+                exam=exam, date='2026-01-01', session_number=1, start_time='09:00', end_time='12:00',
+                max_students=max_students,
+            ))
+
+    def assertSeparated(self, seats):
+        groups = {(seat.room, seat.row_number, seat.column_number): seat.group for seat in seats}
+        for (room, row, column), group in groups.items():
+            self.assertNotEqual(groups.get((room, row, column + 1)), group)
+            self.assertNotEqual(groups.get((room, row + 1, column)), group)
+
+    def test_rooms_fill_row_by_row_up_to_capacity(self):
+        self.assertEqual(parse_rooms('A:2x2, B:2x3:2'), [Room('A', 2, 2, 4), Room('B', 2, 3, 2)])
+        with self.assertRaises(ValueError):
+            parse_rooms('A:2x2, A:3x3')
+
+        result = compute_layout([(student_id, None) for student_id in range(1, 8)], parse_rooms('A:2x2, B:2x3:2'))
+        self.assertEqual(
+            [(seat.seat_number, seat.row_number, seat.column_number) for seat in result.seats],
+            [('A01', 1, 1), ('A02', 1, 2), ('A03', 2, 1), ('A04', 2, 2), ('B01', 1, 1), ('B02', 1, 2)],
+        )
+        self.assertEqual(result.unseated, [7])
+
+    def test_groups_never_sit_side_by_side(self):
+        students = [(index, 'x' if index < 6 else 'y') for index in range(9)]
+        result = compute_layout(students, [Room('A', 3, 3)], separate_groups=True)
+        self.assertSeparated(result.seats)
+        self.assertEqual(len(result.seats) + len(result.unseated), 9)
+
+    def test_session_caps_and_subject_separation(self):
+        first, second = self.sessions
+        result = arrange_session(first, rooms=[Room('A', 3, 3)], separate_subjects=True)
+        self.assertSeparated(result.seats)
+        # the first session seats at most its three students, the overflow is reported
+        self.assertEqual(SeatingArrangement.objects.filter(exam_session=first).count(), 3)
+        self.assertEqual(SeatingArrangement.objects.filter(exam_session=second).count(), 2)
+        self.assertEqual(set(result.unseated), {student.id for student in self.students[3:5]})
+
+        # arranging again replaces the previous seating
+        arrange_session(second)
+        self.assertEqual(SeatingArrangement.objects.filter(exam_session=first).count(), 3)
+        self.assertEqual(SeatingArrangement.objects.filter(exam_session=second).count(), 2)
+
+    def test_view_counts_every_session_in_fixed_queries(self):
+        first, second = self.sessions
+        arrange_session(first, rooms=[Room('A', 3, 3)], separate_subjects=True)
+        log_in(self.client, make_admin())
+        self.client.get('/admin/seating-arrangement/')  # warm the principal cache
+        with CaptureQueriesContext(connection) as before:
+            self.client.get('/admin/seating-arrangement/')
+
+        # planning B's sessions: only the students assigned to each sit it
+        third = ExamSession.objects.create(
+            exam=second.exam, date='2026-01-02', session_number=1, start_time='09:00', end_time='12:00',
+        )
+        StudentExamRegistration.objects.filter(student=self.students[5]).update(session=second)
+        StudentExamRegistration.objects.filter(student=self.students[6]).update(session=third)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get('/admin/seating-arrangement/')
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(
+            {session.id: (session.seating_count, session.registration_count) for session in response.context['sessions']},
+            {first.id: (3, 5), second.id: (2, 1), third.id: (0, 1)},
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+    def test_arranging_runs_no_per_row_subquery(self):
+        # a correlated subquery in ``sitting`` runs once per registration and
+        # made seating a large session quadratic
+        with CaptureQueriesContext(connection) as queries:
+            arrange_session(self.sessions[0], rooms=[Room('A', 3, 3)])
+        with connection.cursor() as cursor:
+            for query in queries:
+                if query['sql'].startswith('SELECT'):
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+                    self.assertNotIn('CORRELATED', plan, query['sql'])
+
+        out = io.StringIO()
+        call_command('benchmark_seating', sizes=[50], stdout=out)
+        self.assertIn('50', out.getvalue())
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.admin = make_admin()
+
+    def profiles_of(self, token=None, sample_rate=0.0):
+        headers = {'HTTP_X_PROFILE_TOKEN': token} if token else {}
+        with override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=sample_rate, PROFILING_DIR=self.directory):
+            self.client.get('/', **headers)
+        profiles = sorted(path.name for path in self.directory.glob('*.prof'))
+        for path in self.directory.iterdir():
+            path.unlink()
+        return profiles
+
+    def test_token(self):
+        self.assertEqual(len(self.profiles_of(make_profile_token(self.admin.id))), 1)
+        self.assertEqual(self.profiles_of('not-a-token'), [])
+        self.assertEqual(self.profiles_of(make_profile_token(self.admin.id + 1)), [])
+
+        # a token stops working once its admin is deactivated
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertEqual(self.profiles_of(make_profile_token(self.admin.id)), [])
+
+    def test_sampling(self):
+        self.assertEqual(self.profiles_of(), [])
+        profiles = self.profiles_of(sample_rate=1.0)
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(view_name_of(profiles[0]), 'home')
+
+
+class ReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        semester = Semester.objects.create(name='Semester 1')
+        cls.faculty = [
+            Faculty.objects.create(
+                username=f'f{index}', password='x', name=f'F {index}', email=f'f{index}@example.com', department='X',
+                is_active=index < 3,
+            )
+            for index in range(4)
+        ]
+        students = [
+            Student.objects.create(
+                username=f's{index}', password='x', name=f'Student {index}', email=f's{index}@example.com',
+                roll_number=f'R{index:03d}', semester=semester,
+            )
+            for index in range(6)
+        ]
+        cls.exams = []
+        for index, code in enumerate('ABC'):
+            subject = Subject.objects.create(name=f'Subject {code}', code=code, semester=semester)
+            cls.exams.append(Exam.objects.create(
+                subject=subject, start_date='2026-01-01', end_date='2026-01-01', start_time='09:00', end_time='12:00',
+                is_published=code != 'C',
+            ))
+        # every paper state, spread over the faculty, exams and students
+        states = [
+            {'is_allocated': True},
+            {'is_allocated': True, 'is_checked': True},
+            {'is_allocated': True, 'is_checked': True, 'marks_obtained': 30},
+            {},
+        ]
+        for index, student in enumerate(students):
+            for exam in cls.exams[:1 + index % 3]:
+                StudentExamRegistration.objects.create(student=student, exam=exam)
+                state = states[(index + exam.id) % len(states)]
+                faculty = cls.faculty[(index + exam.id) % len(cls.faculty)] if state else None
+                if index % 5:
+                    AnswerSheet.objects.create(student=student, exam=exam, faculty=faculty, **state)
+
+    def test_pending_work_per_faculty(self):
+        with self.assertNumQueries(1):
+            rows = pending_work_per_faculty()
+        # the same numbers counted one faculty at a time
+        expected = []
+        for faculty in Faculty.objects.filter(is_active=True):
+            papers = AnswerSheet.objects.filter(faculty=faculty)
+            counts = (papers.filter(PENDING_CHECKING).count(), papers.filter(PENDING_MARKS).count())
+            if any(counts):
+                expected.append({'id': faculty.id, 'name': faculty.name, 'pending_count': counts[0], 'pending_marks_count': counts[1]})
+        expected.sort(key=lambda row: (-row['pending_count'], row['name']))
+        self.assertTrue(expected)
+        self.assertEqual(rows, expected)
+
+    def test_allocation_coverage_per_exam(self):
+        with self.assertNumQueries(3):
+            rows = allocation_coverage_per_exam()
+        self.assertEqual([row['exam'] for row in rows], self.exams[:2])
+        for row in rows:
+            total = StudentExamRegistration.objects.filter(exam=row['exam']).count()
+            allocated = AnswerSheet.objects.filter(exam=row['exam'], is_allocated=True).count()
+            self.assertEqual(
+                (row['total_students'], row['allocated_papers'], row['unallocated_papers']),
+                (total, allocated, total - allocated),
+            )
+        self.assertEqual(len(allocation_coverage_per_exam(Exam.objects.all())), 3)
+
+
+class ManagementCommandTests(TestCase):
+    """
+    Every benchmark and maintenance command run end to end at a tiny scale,
+    so one that falls behind a model or view change fails here first.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def run_command(self, *args, **options):
+        out = io.StringIO()
+        call_command(*args, stdout=out, **options)
+        return out.getvalue()
+
+    def generate(self):
+        return self.run_command(
+            'generate_load_data', scale='small', semesters=1, subjects=2, faculty=3, students=20, registrations=2,
+        )
+
+    def test_generate_load_data_and_benchmark_urls(self):
+        self.assertIn('Generated', self.generate())
+        self.assertEqual(Student.objects.count(), 20)
+        make_admin()
+
+        report = self.directory / 'report.json'
+        out = self.run_command('benchmark_urls', iterations=1, warmup=0, output=str(report))
+        self.assertIn('All routes within budget', out)
+        self.assertTrue(report.exists())
+
+    def test_import_accounts_and_rebuild_search_index(self):
+        Semester.objects.create(name='Semester 1')
+        path = self.directory / 'students.csv'
+        path.write_text(
+            'username,password,name,email,roll_number,semester\n'
+            's1,x,Student 1,s1@example.com,R001,Semester 1\n'
+            's2,x,Student 2,s2@example.com,R002,No Such Semester\n'
+        )
+        out = self.run_command('import_accounts', 'students', str(path))
+        self.assertIn('2 rows read, 1 imported, 1 rejected', out)
+        self.assertTrue(Student.objects.filter(username='s1').exists())
+
+        if connection.vendor == 'sqlite':
+            self.assertIn('Indexed', self.run_command('rebuild_search_index'))
+            self.assertEqual([hit.title for hit in search('Student 1')], ['Student 1'])
+
+    def test_summarize_profiles(self):
+        admin = make_admin()
+        with override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0, PROFILING_DIR=self.directory):
+            self.client.get('/')
+        out = self.run_command('summarize_profiles', dir=str(self.directory), top=3)
+        self.assertIn('home: 1 requests', out)
+        self.assertIn('X-Profile-Token', self.run_command('summarize_profiles', issue_token=admin.username))
+
+
+class LoadTestCommandTests(unittest.TestCase):
+    """
+    The threaded load tests make and migrate their own throwaway SQLite
+    files, which Django's test cases would refuse to connect to.
+    """
+
+    def run_command(self, *args, **options):
+        out = io.StringIO()
+        call_command(*args, stdout=out, **options)
+        return out.getvalue()
+
+    def test_registration_load_test(self):
+        out = self.run_command('loadtest_registration', threads=2, students=20, exams=2, capacity=5, attempts=2)
+        self.assertIn('Counters consistent, no errors', out)
+
+    def test_sqlite_concurrency_benchmark(self):
+        out = self.run_command(
+            'benchmark_sqlite_concurrency', readers=1, writers=1, duration=0.2, students=20, profiles=['production'],
+        )
+        self.assertIn('errors: 0', out)
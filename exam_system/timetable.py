@@ -0,0 +1,214 @@
+"""
+Timetable solver: exams onto date x session slots without student clashes.
+
+Exams are the nodes of a conflict graph, adjacent when at least one student
+is registered for both.  Each exam's adjacency is one Python int used as a
+bitset (bit j set when it shares a student with exam j), so the graph is
+built in one pass over the ``(student, exam)`` pairs and every clash test
+is a single ``&``.
+
+The graph is coloured greedily, largest degree first, into the available
+slots.  An exam never goes into a slot that holds one of its neighbours or
+that would go over the slot's seat capacity.  Where it can, it also avoids
+days that already hold a neighbour (the soft "no two exams per student per
+day" constraint).  Published exams keep their slot and are coloured first.
+"""
+from datetime import time, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import NamedTuple
+
+from django.db import transaction
+
+from .db import id_list
+from .models import Exam, ExamSession, StudentExamRegistration
+
+# session_number -> (start, end), 1 for morning and 2 for afternoon
+SESSION_TIMES = {
+    1: (time(9, 0), time(12, 0)),
+    2: (time(14, 0), time(17, 0)),
+}
+
+
+class Slot(NamedTuple):
+    date: object
+    session_number: int
+
+
+class ConflictGraph(NamedTuple):
+    exam_ids: list  # node -> exam id
+    sizes: list  # node -> registered students
+    adjacency: list  # node -> bitset of the nodes sharing a student with it
+
+    def degree(self, node):
+        return self.adjacency[node].bit_count()
+
+
+class Placement(NamedTuple):
+    exam_id: int
+    slot: Slot
+    students: int
+    same_day: int  # neighbouring exams on the same day, 0 unless unavoidable
+
+
+class Timetable(NamedTuple):
+    placements: list
+    unplaced: list  # exam ids that fit in no slot
+
+
+def make_slots(start, end, sessions=(1, 2), skip_weekdays=(6,)):
+    """
+    Every ``sessions`` slot of every day from ``start`` to ``end``
+    inclusive, except the ``skip_weekdays`` (``date.weekday()``, Sundays by
+    default).
+    """
+    slots = []
+    day = start
+    while day <= end:
+        if day.weekday() not in skip_weekdays:
+            slots.extend(Slot(day, number) for number in sorted(sessions))
+        day += timedelta(days=1)
+    return slots
+
+
+# the slot an already scheduled exam sits in
+def slot_of(exam):
+    return Slot(exam.start_date, 1 if exam.start_time < SESSION_TIMES[2][0] else 2)
+
+
+def build_conflict_graph(pairs, exam_ids=()):
+    """
+    ``ConflictGraph`` of ``(student_id, exam_id)`` pairs sorted by student.
+    Exams in ``exam_ids`` are nodes even without registrations, in that
+    order.
+    """
+    index = {}
+    sizes = []
+    adjacency = []
+
+    def node(exam_id):
+        if exam_id not in index:
+            index[exam_id] = len(sizes)
+            sizes.append(0)
+            adjacency.append(0)
+        return index[exam_id]
+
+    for exam_id in exam_ids:
+        node(exam_id)
+    for _, rows in groupby(pairs, key=itemgetter(0)):
+        nodes = [node(exam_id) for _, exam_id in rows]
+        mask = 0
+        for n in nodes:
+            sizes[n] += 1
+            mask |= 1 << n
+        if len(nodes) > 1:
+            for n in nodes:
+                adjacency[n] |= mask
+
+    for n in range(len(adjacency)):
+        adjacency[n] &= ~(1 << n)
+    return ConflictGraph(list(index), sizes, adjacency)
+
+
+def colour(graph, slots, capacity=None, fixed=None):
+    """
+    Place every node of ``graph`` in one of ``slots``, see the module
+    docstring.  ``capacity`` limits the students seated per slot and
+    ``fixed`` maps exam ids to the slot they already have.
+    """
+    fixed = fixed or {}
+    positions = {slot: position for position, slot in enumerate(slots)}
+    slot_masks = [0] * len(slots)
+    slot_loads = [0] * len(slots)
+    day_masks = {}
+    placements = []
+    unplaced = []
+
+    def place(node, position):
+        bit = 1 << node
+        slot_masks[position] |= bit
+        slot_loads[position] += graph.sizes[node]
+        day = slots[position].date
+        day_masks[day] = day_masks.get(day, 0) | bit
+
+    movable = []
+    for node, exam_id in enumerate(graph.exam_ids):
+        if exam_id in fixed and fixed[exam_id] in positions:
+            place(node, positions[fixed[exam_id]])
+        elif exam_id not in fixed:
+            movable.append(node)
+
+    movable.sort(key=lambda node: (-graph.degree(node), -graph.sizes[node], graph.exam_ids[node]))
+    for node in movable:
+        neighbours = graph.adjacency[node]
+        best = best_penalty = None
+        for position, slot in enumerate(slots):
+            if neighbours & slot_masks[position]:
+                continue
+            if capacity is not None and slot_loads[position] + graph.sizes[node] > capacity:
+                continue
+            penalty = (neighbours & day_masks.get(slot.date, 0)).bit_count()
+            if best is None or penalty < best_penalty:
+                best, best_penalty = position, penalty
+                if not penalty:
+                    break
+        if best is None:
+            unplaced.append(graph.exam_ids[node])
+            continue
+        place(node, best)
+        placements.append(Placement(graph.exam_ids[node], slots[best], graph.sizes[node], best_penalty))
+
+    placements.sort(key=lambda placement: (placement.slot, placement.exam_id))
+    return Timetable(placements, sorted(unplaced))
+
+
+def propose_timetable(exams, slots, capacity=None):
+    """
+    ``Timetable`` for the ``exams`` queryset over ``slots``.  Published
+    exams outside ``exams`` that sit in one of the slots are kept where
+    they are, and their students' clashes count.
+    """
+    exam_ids = list(exams.order_by('id').values_list('id', flat=True))
+    fixed = {
+        exam.id: slot_of(exam)
+        for exam in Exam.objects.filter(
+            is_published=True, start_date__gte=slots[0].date, start_date__lte=slots[-1].date
+        ).exclude(id__in=id_list(exam_ids)).only('id', 'start_date', 'start_time')
+    } if slots else {}
+
+    pairs = StudentExamRegistration.objects.filter(
+        exam_id__in=id_list([*exam_ids, *fixed])
+    ).order_by('student_id').values_list('student_id', 'exam_id').iterator(chunk_size=10000)
+    graph = build_conflict_graph(pairs, exam_ids)
+    return colour(graph, slots, capacity, fixed)
+
+
+# the timetable as unsaved ExamSession rows, one per exam
+def proposed_sessions(timetable):
+    return [
+        ExamSession(
+            exam_id=placement.exam_id,
+            date=placement.slot.date,
+            session_number=placement.slot.session_number,
+            start_time=SESSION_TIMES[placement.slot.session_number][0],
+            end_time=SESSION_TIMES[placement.slot.session_number][1],
+            max_students=max(placement.students, 1),
+        )
+        for placement in timetable.placements
+    ]
+
+
+def apply_timetable(timetable):
+    """
+    Move every placed exam to its slot and create its ``ExamSession``, in
+    one bulk update and one bulk insert.  Returns the sessions created.
+    """
+    sessions = proposed_sessions(timetable)
+    exams = Exam.objects.in_bulk([session.exam_id for session in sessions])
+    for session in sessions:
+        exam = exams[session.exam_id]
+        exam.start_date = exam.end_date = session.date
+        exam.start_time, exam.end_time = session.start_time, session.end_time
+    with transaction.atomic():
+        Exam.objects.bulk_update(exams.values(), ['start_date', 'end_date', 'start_time', 'end_time'], batch_size=500)
+        return ExamSession.objects.bulk_create(sessions, batch_size=500)
@@ -0,0 +1,182 @@
+"""
+Bulk timetable import: a semester of exams from one CSV keyed by subject code.
+
+Every row is checked against a subject map and the existing exams of the
+file's subjects, each fetched with one query.  A row that repeats another,
+or whose times overlap another sitting of the same subject (in the file or
+already scheduled), is rejected with its line number.  A row identical to an
+existing exam is left out, so uploading the same timetable twice creates
+nothing new.
+
+The import is all or nothing: unless every row is valid no exam is created,
+and otherwise they are all created with one ``bulk_create`` in one
+transaction.  A dry run returns the same changes without saving them.
+"""
+import csv
+from datetime import date, time
+from typing import NamedTuple
+
+from django.db import transaction
+
+from . import stats
+from .clashes import clashing
+from .db import id_list, value_list
+from .importer import ImportFormatError
+from .models import Exam, Subject
+
+COLUMNS = ('subject_code', 'start_date', 'start_time', 'end_time')  # and optionally end_date, total_marks, capacity
+
+CREATE = 'create'
+UNCHANGED = 'unchanged'
+
+
+class RowError(NamedTuple):
+    line: int
+    subject_code: str
+    message: str
+
+
+class Change(NamedTuple):
+    line: int
+    action: str  # CREATE, or UNCHANGED for a row matching an existing exam
+    exam: Exam  # unsaved for CREATE, the existing exam for UNCHANGED
+    existing: list  # the other exams of the subject already scheduled
+
+
+class TimetableImportResult(NamedTuple):
+    processed: int
+    created: int  # 0 unless every row is valid and it is not a dry run
+    changes: list
+    errors: list
+
+
+def read_timetable(stream):
+    reader = csv.DictReader(stream)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or ()]
+    missing = [column for column in COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise ImportFormatError(f'Missing columns: {", ".join(missing)}')
+    for row in reader:
+        yield reader.line_num, {column: (value or '').strip() for column, value in row.items() if column}
+
+
+def parse_row(row):
+    """
+    The ``Exam`` fields of ``row`` other than the subject, or raises
+    ValueError with what is wrong.
+    """
+    try:
+        start_date = date.fromisoformat(row['start_date'])
+        end_date = date.fromisoformat(row.get('end_date') or row['start_date'])
+    except ValueError:
+        raise ValueError('dates must be YYYY-MM-DD')
+    try:
+        start_time = time.fromisoformat(row['start_time'])
+        end_time = time.fromisoformat(row['end_time'])
+    except ValueError:
+        raise ValueError('times must be HH:MM')
+    if end_date < start_date or end_time <= start_time:
+        raise ValueError('the exam must end after it starts')
+
+    fields = {'start_date': start_date, 'end_date': end_date, 'start_time': start_time, 'end_time': end_time}
+    for name, default in (('total_marks', 100), ('capacity', None)):
+        value = row.get(name) or ''
+        if not value:
+            fields[name] = default
+        elif value.isdigit() and int(value) > 0:
+            fields[name] = int(value)
+        else:
+            raise ValueError(f'{name} must be a positive whole number')
+    return fields
+
+
+def _key(exam):
+    return (exam.subject_id, exam.start_date, exam.end_date, exam.start_time, exam.end_time)
+
+
+def _window(exam):
+    return (exam.start_date, exam.end_date, exam.start_time, exam.end_time)
+
+
+def _label(exam):
+    return f'the exam of {exam.start_date} {exam.start_time:%H:%M}'
+
+
+def import_timetable(rows, dry_run=False):
+    """
+    Check ``rows`` (``(line, row)`` pairs, see ``read_timetable``) and create
+    their exams.  Returns a ``TimetableImportResult``.
+    """
+    rows = list(rows)
+    subjects = {
+        subject.code: subject
+        for subject in Subject.objects.filter(
+            is_active=True, code__in=value_list({row['subject_code'] for _, row in rows if row.get('subject_code')})
+        )
+    }
+    existing = {}  # subject id -> its scheduled exams
+    for exam in Exam.objects.select_related('subject').filter(
+        subject_id__in=id_list(subject.id for subject in subjects.values())
+    ).order_by('start_date', 'start_time', 'id'):
+        existing.setdefault(exam.subject_id, []).append(exam)
+    scheduled = {_key(exam): exam for exams in existing.values() for exam in exams}
+    windows = {  # subject id -> (window, label) of its exams, scheduled or accepted
+        subject_id: [(_window(exam), _label(exam)) for exam in exams]
+        for subject_id, exams in existing.items()
+    }
+
+    seen = {}  # key -> line
+    changes = []
+    errors = []
+    for line, row in rows:
+        code = row.get('subject_code', '')
+        missing = [column for column in COLUMNS if not row.get(column)]
+        if missing:
+            errors.append(RowError(line, code, f'{", ".join(missing)} required'))
+            continue
+        subject = subjects.get(code)
+        if subject is None:
+            errors.append(RowError(line, code, 'unknown or inactive subject code'))
+            continue
+        try:
+            exam = Exam(subject=subject, **parse_row(row))
+        except ValueError as e:
+            errors.append(RowError(line, code, str(e)))
+            continue
+
+        key = _key(exam)
+        if key in seen:
+            errors.append(RowError(line, code, f'repeats line {seen[key]}'))
+            continue
+        seen[key] = line
+        others = existing.get(subject.id, [])
+        if key in scheduled:
+            changes.append(Change(line, UNCHANGED, scheduled[key], [other for other in others if other is not scheduled[key]]))
+            continue
+
+        sittings = windows.setdefault(subject.id, [])
+        window = _window(exam)
+        overlap = next((label for other, label in sittings if clashing(window, other)), None)
+        if overlap is not None:
+            errors.append(RowError(line, code, f'overlaps {overlap}'))
+            continue
+        sittings.append((window, f'line {line}'))
+        changes.append(Change(line, CREATE, exam, others))
+
+    created = 0
+    if not errors and not dry_run:
+        new = [change.exam for change in changes if change.action == CREATE]
+        with transaction.atomic():
+            Exam.objects.bulk_create(new, batch_size=500)
+            # bulk inserts skip the model signals
+            stats.adjust(total_exams=len(new))
+        created = len(new)
+
+    errors.sort()
+    return TimetableImportResult(len(rows), created, changes, errors)
+
+
+def write_error_report(errors, stream):
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'subject_code', 'error'])
+    writer.writerows(errors)
@@ -10,6 +10,10 @@ urlpatterns = [
     # Admin URLs
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/exam-setup/', views.admin_exam_setup, name='admin_exam_setup'),
+    path('admin/import-timetable/', views.admin_import_timetable, name='admin_import_timetable'),
+    path('admin/timetable/', views.admin_timetable, name='admin_timetable'),
+    path('admin/plan-sessions/', views.admin_plan_sessions, name='admin_plan_sessions'),
+    path('admin/registration-clashes/', views.admin_registration_clashes, name='admin_registration_clashes'),
     path('admin/publish-schedule/', views.admin_publish_schedule, name='admin_publish_schedule'),
     path('admin/attendance-sheets/', views.admin_attendance_sheets, name='admin_attendance_sheets'),
     path('admin/seating-arrangement/', views.admin_seating_arrangement, name='admin_seating_arrangement'),
@@ -19,11 +23,18 @@ urlpatterns = [
     path('admin/manage-subjects/', views.admin_manage_subjects, name='admin_manage_subjects'),
     path('admin/manage-faculty/', views.admin_manage_faculty, name='admin_manage_faculty'),
     path('admin/manage-students/', views.admin_manage_students, name='admin_manage_students'),
+    path('admin/import-accounts/', views.admin_import_accounts, name='admin_import_accounts'),
+    path('admin/query-stats/', views.admin_query_stats, name='admin_query_stats'),
+    path('admin/search/', views.admin_search, name='admin_search'),
+    path('admin/analytics/', views.admin_analytics, name='admin_analytics'),
+    path('admin/analytics/data/', views.admin_analytics_data, name='admin_analytics_data'),
     
     # Faculty URLs
     path('faculty/dashboard/', views.faculty_dashboard, name='faculty_dashboard'),
     path('faculty/check-papers/', views.faculty_check_papers, name='faculty_check_papers'),
     path('faculty/enter-marks/', views.faculty_enter_marks, name='faculty_enter_marks'),
+    path('faculty/claim-papers/', views.faculty_claim_papers, name='faculty_claim_papers'),
+    path('faculty/upload-marks/', views.faculty_upload_marks, name='faculty_upload_marks'),
     
     # Student URLs
     path('student/dashboard/', views.student_dashboard, name='student_dashboard'),
@@ -1,10 +1,35 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponse, JsonResponse
+from django.conf import settings
 from django.contrib import messages
 from django.utils import timezone
+from django.db.models import Count
+from django.utils.http import urlencode
 from datetime import datetime, date
+import csv
+import io
 import json
 from .models import *
+from .allocation import allocate_papers
+from .analytics import HISTOGRAM_BINS, AnalyticsUnavailable, analytics_for
+from .attendance import create_attendance_sheet, parse_present_ids, present_student_ids, save_attendance, session_registrations
+from .bulk import bulk_edit, set_active
+from .claims import claim_papers, claims_of, open_pool, pool_sizes
+from .clashes import find_all_clashes
+from .db import id_list
+from .importer import SPECS as IMPORT_SPECS, ImportFormatError, import_accounts, write_error_report
+from .instrumentation import query_stats
+from .listing import filter_faculty, filter_students, filter_subjects, keyset_page
+from .marking import parse_grid, save_marks
+from .marks_import import read_rows, upload_marks, write_conflict_report
+from .registration import ALREADY_REGISTERED, CLASH, FULL, REGISTERED, register_student
+from .reports import allocation_coverage_per_exam, pending_work_per_faculty
+from .search import SOURCES as SEARCH_SOURCES, search
+from .seating import arrange_session, parse_rooms
+from .sessions import create_sessions, plan_sessions, sitting_counts
+from .stats import get_stats
+from .timetable import SESSION_TIMES, apply_timetable, make_slots, propose_timetable
+from .timetable_import import import_timetable, read_timetable, write_error_report as write_timetable_error_report
 
 # set user session into local storage
 def set_user_session(request, user_type, user_id, username):
@@ -20,6 +45,10 @@ def clear_user_session(request):
 def check_login(request):
     if 'user_type' not in request.session:
         return False
+    # the account was deleted since logging in
+    if not request.principal:
+        clear_user_session(request)
+        return False
     return True
 
 # check if user is admin
@@ -40,6 +69,42 @@ def check_student(request):
         return False
     return True
 
+# rows a bulk action applies to: the ticked ids, or every row matching the page filters
+def bulk_selection(request, queryset, filter_rows=None):
+    if filter_rows is not None and request.POST.get('scope') == 'filtered':
+        return filter_rows(queryset, request.POST)[0]
+    ids = [int(pk) for pk in request.POST.getlist('ids') if pk.isdigit()]
+    return queryset.filter(pk__in=id_list(ids))
+
+# run the posted bulk action over the selection and report the rows it changed
+def run_bulk_action(request, queryset, label, edit=None):
+    bulk_action = request.POST.get('bulk_action')
+    if bulk_action in ('activate', 'deactivate'):
+        result = set_active(queryset, bulk_action == 'activate', cascade=request.POST.get('cascade') == 'on')
+        message = f'{result.updated} of {result.selected} {label} {bulk_action}d'
+        for child, count in result.cascaded.items():
+            message += f', with {count} {child}'
+        messages.success(request, message)
+    elif bulk_action == 'edit' and edit is not None:
+        result = bulk_edit(queryset, *edit)
+        messages.success(request, f'{result.updated} {label} updated')
+    elif bulk_action == 'edit':
+        messages.error(request, 'Choose the new value for the selected rows')
+    else:
+        messages.error(request, 'Choose a bulk action')
+
+# the papers still pending after a grid POST, each rejected one carrying its
+# entered values and error; rejections for papers not on the page become messages
+def grid_rows(request, papers, entries, errors):
+    errors = {error.paper_id: error.message for error in errors}
+    for paper in papers:
+        if paper.id in errors:
+            paper.entry = entries[paper.id]
+            paper.error = errors.pop(paper.id)
+    for paper_id, message in errors.items():
+        messages.error(request, f'Paper {paper_id}: {message}')
+    return papers
+
 # redirect to home page
 def home(request):
     return render(request, 'exam_system/home.html')
@@ -89,20 +154,26 @@ def admin_dashboard(request):
     if not check_admin(request):
         return redirect('login')
     
-    admin = Admin.objects.get(id=request.session['user_id'])
-    exams = Exam.objects.all().order_by('-created_at')
-    faculties = Faculty.objects.filter(is_active=True)
-    students = Student.objects.filter(is_active=True)
+    admin = request.principal
+    
+    # Counters come from the stats table, only the rows shown are loaded
+    stats = get_stats()
+    exams = Exam.objects.select_related('subject').order_by('-created_at')[:5]
     
     # Pending tasks
-    pending_checking = AnswerSheet.objects.filter(is_allocated=True, is_checked=False)
-    pending_marks = AnswerSheet.objects.filter(is_checked=True, marks_obtained__isnull=True)
+    pending_checking = AnswerSheet.objects.filter(
+        is_allocated=True,
+        is_checked=False
+    ).select_related('student', 'exam__subject', 'faculty')[:5]
+    pending_marks = AnswerSheet.objects.filter(
+        is_checked=True,
+        marks_obtained__isnull=True
+    ).select_related('student', 'exam__subject', 'faculty')[:5]
     
     context = {
         'admin': admin,
+        'stats': stats,
         'exams': exams,
-        'faculties': faculties,
-        'students': students,
         'pending_checking': pending_checking,
         'pending_marks': pending_marks,
     }
@@ -120,6 +191,7 @@ def admin_exam_setup(request):
         start_time = request.POST.get('start_time')
         end_time = request.POST.get('end_time')
         total_marks = request.POST.get('total_marks', 100)
+        capacity = request.POST.get('capacity') or None
         
         subject = Subject.objects.get(id=subject_id)
         
@@ -129,7 +201,8 @@ def admin_exam_setup(request):
             end_date=end_date,
             start_time=start_time,
             end_time=end_time,
-            total_marks=total_marks
+            total_marks=total_marks,
+            capacity=capacity
         )
         
         messages.success(request, f'Exam created for {subject.name}')
@@ -139,6 +212,157 @@ def admin_exam_setup(request):
     context = {'subjects': subjects}
     return render(request, 'exam_system/admin/exam_setup.html', context)
 
+# Admin Import Timetable (a semester of exams from one CSV)
+def admin_import_timetable(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    context = {}
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        report = bool(request.POST.get('report'))
+        # downloading the error report never creates exams
+        dry_run = report or bool(request.POST.get('dry_run'))
+        if upload is None:
+            messages.error(request, 'Choose a CSV file')
+            return redirect('admin_import_timetable')
+        
+        try:
+            result = import_timetable(
+                read_timetable(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')), dry_run=dry_run
+            )
+        except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            messages.error(request, f'Could not read the file: {e}')
+            return redirect('admin_import_timetable')
+        
+        if report:
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="timetable-import-errors.csv"'
+            write_timetable_error_report(result.errors, response)
+            return response
+        
+        if result.errors:
+            messages.error(request, f'{len(result.errors)} of {result.processed} rows were rejected, no exams were created')
+        elif dry_run:
+            messages.success(request, f'All {result.processed} rows are valid')
+        else:
+            messages.success(request, f'Created {result.created} exams from {result.processed} rows')
+        context.update({'result': result, 'dry_run': dry_run, 'shown_errors': result.errors[:200]})
+    
+    return render(request, 'exam_system/admin/import_timetable.html', context)
+
+# Admin Timetable (place exams in date x session slots without student clashes)
+def admin_timetable(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    context = {
+        'semesters': Semester.objects.filter(is_active=True),
+        'form': request.POST,
+        'session_times': SESSION_TIMES,
+        'sessions': list(SESSION_TIMES),
+    }
+    if request.method == 'POST':
+        try:
+            start = date.fromisoformat(request.POST.get('start_date', ''))
+            end = date.fromisoformat(request.POST.get('end_date', ''))
+        except ValueError:
+            messages.error(request, 'Enter the first and last day of the exam period')
+            return redirect('admin_timetable')
+        sessions = [int(number) for number in request.POST.getlist('sessions') if number.isdigit() and int(number) in SESSION_TIMES] or list(SESSION_TIMES)
+        capacity = request.POST.get('capacity', '')
+        skip_weekdays = (5, 6) if request.POST.get('skip_weekends') else (6,)
+        
+        # unpublished exams that have no sessions yet, of one semester or all
+        exams = Exam.objects.filter(is_published=False, examsession__isnull=True)
+        semester = request.POST.get('semester', '')
+        if semester.isdigit():
+            exams = exams.filter(subject__semester_id=int(semester))
+        
+        context['sessions'] = sessions
+        timetable = propose_timetable(
+            exams, make_slots(start, end, sessions, skip_weekdays), int(capacity) if capacity.isdigit() else None
+        )
+        
+        if request.POST.get('action') == 'apply':
+            created = apply_timetable(timetable)
+            messages.success(request, f'Scheduled {len(created)} exams, publish them when ready')
+            if timetable.unplaced:
+                messages.error(request, f'{len(timetable.unplaced)} exams did not fit, add days or seats')
+            return redirect('admin_timetable')
+        
+        names = Exam.objects.select_related('subject').in_bulk([
+            *(placement.exam_id for placement in timetable.placements), *timetable.unplaced
+        ])
+        context.update({
+            'timetable': timetable,
+            'placements': [(placement, names[placement.exam_id]) for placement in timetable.placements],
+            'unplaced': [names[exam_id] for exam_id in timetable.unplaced],
+        })
+    return render(request, 'exam_system/admin/timetable.html', context)
+
+# Admin Plan Sessions
+def admin_plan_sessions(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    context = {
+        'semesters': Semester.objects.filter(is_active=True),
+        'form': request.POST,
+    }
+    if request.method == 'POST':
+        max_students = request.POST.get('max_students', '')
+        if not max_students.isdigit() or int(max_students) < 1:
+            messages.error(request, 'Enter the number of students a session can seat')
+            return redirect('admin_plan_sessions')
+        
+        # exams that have no sessions yet, of one semester or all
+        exams = Exam.objects.filter(examsession__isnull=True)
+        semester = request.POST.get('semester', '')
+        if semester.isdigit():
+            exams = exams.filter(subject__semester_id=int(semester))
+        plans = plan_sessions(exams.select_related('subject'), int(max_students))
+        
+        if request.POST.get('action') == 'apply':
+            created = create_sessions(plans)
+            skipped = sum(1 for plan in plans if plan.unassigned)
+            messages.success(request, f'Created {len(created)} sessions for {len(plans) - skipped} exams')
+            if skipped:
+                messages.error(request, f'{skipped} exams have more students than their dates can seat and got no sessions, raise the seats per session')
+            return redirect('admin_plan_sessions')
+        
+        names = Exam.objects.select_related('subject').in_bulk([plan.exam_id for plan in plans])
+        context['plans'] = [(plan, names[plan.exam_id]) for plan in plans]
+    return render(request, 'exam_system/admin/plan_sessions.html', context)
+
+# Admin Registration Clashes
+def admin_registration_clashes(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    # one pass over all registrations, then names for the clashing rows only
+    clashes = list(find_all_clashes())
+    students = Student.objects.only('name', 'roll_number').in_bulk({clash.student_id for clash in clashes})
+    exams = Exam.objects.select_related('subject').in_bulk({
+        exam_id for clash in clashes for exam_id in (clash.exam_id, clash.other_exam_id)
+    })
+    rows = [(students[clash.student_id], exams[clash.exam_id], exams[clash.other_exam_id]) for clash in clashes]
+    
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="registration-clashes.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['roll_number', 'student', 'subject_code', 'start', 'other_subject_code', 'other_start'])
+        for student, exam, other in rows:
+            writer.writerow([
+                student.roll_number, student.name,
+                exam.subject.code, f'{exam.start_date} {exam.start_time}',
+                other.subject.code, f'{other.start_date} {other.start_time}',
+            ])
+        return response
+    
+    return render(request, 'exam_system/admin/registration_clashes.html', {'rows': rows})
+
 # Admin Publish Schedule
 def admin_publish_schedule(request):
     if not check_admin(request):
@@ -164,7 +388,7 @@ def faculty_dashboard(request):
     if not check_faculty(request):
         return redirect('login')
     
-    faculty = Faculty.objects.get(id=request.session['user_id'])
+    faculty = request.principal
     allocated_papers = AnswerSheet.objects.filter(faculty=faculty, is_allocated=True)
     checked_papers = AnswerSheet.objects.filter(faculty=faculty, is_checked=True)
     
@@ -180,27 +404,24 @@ def faculty_check_papers(request):
     if not check_faculty(request):
         return redirect('login')
     
-    faculty = Faculty.objects.get(id=request.session['user_id'])
+    faculty = request.principal
     allocated_papers = AnswerSheet.objects.filter(
         faculty=faculty,
         is_allocated=True,
         is_checked=False
-    )
+    ).select_related('student', 'exam__subject')
     
     if request.method == 'POST':
-        paper_id = request.POST.get('paper_id')
-        marks = request.POST.get('marks')
-        remarks = request.POST.get('remarks', '')
-        
-        paper = AnswerSheet.objects.get(id=paper_id)
-        paper.marks_obtained = marks
-        paper.remarks = remarks
-        paper.is_checked = True
-        paper.checked_at = timezone.now()
-        paper.save()
-        
-        messages.success(request, 'Paper checked successfully')
-        return redirect('faculty_check_papers')
+        # the whole grid in one transaction, rejected rows stay on the page
+        entries = parse_grid(request.POST)
+        result = save_marks(faculty, entries, 'check')
+        if result.saved:
+            messages.success(request, f'{result.saved} papers checked successfully')
+        if not result.errors:
+            if not entries:
+                messages.error(request, 'Enter marks for at least one paper')
+            return redirect('faculty_check_papers')
+        allocated_papers = grid_rows(request, list(allocated_papers), entries, result.errors)
     
     context = {'allocated_papers': allocated_papers}
     return render(request, 'exam_system/faculty/check_papers.html', context)
@@ -210,33 +431,97 @@ def faculty_enter_marks(request):
     if not check_faculty(request):
         return redirect('login')
     
-    faculty = Faculty.objects.get(id=request.session['user_id'])
+    faculty = request.principal
     checked_papers = AnswerSheet.objects.filter(
         faculty=faculty,
         is_checked=True,
         marks_obtained__isnull=True
-    )
+    ).select_related('student', 'exam__subject')
     
     if request.method == 'POST':
-        paper_id = request.POST.get('paper_id')
-        marks = request.POST.get('marks')
-        
-        paper = AnswerSheet.objects.get(id=paper_id)
-        paper.marks_obtained = marks
-        paper.save()
-        
-        messages.success(request, 'Marks entered successfully')
-        return redirect('faculty_enter_marks')
+        entries = parse_grid(request.POST)
+        result = save_marks(faculty, entries, 'marks')
+        if result.saved:
+            messages.success(request, f'Marks entered for {result.saved} papers')
+        if not result.errors:
+            if not entries:
+                messages.error(request, 'Enter marks for at least one paper')
+            return redirect('faculty_enter_marks')
+        checked_papers = grid_rows(request, list(checked_papers), entries, result.errors)
     
     context = {'checked_papers': checked_papers}
     return render(request, 'exam_system/faculty/enter_marks.html', context)
 
+# Faculty Claim Papers (pull the next batch of an exam's papers)
+def faculty_claim_papers(request):
+    if not check_faculty(request):
+        return redirect('login')
+    
+    faculty = request.principal
+    if request.method == 'POST':
+        exam_id = request.POST.get('exam_id', '')
+        exam = Exam.objects.filter(id=exam_id, is_published=True).first() if exam_id.isdigit() else None
+        count = request.POST.get('count', '')
+        if exam is None or not count.isdigit() or int(count) < 1:
+            messages.error(request, 'Choose an exam and how many papers to claim')
+            return redirect('faculty_claim_papers')
+        
+        claimed = claim_papers(faculty, exam, int(count))
+        if not claimed:
+            messages.error(request, f'No papers of {exam.subject.name} are left to claim')
+            return redirect('faculty_claim_papers')
+        messages.success(request, f'Claimed {claimed} papers of {exam.subject.name}, unchecked papers go back to the pool after the lease')
+        return redirect('faculty_check_papers')
+    
+    exams = list(Exam.objects.filter(is_published=True).select_related('subject').order_by('start_date'))
+    pools = pool_sizes([exam.id for exam in exams])
+    claims = claims_of(faculty)
+    for exam in exams:
+        exam.pool_size = pools.get(exam.id, 0)
+        exam.claimed, exam.lease_expires_at = claims.get(exam.id, (0, None))
+    
+    context = {
+        'exams': [exam for exam in exams if exam.pool_size or exam.claimed],
+        'claim_max': settings.EVALUATION_CLAIM_MAX,
+    }
+    return render(request, 'exam_system/faculty/claim_papers.html', context)
+
+# Faculty Upload Marks (CSV/XLSX sheet keyed by roll number and subject code)
+def faculty_upload_marks(request):
+    if not check_faculty(request):
+        return redirect('login')
+    
+    context = {}
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, 'Choose a CSV or XLSX file')
+            return redirect('faculty_upload_marks')
+        
+        # Read the upload row by row instead of loading it whole
+        try:
+            result = upload_marks(request.principal, read_rows(upload.name, upload.file))
+        except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            messages.error(request, f'Could not read the file: {e}')
+            return redirect('faculty_upload_marks')
+        
+        if request.POST.get('report'):
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="marks-upload-conflicts.csv"'
+            write_conflict_report(result.conflicts, response)
+            return response
+        
+        messages.success(request, f'Saved marks for {result.saved} of {result.processed} rows')
+        context.update({'result': result, 'shown_conflicts': result.conflicts[:200]})
+    
+    return render(request, 'exam_system/faculty/upload_marks.html', context)
+
 # Student Dashboard
 def student_dashboard(request):
     if not check_student(request):
         return redirect('login')
     
-    student = Student.objects.get(id=request.session['user_id'])
+    student = request.principal
     registrations = StudentExamRegistration.objects.filter(student=student)
     available_exams = Exam.objects.filter(is_published=True)
     
@@ -252,18 +537,24 @@ def student_register_exam(request):
     if not check_student(request):
         return redirect('login')
     
-    student = Student.objects.get(id=request.session['user_id'])
+    student = request.principal
     
     if request.method == 'POST':
         exam_id = request.POST.get('exam_id')
-        exam = Exam.objects.get(id=exam_id)
         
-        # Check if already registered
-        if not StudentExamRegistration.objects.filter(student=student, exam=exam).exists():
-            StudentExamRegistration.objects.create(student=student, exam=exam)
-            messages.success(request, f'Successfully registered for {exam.subject.name}')
-        else:
+        # Single conflict-tolerant insert, capacity enforced atomically
+        result = register_student(student.id, int(exam_id))
+        if result == REGISTERED:
+            subject_name = Subject.objects.filter(exam=exam_id).values_list('name', flat=True).first()
+            messages.success(request, f'Successfully registered for {subject_name}')
+        elif result == ALREADY_REGISTERED:
             messages.error(request, 'Already registered for this exam')
+        elif result == FULL:
+            messages.error(request, 'This exam is full')
+        elif result == CLASH:
+            messages.error(request, 'This exam clashes with another exam you are registered for')
+        else:
+            messages.error(request, 'This exam is not open for registration')
         
         return redirect('student_register_exam')
     
@@ -306,6 +597,8 @@ def admin_manage_semesters(request):
             semester.is_active = not semester.is_active
             semester.save()
             messages.success(request, f'Semester "{semester.name}" status updated')
+        elif action == 'bulk':
+            run_bulk_action(request, bulk_selection(request, Semester.objects.all()), 'semesters')
     
     semesters = Semester.objects.all().order_by('-created_at')
     context = {'semesters': semesters}
@@ -354,10 +647,17 @@ def admin_manage_subjects(request):
             subject.is_active = not subject.is_active
             subject.save()
             messages.success(request, f'Subject "{subject.name}" status updated')
+        elif action == 'bulk':
+            semester_id = request.POST.get('bulk_semester_id', '')
+            semester = Semester.objects.filter(id=semester_id, is_active=True).first() if semester_id.isdigit() else None
+            run_bulk_action(
+                request, bulk_selection(request, Subject.objects.all(), filter_subjects), 'subjects',
+                edit=('semester', semester) if semester else None,
+            )
     
-    subjects = Subject.objects.all().order_by('-created_at')
+    subjects, filters = filter_subjects(Subject.objects.select_related('semester').order_by('-created_at'), request.GET)
     semesters = Semester.objects.filter(is_active=True)
-    context = {'subjects': subjects, 'semesters': semesters}
+    context = {'subjects': subjects, 'semesters': semesters, 'query': filters.get('q', ''), 'filters': filters}
     return render(request, 'exam_system/admin/manage_subjects.html', context)
 
 # Admin Manage Faculty
@@ -410,9 +710,24 @@ def admin_manage_faculty(request):
             faculty.is_active = not faculty.is_active
             faculty.save()
             messages.success(request, f'Faculty "{faculty.name}" status updated')
+        elif action == 'bulk':
+            department = request.POST.get('bulk_department', '').strip()
+            run_bulk_action(
+                request, bulk_selection(request, Faculty.objects.all(), filter_faculty), 'faculty',
+                edit=('department', department) if department else None,
+            )
     
-    faculties = Faculty.objects.all().order_by('-created_at')
-    context = {'faculties': faculties}
+    # One page at a time, filtered in the database
+    queryset, filters = filter_faculty(Faculty.objects.all(), request.GET)
+    page = keyset_page(queryset, request.GET.get('after'), request.GET.get('before'))
+    departments = Faculty.objects.order_by('department').values_list('department', flat=True).distinct()
+    context = {
+        'faculties': page.items,
+        'page': page,
+        'filters': filters,
+        'filter_query': urlencode(filters),
+        'departments': departments,
+    }
     return render(request, 'exam_system/admin/manage_faculty.html', context)
 
 # Admin Manage Students
@@ -470,19 +785,69 @@ def admin_manage_students(request):
             student = Student.objects.get(id=student_id)
             student.is_active = not student.is_active
             student.save()
-            messages.success(request, f'Student "{name}" status updated')
+            messages.success(request, f'Student "{student.name}" status updated')
+        elif action == 'bulk':
+            semester_id = request.POST.get('bulk_semester_id', '')
+            semester = Semester.objects.filter(id=semester_id, is_active=True).first() if semester_id.isdigit() else None
+            run_bulk_action(
+                request, bulk_selection(request, Student.objects.all(), filter_students), 'students',
+                edit=('semester', semester) if semester else None,
+            )
     
-    students = Student.objects.all().order_by('-created_at')
+    # One page at a time, filtered in the database
+    queryset, filters = filter_students(Student.objects.select_related('semester'), request.GET)
+    page = keyset_page(queryset, request.GET.get('after'), request.GET.get('before'))
     semesters = Semester.objects.filter(is_active=True)
-    context = {'students': students, 'semesters': semesters}
+    context = {
+        'students': page.items,
+        'page': page,
+        'filters': filters,
+        'filter_query': urlencode(filters),
+        'semesters': semesters,
+    }
     return render(request, 'exam_system/admin/manage_students.html', context)
 
+# Admin Import Accounts (CSV upload)
+def admin_import_accounts(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    context = {'kind': request.POST.get('kind', 'students')}
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        kind = request.POST.get('kind')
+        dry_run = bool(request.POST.get('dry_run'))
+        if upload is None or kind not in IMPORT_SPECS:
+            messages.error(request, 'Choose the account type and a CSV file')
+            return redirect('admin_import_accounts')
+        
+        # Read the upload row by row instead of loading it whole
+        try:
+            result = import_accounts(kind, io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''), dry_run=dry_run)
+        except (ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            messages.error(request, f'Could not read the file: {e}')
+            return redirect('admin_import_accounts')
+        
+        if request.POST.get('report'):
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{kind}-import-errors.csv"'
+            write_error_report(result.errors, response)
+            return response
+        
+        if dry_run:
+            messages.success(request, f'{result.imported} of {result.processed} rows are valid')
+        else:
+            messages.success(request, f'Imported {result.imported} of {result.processed} rows')
+        context.update({'result': result, 'dry_run': dry_run, 'shown_errors': result.errors[:200]})
+    
+    return render(request, 'exam_system/admin/import_accounts.html', context)
+
 # Student View Schedule
 def student_view_schedule(request):
     if not check_student(request):
         return redirect('login')
     
-    student = Student.objects.get(id=request.session['user_id'])
+    student = request.principal
     registrations = StudentExamRegistration.objects.filter(student=student)
     
     # Get exam details for each registration
@@ -506,7 +871,7 @@ def student_view_seating(request):
     if not check_student(request):
         return redirect('login')
     
-    student = Student.objects.get(id=request.session['user_id'])
+    student = request.principal
     seating_arrangements = SeatingArrangement.objects.filter(student=student)
     
     # Get detailed seating information
@@ -531,7 +896,7 @@ def student_view_results(request):
     if not check_student(request):
         return redirect('login')
     
-    student = Student.objects.get(id=request.session['user_id'])
+    student = request.principal
     answer_sheets = AnswerSheet.objects.filter(
         student=student,
         is_checked=True,
@@ -618,23 +983,17 @@ def admin_attendance_sheets(request):
                 }
             )
             
-            # Get registered students
-            registrations = StudentExamRegistration.objects.filter(exam=exam)
+            # Insert all missing attendance records in one go
+            create_attendance_sheet(session)
             
-            # Create attendance records for all registered students
-            for registration in registrations:
-                Attendance.objects.get_or_create(
-                    student=registration.student,
-                    exam_session=session,
-                    defaults={'is_present': False}
-                )
+            registrations = session_registrations(session).select_related('student__semester')
             
             context = {
                 'exam': exam,
                 'session': session,
                 'registrations': registrations,
                 'date': date,
-                'present_students': []
+                'present_students': present_student_ids(session)
             }
             return render(request, 'exam_system/admin/attendance_sheet.html', context)
         
@@ -643,22 +1002,8 @@ def admin_attendance_sheets(request):
             session_id = request.POST.get('session_id')
             session = ExamSession.objects.get(id=session_id)
             
-            # Get all registered students
-            registrations = StudentExamRegistration.objects.filter(exam=session.exam)
-            
-            # Update attendance records
-            for registration in registrations:
-                student_id = registration.student.id
-                is_present = f'attendance_{student_id}' in request.POST
-                
-                attendance, created = Attendance.objects.get_or_create(
-                    student=registration.student,
-                    exam_session=session,
-                    defaults={'is_present': is_present}
-                )
-                
-                attendance.is_present = is_present
-                attendance.save()
+            # Update attendance records as two set-based updates
+            save_attendance(session, parse_present_ids(request.POST))
             
             messages.success(request, 'Attendance saved successfully')
             return redirect('admin_attendance_sheets')
@@ -676,37 +1021,33 @@ def admin_seating_arrangement(request):
         session_id = request.POST.get('session_id')
         session = ExamSession.objects.get(id=session_id)
         
-        # Get registered students for this exam
-        registrations = StudentExamRegistration.objects.filter(exam=session.exam)
-        
-        # Clear existing seating arrangements for this session
-        SeatingArrangement.objects.filter(exam_session=session).delete()
+        try:
+            rooms = parse_rooms(request.POST.get('rooms', ''))
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect('admin_seating_arrangement')
         
-        # Create seating arrangement
-        seat_number = 1
-        for registration in registrations:
-            row = (seat_number - 1) // 10 + 1
-            col = (seat_number - 1) % 10 + 1
-            
-            SeatingArrangement.objects.create(
-                student=registration.student,
-                exam_session=session,
-                seat_number=f'A{seat_number:02d}',
-                row_number=row,
-                column_number=col
-            )
-            seat_number += 1
+        # Compute the layout in memory and write it in one bulk insert
+        result = arrange_session(
+            session,
+            rooms=rooms or None,
+            separate_subjects=request.POST.get('separate_subjects') == 'on'
+        )
         
-        messages.success(request, 'Seating arrangement created successfully')
+        messages.success(request, f'Seating arrangement created for {len(result.seats)} students')
+        if result.unseated:
+            messages.error(request, f'{len(result.unseated)} students could not be seated, add rooms or raise the session capacity')
         return redirect('admin_seating_arrangement')
     
-    # Get all exam sessions with their exams and subjects
-    sessions = ExamSession.objects.select_related('exam__subject').all().order_by('-date')
+    # Get all exam sessions with their exams, subjects and seats taken
+    sessions = list(ExamSession.objects.select_related('exam__subject').annotate(
+        seating_count=Count('seatingarrangement')
+    ).order_by('-date'))
     
-    # Get seating arrangement counts for each session
+    # Registration counts for every session in one grouped query
+    registration_counts = sitting_counts(sessions)
     for session in sessions:
-        session.seating_count = SeatingArrangement.objects.filter(exam_session=session).count()
-        session.registration_count = StudentExamRegistration.objects.filter(exam=session.exam).count()
+        session.registration_count = registration_counts[session.id]
     
     context = {'sessions': sessions}
     return render(request, 'exam_system/admin/seating_arrangement.html', context)
@@ -716,56 +1057,51 @@ def admin_allocate_papers(request):
     if not check_admin(request):
         return redirect('login')
     
+    if request.method == 'POST' and request.POST.get('action') == 'open_pool':
+        # let faculty claim the papers themselves instead
+        exam = get_object_or_404(Exam, id=request.POST.get('exam_id'), is_published=True)
+        created = open_pool(exam)
+        messages.success(request, f'{exam.subject.name} is open for claiming, {created} answer sheets added to the pool')
+        return redirect('admin_allocate_papers')
+    
     if request.method == 'POST':
-        faculty_id = request.POST.get('faculty_id')
+        faculty_ids = request.POST.getlist('faculty_ids') or request.POST.getlist('faculty_id')
         exam_id = request.POST.get('exam_id')
+        department = request.POST.get('department', '')
         
-        faculty = Faculty.objects.get(id=faculty_id)
-        exam = Exam.objects.get(id=exam_id)
+        if not faculty_ids:
+            messages.error(request, 'Select at least one faculty member')
+            return redirect('admin_allocate_papers')
+        if not (exam_id or '').isdigit() or not all(faculty_id.isdigit() for faculty_id in faculty_ids):
+            messages.error(request, 'Select an exam and faculty members from the lists')
+            return redirect('admin_allocate_papers')
         
-        # Get registered students for this exam
-        registrations = StudentExamRegistration.objects.filter(exam=exam)
+        exam = get_object_or_404(Exam, id=exam_id)
         
-        # Create or update answer sheets for all registered students
-        allocated_count = 0
-        for registration in registrations:
-            answer_sheet, created = AnswerSheet.objects.get_or_create(
-                student=registration.student,
-                exam=exam,
-                defaults={
-                    'faculty': faculty,
-                    'is_allocated': True,
-                    'is_checked': False
-                }
-            )
-            
-            if not answer_sheet.is_allocated:
-                answer_sheet.faculty = faculty
-                answer_sheet.is_allocated = True
-                answer_sheet.save()
-                allocated_count += 1
-            elif created:
-                allocated_count += 1
-        
-        messages.success(request, f'Allocated {allocated_count} papers to {faculty.name}')
+        # Optional per-faculty caps on unchecked papers
+        caps = {}
+        for faculty_id in faculty_ids:
+            cap = request.POST.get(f'cap_{faculty_id}', '').strip()
+            if not cap:
+                continue
+            if not cap.isdigit():
+                messages.error(request, f'Cap "{cap}" must be a whole number')
+                return redirect('admin_allocate_papers')
+            caps[int(faculty_id)] = int(cap)
+        
+        # Spread the papers least-loaded first in one bulk write
+        result = allocate_papers(exam, [int(faculty_id) for faculty_id in faculty_ids], caps, department)
+        
+        messages.success(request, f'Allocated {result.total} papers across {len([count for count in result.allocated.values() if count])} faculty')
+        if result.unallocated:
+            messages.error(request, f'{result.unallocated} papers left unallocated, all selected faculty reached their caps')
         return redirect('admin_allocate_papers')
     
     faculties = Faculty.objects.filter(is_active=True)
-    exams = Exam.objects.filter(is_published=True)
+    exams = Exam.objects.filter(is_published=True).select_related('subject')
     
     # Get allocation statistics
-    allocation_stats = []
-    for exam in exams:
-        total_students = StudentExamRegistration.objects.filter(exam=exam).count()
-        allocated_papers = AnswerSheet.objects.filter(exam=exam, is_allocated=True).count()
-        unallocated_papers = total_students - allocated_papers
-        
-        allocation_stats.append({
-            'exam': exam,
-            'total_students': total_students,
-            'allocated_papers': allocated_papers,
-            'unallocated_papers': unallocated_papers
-        })
+    allocation_stats = allocation_coverage_per_exam(exams)
     
     context = {
         'faculties': faculties, 
@@ -779,34 +1115,27 @@ def admin_pending_tasks(request):
     if not check_admin(request):
         return redirect('login')
     
-    pending_checking = AnswerSheet.objects.filter(is_allocated=True, is_checked=False)
-    pending_marks = AnswerSheet.objects.filter(is_checked=True, marks_obtained__isnull=True)
+    pending_checking = AnswerSheet.objects.filter(
+        is_allocated=True,
+        is_checked=False
+    ).select_related('student', 'exam__subject', 'faculty')
+    pending_marks = AnswerSheet.objects.filter(
+        is_checked=True,
+        marks_obtained__isnull=True
+    ).select_related('student', 'exam__subject', 'faculty')
+    
+    # Pending work per faculty in one grouped query
+    pending_work = pending_work_per_faculty()
     
     # Get faculty with most pending tasks
-    faculties_with_pending = []
-    for faculty in Faculty.objects.filter(is_active=True):
-        pending_count = pending_checking.filter(faculty=faculty).count()
-        if pending_count > 0:
-            faculties_with_pending.append({
-                'name': faculty.name,
-                'pending_count': pending_count
-            })
-    
-    # Sort by pending count (descending)
-    faculties_with_pending.sort(key=lambda x: x['pending_count'], reverse=True)
+    faculties_with_pending = [row for row in pending_work if row['pending_count'] > 0]
     
     # Get faculty with most pending marks
-    faculties_with_pending_marks = []
-    for faculty in Faculty.objects.filter(is_active=True):
-        pending_marks_count = pending_marks.filter(faculty=faculty).count()
-        if pending_marks_count > 0:
-            faculties_with_pending_marks.append({
-                'name': faculty.name,
-                'pending_marks_count': pending_marks_count
-            })
-    
-    # Sort by pending marks count (descending)
-    faculties_with_pending_marks.sort(key=lambda x: x['pending_marks_count'], reverse=True)
+    faculties_with_pending_marks = sorted(
+        [row for row in pending_work if row['pending_marks_count'] > 0],
+        key=lambda x: x['pending_marks_count'],
+        reverse=True
+    )
     
     context = {
         'pending_checking': pending_checking,
@@ -814,4 +1143,101 @@ def admin_pending_tasks(request):
         'faculties_with_pending': faculties_with_pending,
         'faculties_with_pending_marks': faculties_with_pending_marks,
     }
-    return render(request, 'exam_system/admin/pending_tasks.html', context)
\ No newline at end of file
+    return render(request, 'exam_system/admin/pending_tasks.html', context)
+
+# Admin Query Stats
+def admin_query_stats(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    return JsonResponse({'views': query_stats.snapshot()})
+
+# the exam or semester picked by the ``exam`` / ``semester`` GET parameter:
+# (title, exam ids), or None
+def analytics_scope(request):
+    exam_id = request.GET.get('exam', '')
+    semester_id = request.GET.get('semester', '')
+    if exam_id.isdigit():
+        exam = Exam.objects.select_related('subject').filter(id=int(exam_id)).first()
+        if exam:
+            return f'{exam.subject.code} - {exam.subject.name} ({exam.start_date:%b %d, %Y})', [exam.id]
+    elif semester_id.isdigit():
+        semester = Semester.objects.filter(id=int(semester_id)).first()
+        if semester:
+            return semester.name, list(Exam.objects.filter(subject__semester=semester).values_list('id', flat=True))
+    return None
+
+# Admin Analytics (marks distribution, percentile ranks, marking bias)
+def admin_analytics(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    context = {
+        'exams': Exam.objects.filter(is_published=True).select_related('subject').order_by('-start_date'),
+        'semesters': Semester.objects.all(),
+        'form': request.GET,
+    }
+    scope = analytics_scope(request)
+    if scope:
+        try:
+            result = analytics_for(scope[1])
+        except AnalyticsUnavailable as e:
+            messages.error(request, str(e))
+            return render(request, 'exam_system/admin/analytics.html', context)
+        
+        faculty = Faculty.objects.only('name').in_bulk([row.faculty_id for row in result.faculty])
+        width = 100 // HISTOGRAM_BINS
+        peak = max(result.distribution.histogram) or 1
+        context.update({
+            'title': scope[0],
+            'result': result,
+            'histogram': [
+                (f'{index * width}-{index * width + width}%', count, 100 * count // peak)
+                for index, count in enumerate(result.distribution.histogram)
+            ],
+            'faculty_bias': [(row, faculty.get(row.faculty_id)) for row in result.faculty],
+            'pass_percent': settings.RESULT_PASS_PERCENT,
+        })
+    return render(request, 'exam_system/admin/analytics.html', context)
+
+# Admin Analytics as JSON
+def admin_analytics_data(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    scope = analytics_scope(request)
+    if scope is None:
+        return JsonResponse({'error': 'Pass an exam or semester id'}, status=400)
+    try:
+        result = analytics_for(scope[1])
+    except AnalyticsUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
+    return JsonResponse({
+        'title': scope[0],
+        'exams': scope[1],
+        'pass_percent': settings.RESULT_PASS_PERCENT,
+        'distribution': result.distribution._asdict(),
+        'faculty': [row._asdict() for row in result.faculty],
+        'percentile_ranks': {str(student_id): rank for student_id, rank in result.ranks.items()},
+    })
+
+# Admin Search (students, faculty and subjects, best match first)
+def admin_search(request):
+    if not check_admin(request):
+        return redirect('login')
+    
+    query = request.GET.get('q', '')
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in SEARCH_SOURCES] or None
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    
+    results = search(query, kinds=kinds, limit=limit)
+    return JsonResponse({
+        'query': query,
+        'results': [
+            {'kind': result.kind, 'id': result.id, 'title': result.title, 'detail': result.detail}
+            for result in results
+        ],
+    })
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,19 +40,23 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'exam_system.middleware.ProfilingMiddleware',
+    'exam_system.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'exam_system.middleware.PrincipalMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'exam_system.middleware.ReportingDatabaseMiddleware',
 ]
 
 ROOT_URLCONF = 'on_demand_exam.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'exam_system.instrumentation.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -76,10 +81,99 @@ DATABASES = {
     }
 }
 
+# 'production' runs SQLite in WAL mode with the pragmas below and adds the
+# read-only 'reporting' connection that REPORTING_VIEWS read from
+DATABASE_PROFILE = os.environ.get('EXAM_DATABASE_PROFILE', 'development')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # negative is KiB
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRODUCTION_OPTIONS = {
+    # take the write lock up front, so writers queue on busy_timeout
+    # instead of failing when a read transaction upgrades
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': ''.join(f'PRAGMA {name}={value};' for name, value in SQLITE_PRAGMAS.items()),
+}
+SQLITE_REPORTING_OPTIONS = {
+    'init_command': SQLITE_PRODUCTION_OPTIONS['init_command'] + 'PRAGMA query_only=ON;',
+}
+
+if DATABASE_PROFILE == 'production':
+    DATABASES['default']['OPTIONS'] = SQLITE_PRODUCTION_OPTIONS
+    DATABASES['reporting'] = {
+        **DATABASES['default'],
+        'OPTIONS': SQLITE_REPORTING_OPTIONS,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['exam_system.routers.ReportingRouter']
+REPORTING_DATABASE = 'reporting'
+
+# GET requests to these views read from REPORTING_DATABASE when it exists
+REPORTING_VIEWS = [
+    'admin_dashboard',
+    'admin_pending_tasks',
+    'faculty_dashboard',
+    'student_dashboard',
+    'student_view_schedule',
+    'student_view_seating',
+    'student_view_results',
+]
+
 
 # Custom authentication settings
 # No Django auth validators needed for custom system
 
+# Seconds the logged-in Admin/Faculty/Student is cached for request.principal
+PRINCIPAL_CACHE_TIMEOUT = 60
+
+
+# Query budget instrumentation (exam_system.middleware.QueryBudgetMiddleware)
+QUERY_INSTRUMENTATION = True
+
+# Requests kept per view for the admin query stats endpoint
+QUERY_STATS_WINDOW = 200
+
+# Maximum queries per request, by view name; 'log' or 'raise' when exceeded
+QUERY_BUDGETS = {
+    'admin_dashboard': 10,
+    'admin_pending_tasks': 10,
+    'admin_allocate_papers': 15,
+    'admin_attendance_sheets': 20,
+    'admin_seating_arrangement': 20,
+    'faculty_check_papers': 10,
+    'faculty_enter_marks': 10,
+}
+QUERY_BUDGET_ACTION = 'log'
+
+
+# Evaluation queue (exam_system.claims): claimed papers still unchecked when
+# the lease runs out go back to the pool
+EVALUATION_LEASE_SECONDS = 48 * 3600
+EVALUATION_CLAIM_MAX = 100
+
+
+# Result analytics (exam_system.analytics): the pass mark in percent of an
+# exam's total, and seconds a result stays cached (it is also dropped as soon
+# as the marks behind it change)
+RESULT_PASS_PERCENT = 40
+ANALYTICS_CACHE_TIMEOUT = 3600
+
+
+# Sampling profiler (exam_system.middleware.ProfilingMiddleware); requests
+# with a signed X-Profile-Token header are always profiled while enabled
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.01
+PROFILING_INTERVAL = 0.001
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_BYTES = 100 * 1024 * 1024
+PROFILING_TOKEN_MAX_AGE = 3600
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/